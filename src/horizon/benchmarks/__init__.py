@@ -0,0 +1 @@
+"""Benchmarks for the Horizon discovery system."""
@@ -0,0 +1,132 @@
+"""Deterministic synthetic corpora for the hot-path benchmarks."""
+import random
+from typing import Any, Dict, List
+
+COMPANY_PREFIXES = ["Neura", "Data", "Vision", "Agro", "Fin", "Med", "Cloud", "Deep", "Quantum", "Smart"]
+COMPANY_SUFFIXES = ["Labs", "AI", "Tech", "Systems", "Analytics", "Robotics", "Health", "Pay", "Mind", "Works"]
+CITIES = ["São Paulo", "Mexico City", "Buenos Aires", "Santiago", "Bogotá", "Lima", "Montevideo"]
+SECTORS = ["FinTech", "HealthTech", "EdTech", "AgTech", "RetailTech", "LogisticsTech", "Security"]
+TECHNOLOGIES = ["Machine Learning", "Computer Vision", "Natural Language Processing", "Generative AI", "MLOps"]
+INVESTORS = ["Kaszek Ventures", "Monashees", "MAYA Capital", "QED Investors", "SoftBank", "ALLVP"]
+ROUNDS = ["Seed", "Series A", "Series B", "Series C", "Pre-Seed"]
+
+NOISE_LINES = [
+    "Subscribe to our newsletter for the latest news",
+    "Cookie settings | Privacy policy | Terms of use",
+    "Bundle offer ends October 3. Register now",
+    "Log in  Sign up  Pricing  Contact sales",
+    "",
+]
+
+WEBSITE_SECTIONS = [
+    "About us: {name} builds {tech} products for {sector} companies across Latin America.",
+    "Our mission is to make {sector} smarter with deep learning and pytorch.",
+    "Founded in {year}, {name} is headquarters in {city}.",
+    "Our platform uses transformer models, kubernetes and docker to serve customers.",
+    "Our product offers an API with subscription pricing for enterprise teams.",
+    "Team: Maria Silva, CEO and co-founder. João Souza, CTO and co-founder.",
+    "We are hiring python and react engineers.",
+]
+
+
+def company_name(rng: random.Random) -> str:
+    return f"{rng.choice(COMPANY_PREFIXES)}{rng.choice(COMPANY_SUFFIXES)} {rng.randint(1, 99999)}"
+
+
+def _search_line(rng: random.Random, venture: str) -> str:
+    kind = rng.random()
+    name = company_name(rng)
+    if kind < 0.35:
+        return (f"{name} is an AI startup founded in {rng.randint(2010, 2024)} in {rng.choice(CITIES)} "
+                f"working on {rng.choice(TECHNOLOGIES)} for {rng.choice(SECTORS)}")
+    if kind < 0.55:
+        return (f"{name} raised ${rng.randint(1, 300)} million in a {rng.choice(ROUNDS)} funding round "
+                f"led by {rng.choice(INVESTORS)} - https://example.com/{rng.randint(1, 10**6)}")
+    if kind < 0.7:
+        return (f"{venture} artificial intelligence startup company announces ${rng.randint(1, 90)}M investment "
+                f"https://news.example.com/{venture.lower()}/{rng.randint(1, 10**6)}")
+    return rng.choice(NOISE_LINES)
+
+
+def search_result_text(lines: int, seed: int = 42, venture: str = "Tarken") -> str:
+    """Search-result-like text mixing startup, funding, venture and noise lines"""
+    rng = random.Random(seed)
+    return "\n".join(_search_line(rng, venture) for _ in range(lines))
+
+
+def funding_text(lines: int, company: str = "Tarken", seed: int = 7) -> str:
+    """Search-result-like text where part of the lines mention funding for `company`"""
+    rng = random.Random(seed)
+    output = []
+    for _ in range(lines):
+        if rng.random() < 0.4:
+            output.append(
+                f"{company} raised ${rng.randint(1, 200)} million {rng.choice(ROUNDS).lower()} funding "
+                f"from {rng.choice(INVESTORS)} (source {rng.randint(1, 10**6)})"
+            )
+        else:
+            output.append(_search_line(rng, "Other"))
+    return "\n".join(output)
+
+
+def website_content(lines: int, seed: int = 3) -> str:
+    """Scraped-website-like content for the CompanyAnalysisTool extractors"""
+    rng = random.Random(seed)
+    output = []
+    for _ in range(lines):
+        template = rng.choice(WEBSITE_SECTIONS + NOISE_LINES)
+        output.append(template.format(
+            name=company_name(rng), tech=rng.choice(TECHNOLOGIES).lower(),
+            sector=rng.choice(SECTORS), year=rng.randint(2010, 2024), city=rng.choice(CITIES)
+        ))
+    return "\n".join(output)
+
+
+def startup_records(count: int, seed: int = 11) -> List[Dict[str, Any]]:
+    """Startup records using both the database and the LLM output field names"""
+    rng = random.Random(seed)
+    records = []
+    for i in range(count):
+        name = f"{company_name(rng)} #{i}"
+        if rng.random() < 0.5:
+            records.append({
+                "name": name,
+                "website": f"https://www.{name.split()[0].lower()}{i}.com",
+                "description": f"{name} applies {rng.choice(TECHNOLOGIES)} to {rng.choice(SECTORS)}.",
+                "location": rng.choice(CITIES),
+                "country": "Brazil",
+                "technology": rng.choice(TECHNOLOGIES),
+                "market": rng.choice(SECTORS),
+                "founded": str(rng.randint(2010, 2024)),
+                "milestones": f"{rng.choice(ROUNDS)} led by {rng.choice(INVESTORS)}",
+            })
+        else:
+            records.append({
+                "Company Name": name,
+                "Website": f"www.{name.split()[0].lower()}{i}.com.br",
+                "Description": f"{name} builds <{rng.choice(TECHNOLOGIES)}> & tools for \"{rng.choice(SECTORS)}\".",
+                "Location": rng.choice(CITIES),
+                "AI Technology Focus": rng.choice(TECHNOLOGIES),
+                "Target Market": rng.choice(SECTORS),
+                "Key Milestones": f"Co-Investors: {', '.join(rng.sample(INVESTORS, 2))}",
+            })
+    return records
+
+
+def task_results(count: int, seed: int = 13) -> Dict[str, Any]:
+    """Processed crew results with `count` startups, shaped like _process_crew_results output"""
+    records = startup_records(count, seed)
+    market_text = "\n".join(
+        f"- **{sector}**: *growing* demand, see [report](https://example.com/{i})"
+        for i, sector in enumerate(SECTORS * max(1, count // 100))
+    )
+    return {
+        "discovery_task": {"startups": records},
+        "funding_research_task": {"startups": [
+            {"name": r.get("name", r.get("Company Name")), "total_raised": "$10M", "lead_investors": ["Kaszek Ventures"]}
+            for r in records
+        ]},
+        "market_analysis_task": market_text,
+        "total_tasks": 3,
+        "completion_status": "success",
+    }
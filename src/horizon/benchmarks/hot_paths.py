@@ -0,0 +1,293 @@
+#!/usr/bin/env python
+"""
+Benchmark suite for the extraction, database and rendering hot paths.
+
+Every benchmark runs against deterministic synthetic corpora of 1k, 10k, 100k
+(and, on request, 1M) lines or records. Results can be saved as a JSON
+baseline and compared against a later run to catch regressions:
+
+    bench --save benchmarks/baseline.json
+    bench_compare benchmarks/baseline.json --threshold 0.15
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from . import corpora
+
+SIZES = {"1k": 1_000, "10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+DEFAULT_SIZES = ["1k", "10k", "100k"]
+DEFAULT_BASELINE = Path("benchmarks/baseline.json")
+
+# name -> (unit, setup); setup(size) prepares the inputs and returns the timed callable
+_BENCHMARKS: Dict[str, Tuple[str, Callable[[int], Callable[[], Any]]]] = {}
+
+
+def benchmark(name: str, unit: str):
+    """Register a benchmark setup function"""
+    def register(setup: Callable[[int], Callable[[], Any]]):
+        _BENCHMARKS[name] = (unit, setup)
+        return setup
+    return register
+
+
+# =============================================================================
+# Extraction (custom tools)
+# =============================================================================
+
+@benchmark("extract_companies_from_text", "lines")
+def _bench_extract_companies(size: int):
+    from horizon.tools.startup_discovery_tools import StartupDiscoveryTool
+    tool = StartupDiscoveryTool()
+    text = corpora.search_result_text(size)
+    return lambda: list(tool._extract_companies_from_text(text, "Brazil", "AI"))
+
+
+@benchmark("extract_venture_specific_info", "lines")
+def _bench_extract_venture(size: int):
+    from horizon.tools.startup_discovery_tools import StartupDiscoveryTool
+    tool = StartupDiscoveryTool()
+    text = corpora.search_result_text(size, venture="Tarken")
+    return lambda: tool._extract_venture_specific_info(text, "Tarken")
+
+
+@benchmark("extract_funding_info", "lines")
+def _bench_extract_funding(size: int):
+    from horizon.tools.startup_discovery_tools import FundingResearchTool
+    tool = FundingResearchTool()
+    text = corpora.funding_text(size, company="Tarken")
+    return lambda: tool._extract_funding_info(text, "Tarken")
+
+
+@benchmark("company_analysis_extractors", "lines")
+def _bench_company_analysis(size: int):
+    from horizon.tools.startup_discovery_tools import CompanyAnalysisTool
+    tool = CompanyAnalysisTool()
+    content = corpora.website_content(size)
+
+    def run():
+        tool._extract_company_info(content)
+        tool._extract_technology_info(content)
+        tool._extract_product_info(content)
+        tool._extract_team_info(content)
+    return run
+
+
+# =============================================================================
+# Database
+# =============================================================================
+
+@benchmark("startup_db_add_startups", "records")
+def _bench_db_add(size: int):
+    from horizon.utils.database import StartupDB
+    records = corpora.startup_records(size)
+    workdir = Path(tempfile.mkdtemp(prefix="horizon-bench-"))
+    runs = iter(range(10**9))
+    return lambda: StartupDB(workdir / f"db_{next(runs)}.json").add_startups(records)
+
+
+@benchmark("startup_db_load_startups", "records")
+def _bench_db_load(size: int):
+    from horizon.utils.database import StartupDB
+    db = StartupDB(Path(tempfile.mkdtemp(prefix="horizon-bench-")) / "db.json")
+    db.add_startups(corpora.startup_records(size))
+    return db.load_startups
+
+
+@benchmark("similar_startups_query", "records")
+def _bench_similar(size: int):
+    from horizon.utils.database import StartupDB
+    db = StartupDB(Path(tempfile.mkdtemp(prefix="horizon-bench-")) / "db.json")
+    db.add_startups(corpora.startup_records(size))  # builds the similarity index
+    index = db.similarity_index()
+    rows = iter(range(10**9))
+    return lambda: index.similar_to(index.keys[next(rows) % len(index)], 10)
+
+
+# =============================================================================
+# Exports and rendering
+# =============================================================================
+
+@benchmark("export_to_formats", "records")
+def _bench_export(size: int):
+    from horizon.crew import Horizon
+    horizon = Horizon()
+    results = {
+        "country": "Brazil",
+        "discovery_date": datetime.now().isoformat(),
+        "task_results": corpora.task_results(size),
+        "summary": {"total_tasks": 3, "completion_status": "success"},
+    }
+    workdir = tempfile.mkdtemp(prefix="horizon-bench-")
+
+    def run():
+        cwd = os.getcwd()
+        os.chdir(workdir)
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                horizon._export_to_formats(results, "Brazil")
+        finally:
+            os.chdir(cwd)
+    return run
+
+
+@benchmark("format_task_results_for_email", "records")
+def _bench_email(size: int):
+    from horizon.resend_client import NVIDIAEmailSender
+    sender = NVIDIAEmailSender("", use_fragment_cache=False)
+    task_results = corpora.task_results(size)
+    return lambda: sender.format_task_results_for_email(task_results)
+
+
+@benchmark("format_task_results_for_email_cached", "records")
+def _bench_email_cached(size: int):
+    from horizon.resend_client import NVIDIAEmailSender
+    from horizon.utils.fragments import FragmentCache
+    sender = NVIDIAEmailSender("", use_fragment_cache=False)
+    sender.fragments = FragmentCache(":memory:")
+    task_results = corpora.task_results(size)
+    sender.format_task_results_for_email(task_results)  # warm the cache; runs measure the unchanged re-render
+    return lambda: sender.format_task_results_for_email(task_results)
+
+
+# =============================================================================
+# Runner
+# =============================================================================
+
+def run_benchmark(name: str, size: int, repeat: int = 3) -> Dict[str, Any]:
+    """Set up one benchmark at one size and time `repeat` runs of it"""
+    unit, setup = _BENCHMARKS[name]
+    try:
+        fn = setup(size)
+    except ImportError as e:
+        return {"unit": unit, "items": size, "skipped": f"missing dependency: {e}"}
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+
+    median = statistics.median(timings)
+    return {
+        "unit": unit,
+        "items": size,
+        "repeat": repeat,
+        "min_s": round(min(timings), 6),
+        "median_s": round(median, 6),
+        "per_item_us": round(median / size * 1e6, 4),
+    }
+
+
+def run_suite(names: List[str], sizes: List[str], repeat: int) -> Dict[str, Any]:
+    """Run the selected benchmarks at the selected sizes"""
+    results = {}
+    for name in names:
+        for size_label in sizes:
+            key = f"{name}@{size_label}"
+            result = run_benchmark(name, SIZES[size_label], repeat)
+            results[key] = result
+            if "skipped" in result:
+                print(f"⏭️  {key}: skipped ({result['skipped']})")
+            else:
+                print(f"⏱️  {key}: {result['median_s'] * 1000:.2f}ms median "
+                      f"({result['per_item_us']:.2f}µs per {result['unit'][:-1]})")
+    return {
+        "meta": {
+            "created_at": datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": repeat,
+            "sizes": sizes,
+        },
+        "results": results,
+    }
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float) -> List[Dict[str, Any]]:
+    """Compare median timings; a change above `threshold` (e.g. 0.15 = 15%) is a regression"""
+    rows = []
+    for key, base in baseline.get("results", {}).items():
+        now = current.get("results", {}).get(key)
+        if not now or "median_s" not in base or "median_s" not in now:
+            continue
+        change = (now["median_s"] - base["median_s"]) / base["median_s"] if base["median_s"] else 0.0
+        status = "regression" if change > threshold else "improvement" if change < -threshold else "unchanged"
+        rows.append({"benchmark": key, "baseline_s": base["median_s"], "current_s": now["median_s"],
+                     "change": round(change, 4), "status": status})
+    return rows
+
+
+def _parse_args(argv: Optional[List[str]], with_baseline: bool) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark Horizon hot paths")
+    if with_baseline:
+        parser.add_argument("baseline", nargs="?", default=str(DEFAULT_BASELINE), help="Baseline JSON file")
+        parser.add_argument("current", nargs="?", help="Results JSON to compare (default: run the suite now)")
+        parser.add_argument("--threshold", type=float, default=0.15, help="Allowed slowdown before failing")
+    parser.add_argument("--benchmarks", nargs="*", choices=sorted(_BENCHMARKS), help="Benchmarks to run")
+    parser.add_argument("--sizes", nargs="*", choices=list(SIZES), help="Corpus sizes (default: 1k 10k 100k)")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per benchmark and size")
+    parser.add_argument("--save", help="Write results to this JSON file (e.g. a new baseline)")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the benchmark suite"""
+    args = _parse_args(argv, with_baseline=False)
+    print("🏁 Horizon hot-path benchmarks")
+    print("=" * 60)
+    results = run_suite(args.benchmarks or sorted(_BENCHMARKS), args.sizes or DEFAULT_SIZES, args.repeat)
+
+    if args.save:
+        Path(args.save).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\n💾 Results saved to {args.save}")
+    return 0
+
+
+def compare_main(argv: Optional[List[str]] = None) -> int:
+    """Compare a run against a baseline; exit non-zero on regressions"""
+    args = _parse_args(argv, with_baseline=True)
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+
+    if args.current:
+        with open(args.current, "r", encoding="utf-8") as f:
+            current = json.load(f)
+    else:
+        names = args.benchmarks or sorted({key.split("@")[0] for key in baseline["results"] if key.split("@")[0] in _BENCHMARKS})
+        sizes = args.sizes or baseline["meta"]["sizes"]
+        current = run_suite(names, sizes, args.repeat)
+        if args.save:
+            with open(args.save, "w", encoding="utf-8") as f:
+                json.dump(current, f, indent=2)
+
+    rows = compare(baseline, current, args.threshold)
+    print(f"\n📊 Comparison against {args.baseline} (threshold {args.threshold:.0%})")
+    print("=" * 60)
+    icons = {"regression": "❌", "improvement": "🚀", "unchanged": "✅"}
+    for row in rows:
+        print(f"{icons[row['status']]} {row['benchmark']}: {row['baseline_s'] * 1000:.2f}ms → "
+              f"{row['current_s'] * 1000:.2f}ms ({row['change']:+.1%})")
+
+    regressions = [row for row in rows if row["status"] == "regression"]
+    if regressions:
+        print(f"\n⚠️  {len(regressions)} regression(s) above {args.threshold:.0%}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+"""
+Import-time benchmark for Horizon modules and commands.
+
+Each module is imported in a fresh interpreter (``python -X importtime``) so that
+nothing is shared between measurements. Lightweight entry points must stay
+under the startup budget; heavy modules are reported for reference only.
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+# Modules behind fast commands (replay, email tester, DB queries) - must stay under budget
+FAST_MODULES = [
+    "horizon.config",
+    "horizon.main",
+    "horizon.utils.database",
+    "horizon.utils.metrics",
+    "horizon.utils.email_tester",
+]
+
+# Modules that legitimately pull in crewAI - measured for reference
+HEAVY_MODULES = [
+    "horizon.tools.startup_discovery_tools",
+    "horizon.crew",
+]
+
+
+def measure_import(module: str, repeat: int = 3) -> Dict[str, object]:
+    """Import `module` in fresh interpreters and report wall time and top self-time imports"""
+    wall_times = []
+    top_imports: List[Dict[str, object]] = []
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        completed = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            capture_output=True, text=True
+        )
+        wall_times.append(time.perf_counter() - start)
+
+        if completed.returncode != 0:
+            error = completed.stderr.strip().splitlines()[-1] if completed.stderr.strip() else "unknown error"
+            return {"module": module, "error": error}
+
+        top_imports = _parse_importtime(completed.stderr)
+
+    return {
+        "module": module,
+        "wall_time_s": round(statistics.median(wall_times), 4),
+        "min_wall_time_s": round(min(wall_times), 4),
+        "top_imports": top_imports[:10],
+    }
+
+
+def _parse_importtime(stderr: str) -> List[Dict[str, object]]:
+    """Parse `-X importtime` output into imports sorted by self time"""
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        try:
+            self_us, cumulative_us, name = [part.strip() for part in line[len("import time:"):].split("|")]
+            entries.append({"name": name, "self_ms": int(self_us) / 1000, "cumulative_ms": int(cumulative_us) / 1000})
+        except ValueError:
+            continue
+    entries.sort(key=lambda entry: entry["self_ms"], reverse=True)
+    return entries
+
+
+def main() -> int:
+    """Run the import-time benchmark; exit non-zero when a fast module exceeds the budget"""
+    parser = argparse.ArgumentParser(description="Measure import time of Horizon modules")
+    parser.add_argument("--modules", nargs="*", help="Modules to measure (default: fast and heavy sets)")
+    parser.add_argument("--repeat", type=int, default=3, help="Fresh interpreters per module")
+    parser.add_argument("--budget", type=float, default=1.0, help="Startup budget in seconds for fast modules")
+    parser.add_argument("--json", dest="json_path", help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    modules = args.modules or FAST_MODULES + HEAVY_MODULES
+    results = []
+    over_budget = []
+
+    print(f"⏱️  Import-time benchmark ({args.repeat} runs per module, budget {args.budget:.2f}s)")
+    print("=" * 60)
+
+    for module in modules:
+        result = measure_import(module, args.repeat)
+        results.append(result)
+
+        if "error" in result:
+            print(f"❌ {module}: {result['error']}")
+            continue
+
+        is_fast = module in FAST_MODULES
+        within_budget = result["wall_time_s"] <= args.budget
+        marker = "✅" if within_budget or not is_fast else "⚠️ "
+        print(f"{marker} {module}: {result['wall_time_s']:.3f}s")
+        for entry in result["top_imports"][:3]:
+            print(f"     {entry['name']}: {entry['self_ms']:.1f}ms self")
+
+        if is_fast and not within_budget:
+            over_budget.append(module)
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump({"budget_s": args.budget, "results": results}, f, indent=2)
+
+    if over_budget:
+        print(f"\n⚠️  Over budget: {', '.join(over_budget)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,6 +7,7 @@ class Config:
     OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "your-openai-api-key")
     
     RESEND_API_KEY=os.getenv("RESEND_API_KEY", "your-resend-api-key")
+    RESEND_FROM_EMAIL = os.getenv("RESEND_FROM_EMAIL", "noreply@yourdomain.com")
     
     # Target Countries for startup discovery
     TARGET_COUNTRIES = [
@@ -53,4 +54,121 @@ class Config:
         "funding_attractiveness": 0.15,
         "nvidia_alignment": 0.10,
         "traction": 0.10
-    }
\ No newline at end of file
+    }
+    
+    # Map-style execution: per-startup tasks fanned out over a worker pool
+    SHARDED_MODE = os.getenv("HORIZON_SHARDED", "false").lower() in ("1", "true", "yes")
+    SHARDED_TASKS = ["qualification_task", "funding_research_task"]
+    SHARD_SIZE = int(os.getenv("HORIZON_SHARD_SIZE", "1"))
+    SHARD_WORKERS = int(os.getenv("HORIZON_SHARD_WORKERS", "4"))
+    
+    # Only pass startups that are new or changed since the previous run to downstream tasks
+    DELTA_ONLY = os.getenv("HORIZON_DELTA_ONLY", "false").lower() in ("1", "true", "yes")
+    
+    # Per-run budgets (0 = unlimited); a single task may use TASK_BUDGET_SHARE of each
+    RUN_BUDGET = {
+        "wall_seconds": float(os.getenv("HORIZON_BUDGET_WALL_SECONDS", "3600")),
+        "searches": int(os.getenv("HORIZON_BUDGET_SEARCHES", "200")),
+        "scrapes": int(os.getenv("HORIZON_BUDGET_SCRAPES", "100")),
+        "tokens": int(os.getenv("HORIZON_BUDGET_TOKENS", "2000000")),
+    }
+    TASK_BUDGET_SHARE = float(os.getenv("HORIZON_TASK_BUDGET_SHARE", "0.5"))
+    # Used fraction at which runs issue fewer queries and keep only the top startups (and then the very top)
+    BUDGET_DEGRADE_AT = 0.7
+    BUDGET_CRITICAL_AT = 0.9
+    BUDGET_TOP_STARTUPS = 10
+    
+    # Recurring discovery scheduler: refresh interval per job type (hours), budgets and state file
+    SCHEDULER_REFRESH_HOURS = {"delta": 24, "venture": 72, "full": 168}
+    SCHEDULER_CONCURRENCY = int(os.getenv("HORIZON_SCHEDULER_CONCURRENCY", "1"))
+    SCHEDULER_MAX_RUNS_PER_HOUR = int(os.getenv("HORIZON_SCHEDULER_MAX_RUNS_PER_HOUR", "4"))
+    SCHEDULER_COUNTRY_COOLDOWN_HOURS = float(os.getenv("HORIZON_SCHEDULER_COUNTRY_COOLDOWN_HOURS", "2"))
+    SCHEDULER_STATE_PATH = os.getenv("HORIZON_SCHEDULER_STATE", "outputs/scheduler_state.json")
+    
+    # Startups kept on each materialized leaderboard (overall, per country, per sector)
+    LEADERBOARD_SIZE = int(os.getenv("HORIZON_LEADERBOARD_SIZE", "25"))
+    
+    # On-disk similarity index over startup descriptions (hashed TF-IDF dimensions, SimHash bits)
+    SIMILARITY_INDEX = os.getenv("HORIZON_SIMILARITY_INDEX", "true").lower() in ("1", "true", "yes")
+    SIMILARITY_DIMENSIONS = int(os.getenv("HORIZON_SIMILARITY_DIMENSIONS", "512"))
+    SIMILARITY_BITS = int(os.getenv("HORIZON_SIMILARITY_BITS", "256"))
+    
+    # Discovered startups are staged in chunks of this many candidates, then committed once per discovery call
+    DISCOVERY_CHUNK_SIZE = int(os.getenv("HORIZON_DISCOVERY_CHUNK_SIZE", "50"))
+    
+    # Newsletter delivery: Resend API (or a local stand-in), emails per batch request, sending threads,
+    # batch requests per second and retries on 429/5xx
+    RESEND_API_URL = os.getenv("HORIZON_RESEND_API_URL", "https://api.resend.com")
+    DELIVERY_BATCH_SIZE = int(os.getenv("HORIZON_DELIVERY_BATCH_SIZE", "100"))
+    DELIVERY_CONCURRENCY = int(os.getenv("HORIZON_DELIVERY_CONCURRENCY", "4"))
+    DELIVERY_RATE_PER_SECOND = float(os.getenv("HORIZON_DELIVERY_RATE", "2"))
+    DELIVERY_MAX_RETRIES = int(os.getenv("HORIZON_DELIVERY_MAX_RETRIES", "5"))
+    
+    # Rendered reports wait in an on-disk outbox until `deliver` sends them; failed attempts are
+    # retried after OUTBOX_RETRY_MINUTES (doubling) and dead-lettered after OUTBOX_MAX_ATTEMPTS
+    OUTBOX_DIR = os.getenv("HORIZON_OUTBOX_DIR", "outputs/outbox")
+    OUTBOX_MAX_ATTEMPTS = int(os.getenv("HORIZON_OUTBOX_MAX_ATTEMPTS", "6"))
+    OUTBOX_RETRY_MINUTES = float(os.getenv("HORIZON_OUTBOX_RETRY_MINUTES", "5"))
+    
+    # Rendered newsletter fragments (startup cards, report sections) kept on disk, up to FRAGMENT_CACHE_SIZE
+    # entries and FRAGMENT_CACHE_MAX_BYTES bytes; a size of 0 disables the cache
+    FRAGMENT_CACHE_PATH = os.getenv("HORIZON_FRAGMENT_CACHE", "outputs/fragment_cache.sqlite3")
+    FRAGMENT_CACHE_SIZE = int(os.getenv("HORIZON_FRAGMENT_CACHE_SIZE", "50000"))
+    FRAGMENT_CACHE_MAX_BYTES = int(os.getenv("HORIZON_FRAGMENT_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+    
+    # Report emails over EMAIL_MAX_BYTES (HTML + text; 0 = no limit) inline only the top
+    # EMAIL_INLINE_STARTUPS startups per section and attach the full data as gzipped CSV/JSONL
+    EMAIL_MAX_BYTES = int(os.getenv("HORIZON_EMAIL_MAX_BYTES", "100000"))
+    EMAIL_INLINE_STARTUPS = int(os.getenv("HORIZON_EMAIL_INLINE_STARTUPS", "20"))
+    EMAIL_PREVIEW_CHARS = int(os.getenv("HORIZON_EMAIL_PREVIEW_CHARS", "1000"))
+    EMAIL_ARCHIVE_DIR = os.getenv("HORIZON_EMAIL_ARCHIVE_DIR", "outputs/email_archives")
+    EMAIL_MAX_ATTACHMENT_BYTES = int(os.getenv("HORIZON_EMAIL_MAX_ATTACHMENT_BYTES", str(20 * 1024 * 1024)))
+    
+    # Shared HTTP client: per-host keep-alive pools, timeouts (seconds) and an on-disk store of
+    # responses for conditional GETs (HTTP_CACHE_SIZE entries; 0 disables it)
+    HTTP_POOL_HOSTS = int(os.getenv("HORIZON_HTTP_POOL_HOSTS", "32"))
+    HTTP_POOL_SIZE = int(os.getenv("HORIZON_HTTP_POOL_SIZE", "8"))
+    HTTP_CONNECT_TIMEOUT = float(os.getenv("HORIZON_HTTP_CONNECT_TIMEOUT", "5"))
+    HTTP_READ_TIMEOUT = float(os.getenv("HORIZON_HTTP_READ_TIMEOUT", "20"))
+    HTTP_USER_AGENT = os.getenv("HORIZON_HTTP_USER_AGENT", "Mozilla/5.0 (compatible; HorizonBot/0.1)")
+    HTTP_CACHE_PATH = os.getenv("HORIZON_HTTP_CACHE", "outputs/http_cache.sqlite3")
+    HTTP_CACHE_SIZE = int(os.getenv("HORIZON_HTTP_CACHE_SIZE", "5000"))
+    
+    # Embeddings of WebsiteSearchTool's RAG chunks, cached on disk by hash of model and text
+    # (EMBEDDING_CACHE_SIZE entries; 0 disables it). EMBEDDING_MODEL is "provider/model" for
+    # crewAI's embedding factory, or empty for the tool's default local all-MiniLM-L6-v2
+    EMBEDDING_MODEL = os.getenv("HORIZON_EMBEDDING_MODEL", "")
+    EMBEDDING_CACHE_PATH = os.getenv("HORIZON_EMBEDDING_CACHE", "outputs/embeddings.sqlite3")
+    EMBEDDING_CACHE_SIZE = int(os.getenv("HORIZON_EMBEDDING_CACHE_SIZE", "200000"))
+    
+    # Portfolio pages (parsed with a crawler.PARSERS parser) and sitemaps (company pages matching
+    # sitemap_pattern) per VC in LATAM_VCS; VCs without a public portfolio are left out. The VC's
+    # `country` or `region` (see VC_REGIONS) is recorded on its companies; VCs without one invest globally
+    VC_PORTFOLIO_SOURCES = {
+        "Kaszek Ventures": {"pages": ["https://www.kaszek.com/portfolio"], "parser": "cards",
+                            "region": "Latin America"},
+        "Monashees": {"pages": ["https://www.monashees.com/portfolio"], "country": "Brazil"},
+        "MAYA Capital": {"pages": ["https://www.maya.capital/portfolio"], "country": "Brazil"},
+        "QED Investors": {"pages": ["https://www.qedinvestors.com/portfolio"], "parser": "cards"},
+        "Riverwood Capital": {"pages": ["https://www.riverwoodcapital.com/portfolio"]},
+        "Andreessen Horowitz": {"pages": ["https://a16z.com/portfolio/"]},
+        "General Atlantic": {"sitemaps": ["https://www.generalatlantic.com/sitemap.xml"],
+                             "sitemap_pattern": r"/portfolio/[^/]+/?$"},
+        "Sequoia Capital": {"sitemaps": ["https://www.sequoiacap.com/sitemap.xml"],
+                            "sitemap_pattern": r"/companies/[^/]+/?$"},
+        "Battery Ventures": {"pages": ["https://www.battery.com/companies/"]},
+        "Insight Partners": {"sitemaps": ["https://www.insightpartners.com/sitemap.xml"],
+                             "sitemap_pattern": r"/portfolio/[^/]+/?$"},
+    }
+    VC_REGIONS = {"Latin America": TARGET_COUNTRIES}
+    VC_CRAWL_STATE_PATH = os.getenv("HORIZON_VC_CRAWL_STATE", "outputs/vc_portfolios.json")
+    VC_CRAWL_CONCURRENCY = int(os.getenv("HORIZON_VC_CRAWL_CONCURRENCY", "4"))
+    # Discovery skips its portfolio searches for VCs crawled more recently than this
+    VC_CRAWL_MAX_AGE_HOURS = float(os.getenv("HORIZON_VC_CRAWL_MAX_AGE_HOURS", "24"))
+    
+    # Local website checks (canonical URL, liveness, TLS) of discovered startups, cached for
+    # WEBSITE_CHECK_TTL_HOURS and handed to the validation task instead of scraping each site
+    WEBSITE_CHECKS = os.getenv("HORIZON_WEBSITE_CHECKS", "true").lower() in ("1", "true", "yes")
+    WEBSITE_CHECK_CACHE = os.getenv("HORIZON_WEBSITE_CHECK_CACHE", "outputs/website_checks.json")
+    WEBSITE_CHECK_CONCURRENCY = int(os.getenv("HORIZON_WEBSITE_CHECK_CONCURRENCY", "32"))
+    WEBSITE_CHECK_TTL_HOURS = float(os.getenv("HORIZON_WEBSITE_CHECK_TTL_HOURS", "24"))
@@ -0,0 +1,411 @@
+#!/usr/bin/env python
+"""
+Incremental crawler for the portfolio pages of Config.LATAM_VCS.
+
+Each VC in Config.VC_PORTFOLIO_SOURCES lists portfolio pages (parsed with a
+per-site parser) and/or sitemaps (company pages matched by a URL pattern).
+Pages are fetched through the shared HTTP client, so an unchanged page costs
+a conditional request answered with a 304; pages that do come back are
+compared by content hash before being parsed. Companies that weren't in the
+VC's portfolio before go straight into the StartupDB, tagged with the VC's
+country or region. Discovery skips its portfolio searches for VCs covering the
+target country that were crawled within VC_CRAWL_MAX_AGE_HOURS, and reports
+their stored companies instead.
+
+    crawl_portfolios                      # crawl every configured VC
+    crawl_portfolios --vc "Kaszek Ventures"
+    crawl_portfolios --status
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from urllib.parse import urljoin, urlsplit
+from urllib.robotparser import RobotFileParser
+from xml.etree import ElementTree
+
+from .config import Config
+from .utils.events import events
+
+# Links that never point at a portfolio company
+SKIP_DOMAINS = ("linkedin.com", "twitter.com", "x.com", "facebook.com", "instagram.com", "youtube.com",
+                "medium.com", "github.com", "crunchbase.com", "apple.com", "google.com", "tiktok.com",
+                "glassdoor.com", "wa.me", "t.me", "spotify.com", "vimeo.com")
+SKIP_NAMES = frozenset(["read more", "learn more", "visit website", "website", "visit", "portfolio", "more",
+                        "see more", "view", "view all", "home", "about", "contact", "team", "news", "blog",
+                        "careers", "privacy policy", "terms", "cookie policy"])
+CARD_CLASS = re.compile(r"portfolio|compan|startup|investment", re.IGNORECASE)
+NAME_CLASS = re.compile(r"name|title", re.IGNORECASE)
+WHITESPACE = re.compile(r"\s+")
+SITEMAP_NS = "{http://www.sitemaps.org/schemas/sitemap/0.9}"
+MAX_SITEMAP_DEPTH = 2
+# A card parser that finds fewer companies than this falls back to outbound links
+MIN_CARDS = 3
+
+
+def _domain(url: str) -> str:
+    host = urlsplit(url).netloc.lower().split(":")[0]
+    return host[4:] if host.startswith("www.") else host
+
+
+def _clean_name(text: Optional[str]) -> Optional[str]:
+    name = WHITESPACE.sub(" ", text or "").strip(" |-–·")
+    if not 2 <= len(name) <= 60 or name.lower() in SKIP_NAMES:
+        return None
+    return name
+
+
+def _outbound(href: Optional[str], page_url: str) -> Optional[str]:
+    """Absolute URL of a link leaving the VC's site, or None"""
+    if not href or href.startswith(("#", "mailto:", "tel:", "javascript:")):
+        return None
+    url = urljoin(page_url, href)
+    domain = _domain(url)
+    if not url.startswith("http") or domain == _domain(page_url):
+        return None
+    if any(domain == skip or domain.endswith("." + skip) for skip in SKIP_DOMAINS):
+        return None
+    return url
+
+
+def _soup(html: str):
+    from bs4 import BeautifulSoup
+    return BeautifulSoup(html, "html.parser")
+
+
+def parse_cards(html: str, page_url: str) -> Iterator[Dict[str, str]]:
+    """Portfolio cards: elements with a portfolio-ish class holding a name and an outbound link"""
+    for card in _soup(html).find_all(class_=CARD_CLASS):
+        name_element = card.find(["h1", "h2", "h3", "h4", "h5", "h6"]) or card.find(class_=NAME_CLASS)
+        name = _clean_name(name_element.get_text(" ") if name_element else None)
+        if name is None:
+            image = card.find("img", alt=True)
+            name = _clean_name(image["alt"] if image else None)
+        website = next((url for url in (_outbound(a.get("href"), page_url) for a in card.find_all("a", href=True))
+                        if url), None)
+        if name and (website or name_element is not None):
+            yield {"name": name, "website": website or ""}
+
+
+def parse_links(html: str, page_url: str) -> Iterator[Dict[str, str]]:
+    """Every outbound link, named by its text, image alt text or title"""
+    for link in _soup(html).find_all("a", href=True):
+        website = _outbound(link["href"], page_url)
+        if website is None:
+            continue
+        image = link.find("img", alt=True)
+        name = (_clean_name(link.get_text(" ")) or _clean_name(image["alt"] if image else None)
+                or _clean_name(link.get("title")))
+        if name:
+            yield {"name": name, "website": website}
+
+
+def parse_auto(html: str, page_url: str) -> Iterator[Dict[str, str]]:
+    """Cards when the page has them, outbound links otherwise"""
+    cards = list(parse_cards(html, page_url))
+    return iter(cards) if len(cards) >= MIN_CARDS else parse_links(html, page_url)
+
+
+PARSERS: Dict[str, Callable[[str, str], Iterator[Dict[str, str]]]] = {
+    "auto": parse_auto,
+    "cards": parse_cards,
+    "links": parse_links,
+}
+
+
+def parse_sitemap(xml: str) -> Dict[str, List[str]]:
+    """Page and child-sitemap URLs of a sitemap or sitemap index"""
+    root = ElementTree.fromstring(xml)
+    locs = [loc.text.strip() for loc in root.iter(f"{SITEMAP_NS}loc") if loc.text]
+    if root.tag == f"{SITEMAP_NS}sitemapindex":
+        return {"pages": [], "sitemaps": locs}
+    return {"pages": locs, "sitemaps": []}
+
+
+def company_from_slug(url: str) -> Optional[str]:
+    """Company name from the last path segment of a portfolio page URL"""
+    slug = urlsplit(url).path.rstrip("/").rsplit("/", 1)[-1]
+    return _clean_name(slug.replace("-", " ").replace("_", " ").title())
+
+
+def source_countries(source: Dict[str, Any]) -> List[str]:
+    """Target countries a VC invests in: its `country`, or every country of its `region`"""
+    if source.get("country"):
+        return [source["country"]]
+    return list(Config.VC_REGIONS.get(source.get("region", ""), []))
+
+
+def portfolio_record(vc: str, company: Dict[str, str]) -> Dict[str, Any]:
+    """StartupDB record of a crawled portfolio company; only a single-country VC's companies get a country"""
+    return {
+        "name": company["name"],
+        "website": company.get("website", ""),
+        "description": f"Portfolio company of {vc}",
+        "milestones": f"Backed by {vc}",
+        "country": company.get("country", ""),
+        "location": company.get("region", ""),
+        "source_url": company.get("page") or company.get("source_url", ""),
+    }
+
+
+class PortfolioCrawler:
+    """Crawls VC portfolio pages incrementally and feeds new companies into a StartupDB"""
+
+    def __init__(self, db=None, client=None, state_path: Optional[str] = None,
+                 sources: Optional[Dict[str, Dict[str, Any]]] = None):
+        from .utils.http import get_http_client
+
+        self.db = db
+        self.client = client or get_http_client()
+        self.state_path = Path(state_path or Config.VC_CRAWL_STATE_PATH)
+        self.sources = sources if sources is not None else Config.VC_PORTFOLIO_SOURCES
+        self.state: Dict[str, Dict[str, Any]] = self._load()
+        self._robots: Dict[str, Optional[RobotFileParser]] = {}
+        self._lock = threading.Lock()
+        self._robots_lock = threading.Lock()
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save(self) -> None:
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.state_path.with_suffix(self.state_path.suffix + ".tmp")
+        with self._lock, open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.state_path)
+
+    def _allowed(self, url: str) -> bool:
+        """robots.txt check, with one (cached) fetch per host"""
+        parts = urlsplit(url)
+        origin = f"{parts.scheme}://{parts.netloc}"
+        with self._robots_lock:
+            if origin not in self._robots:
+                robots = None
+                try:
+                    response = self.client.get(f"{origin}/robots.txt")
+                    if response.ok:
+                        robots = RobotFileParser()
+                        robots.parse(response.text.splitlines())
+                except Exception:
+                    pass
+                self._robots[origin] = robots
+            robots = self._robots[origin]
+        return robots is None or robots.can_fetch(Config.HTTP_USER_AGENT, url)
+
+    def _fetch(self, url: str, hashes: Dict[str, str]) -> Optional[str]:
+        """Page text when it changed since the last crawl, None when it didn't"""
+        # Without a recorded hash (first crawl, or lost state) the page must be parsed, so no 304
+        response = self.client.get(url, conditional=url in hashes)
+        if not response.ok:
+            raise RuntimeError(f"HTTP {response.status}")
+        if response.revalidated or response.from_cache:
+            return None
+        digest = hashlib.sha1(response.content).hexdigest()
+        if hashes.get(url) == digest:
+            return None
+        hashes[url] = digest
+        return response.text
+
+    def _sitemap_companies(self, sitemap_url: str, pattern: re.Pattern, hashes: Dict[str, str],
+                           recorded: Dict[str, Dict[str, List[str]]], tree: Dict[str, Dict[str, List[str]]],
+                           depth: int = 0) -> Tuple[Set[str], bool]:
+        """Company page URLs under a sitemap, and whether any sitemap in it was re-parsed.
+        
+        An unchanged sitemap keeps the pages and child sitemaps `recorded` for it by the last
+        crawl; its children are still checked, since they change independently of their index.
+        Every visited sitemap is recorded in `tree` for the next crawl.
+        """
+        if not self._allowed(sitemap_url):
+            return set(), False
+        if sitemap_url not in recorded:
+            hashes.pop(sitemap_url, None)  # nothing to carry over (state from an older crawler), so parse it
+        xml = self._fetch(sitemap_url, hashes)
+        reparsed = xml is not None
+        if reparsed:
+            entries = parse_sitemap(xml)
+            entry = {"pages": [url for url in entries["pages"] if pattern.search(url)],
+                     "sitemaps": entries["sitemaps"] if depth < MAX_SITEMAP_DEPTH else []}
+        else:
+            entry = recorded[sitemap_url]
+        tree[sitemap_url] = entry
+        found = set(entry["pages"])
+        for child in entry["sitemaps"]:
+            if child not in tree:
+                pages, child_reparsed = self._sitemap_companies(child, pattern, hashes, recorded, tree, depth + 1)
+                found |= pages
+                reparsed = reparsed or child_reparsed
+        return found, reparsed
+
+    def crawl_source(self, vc: str, source: Dict[str, Any]) -> Dict[str, Any]:
+        """Crawl one VC; returns its outcome and the companies that are new to its portfolio"""
+        state = self.state.get(vc, {})
+        hashes = dict(state.get("hashes", {}))
+        companies: Dict[str, Dict[str, str]] = dict(state.get("companies", {}))
+        recorded_sitemaps = state.get("sitemaps", {})
+        sitemaps: Dict[str, Dict[str, List[str]]] = {}
+        parser = PARSERS[source.get("parser", "auto")]
+        located = {key: source[key] for key in ("country", "region") if source.get(key)}
+        changed = False
+        fetched = 0
+        seen: Dict[str, Dict[str, str]] = {}
+
+        for page_url in source.get("pages", []):
+            if not self._allowed(page_url):
+                continue
+            fetched += 1
+            html = self._fetch(page_url, hashes)
+            if html is None:
+                # Unchanged page: its companies are still the ones recorded last time
+                seen.update({key: c for key, c in companies.items() if c.get("source_url") == page_url})
+                continue
+            changed = True
+            for company in parser(html, page_url):
+                seen.setdefault(company["name"].lower(), dict(company, source_url=page_url, **located))
+
+        pattern = re.compile(source.get("sitemap_pattern", r"/portfolio/[^/]+/?$"))
+        for sitemap_url in source.get("sitemaps", []):
+            if not self._allowed(sitemap_url):
+                continue
+            fetched += 1
+            pages, reparsed = self._sitemap_companies(sitemap_url, pattern, hashes, recorded_sitemaps, sitemaps)
+            changed = changed or reparsed
+            # Pages of unchanged child sitemaps are carried over, so only re-parsed ones can drop companies
+            for page in sorted(pages):
+                name = company_from_slug(page)
+                if name:
+                    seen.setdefault(name.lower(), {"name": name, "website": "", "source_url": sitemap_url,
+                                                   "page": page, **located})
+
+        if not fetched:
+            raise RuntimeError("every portfolio page is disallowed by robots.txt")
+        added = [c for key, c in seen.items() if key not in companies]
+        removed = [c["name"] for key, c in companies.items() if key not in seen]
+        with self._lock:
+            self.state[vc] = {"hashes": hashes, "companies": seen if changed else companies,
+                              "sitemaps": sitemaps, "countries": source_countries(source),
+                              "crawled_at": time.time()}
+        return {"vc": vc, "changed": changed, "companies": len(seen), "added": added, "removed": removed}
+
+    def crawl(self, vcs: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Crawl the given VCs (default: every configured one) in parallel and store new companies"""
+        from .utils.database import DEFAULT_DB_PATH, StartupDB, StartupSink
+
+        names = [vc for vc in (vcs or self.sources) if self.sources.get(vc)]
+        started = time.monotonic()
+        outcomes = []
+
+        def crawl_one(vc: str) -> Dict[str, Any]:
+            try:
+                outcome = self.crawl_source(vc, self.sources[vc])
+            except Exception as e:
+                events.error("crawl.error", f"❌ {vc}: {e}", vc=vc, error=f"{e.__class__.__name__}: {e}")
+                return {"vc": vc, "error": str(e), "changed": False, "companies": 0, "added": [], "removed": []}
+            events.emit("crawl.source", f"🕸️  {vc}: {'changed' if outcome['changed'] else 'unchanged'}, "
+                        f"{outcome['companies']} companies, {len(outcome['added'])} new",
+                        vc=vc, changed=outcome["changed"], companies=outcome["companies"],
+                        added=len(outcome["added"]), removed=len(outcome["removed"]))
+            return outcome
+
+        with ThreadPoolExecutor(max_workers=max(1, Config.VC_CRAWL_CONCURRENCY),
+                                thread_name_prefix="horizon-crawl") as pool:
+            outcomes = list(pool.map(crawl_one, names))
+
+        db = self.db or StartupDB(DEFAULT_DB_PATH)
+        with StartupSink(db) as sink:
+            for outcome in outcomes:
+                sink.extend(portfolio_record(outcome["vc"], company) for company in outcome["added"])
+        self.save()
+
+        summary = {
+            "vcs": len(names),
+            "changed": sum(1 for outcome in outcomes if outcome["changed"]),
+            "errors": sum(1 for outcome in outcomes if outcome.get("error")),
+            "new_companies": sink.received,
+            "added_to_db": sink.added,
+            "duration_s": round(time.monotonic() - started, 3),
+        }
+        events.emit("crawl.end", f"🕸️  Crawled {summary['vcs']} VC portfolios ({summary['changed']} changed): "
+                    f"{summary['new_companies']} new portfolio companies, {summary['added_to_db']} new to the database",
+                    **summary)
+        return summary
+
+
+def _fresh_entries(max_age_hours: Optional[float], state_path: Optional[str],
+                   country: Optional[str]) -> Dict[str, Dict[str, Any]]:
+    max_age = 3600 * (Config.VC_CRAWL_MAX_AGE_HOURS if max_age_hours is None else max_age_hours)
+    try:
+        with open(state_path or Config.VC_CRAWL_STATE_PATH, "r", encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    now = time.time()
+    # State from before countries were recorded matches no country, so those VCs are still searched
+    return {vc: entry for vc, entry in state.items() if now - entry.get("crawled_at", 0) <= max_age
+            and (country is None or country in entry.get("countries", []))}
+
+
+def fresh_portfolios(max_age_hours: Optional[float] = None, state_path: Optional[str] = None,
+                     country: Optional[str] = None) -> Set[str]:
+    """VCs whose portfolio was crawled within `max_age_hours` (default Config.VC_CRAWL_MAX_AGE_HOURS),
+    only those investing in `country` when given"""
+    return set(_fresh_entries(max_age_hours, state_path, country))
+
+
+def portfolio_companies(vcs: Iterable[str], country: str, max_age_hours: Optional[float] = None,
+                        state_path: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """StartupDB records of the companies last crawled for `vcs`, when they are fresh and invest in `country`.
+    
+    Companies known to be in another country are left out; those of a regional VC keep an empty country.
+    """
+    entries = _fresh_entries(max_age_hours, state_path, country)
+    for vc in vcs:
+        for company in entries.get(vc, {}).get("companies", {}).values():
+            if company.get("country", country) == country:
+                yield portfolio_record(vc, company)
+
+
+def print_status(crawler: PortfolioCrawler) -> None:
+    print(f"🕸️  VC portfolio crawl state ({crawler.state_path})")
+    print("=" * 60)
+    for vc in Config.LATAM_VCS:
+        entry = crawler.state.get(vc)
+        if not crawler.sources.get(vc):
+            print(f"{vc:<24} no portfolio source configured")
+        elif entry is None:
+            print(f"{vc:<24} never crawled")
+        else:
+            crawled = datetime.fromtimestamp(entry["crawled_at"]).strftime("%Y-%m-%d %H:%M")
+            print(f"{vc:<24} {len(entry.get('companies', {})):>4} companies, crawled {crawled}")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Incrementally crawl the portfolio pages of the LatAm VCs")
+    parser.add_argument("--vc", action="append", help="crawl only this VC (repeatable)")
+    parser.add_argument("--state", default=None, help=f"crawl state file (default {Config.VC_CRAWL_STATE_PATH})")
+    parser.add_argument("--status", action="store_true", help="print what was crawled when and exit")
+    args = parser.parse_args(sys.argv[1:] if argv is None else argv)
+
+    crawler = PortfolioCrawler(state_path=args.state)
+    if args.status:
+        print_status(crawler)
+        return
+    unknown = [vc for vc in args.vc or [] if vc not in crawler.sources]
+    if unknown:
+        parser.error(f"no portfolio source configured for: {', '.join(unknown)}")
+    crawler.crawl(args.vc)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,8 +3,9 @@ from crewai import Agent, Crew, Process, Task
 from crewai.project import CrewBase, agent, crew, task
 from crewai.agents.agent_builder.base_agent import BaseAgent
 from typing import List, Dict, Any, Optional
+from pydantic import Field
 import json
-import pandas as pd
+import time
 from datetime import datetime
 
 # Import our custom tools
@@ -13,6 +14,85 @@ from .tools.startup_discovery_tools import (
     LinkedInSearchTool, scrape_tool, website_search_tool
 )
 from .config import Config
+from .models import (
+    CONTEXT_FIELDS, TASK_OUTPUT_MODELS, compact_output, dumps_compact, output_data, project_record,
+    replace_startups, startup_records,
+)
+from .utils.budget import budget
+from .utils.cassette import cassette_llm, get_cassette
+from .utils.changeset import Changeset
+from .utils.events import events
+from .utils.export import ConsolidatedReportWriter, StreamingRunExporter
+from .utils.profiling import profiler
+from .utils.metrics import agent_token_usage, install_crewai_listeners, metrics, usage_to_dict
+from .utils.sharding import make_shards, records_for_shard, run_shards
+from .utils.websites import WebsiteChecker
+
+def keep_top_startups(startups: List[Dict[str, Any]], limit: int) -> List[Dict[str, Any]]:
+    """The `limit` best startups (see scoring.rank_startups), in their original order"""
+    if limit >= len(startups):
+        return startups
+    from .utils.scoring import rank_startups  # NumPy only when degrading
+    return [startups[i] for i in sorted(rank_startups(startups, limit))]
+
+
+def skipped_output(task: Task, reason: str, agent=None):
+    """Output of a task that finished without calling the LLM: no startups, and why"""
+    from crewai.tasks.task_output import TaskOutput
+    
+    payload = {"startups": [], "skipped": reason}
+    return TaskOutput(
+        name=task.name,
+        description=task.description,
+        expected_output=task.expected_output,
+        raw=json.dumps(payload),
+        json_dict=payload,
+        agent=getattr(agent or task.agent, 'role', ''),
+    )
+
+
+class CompactContextTask(Task):
+    """Task that receives upstream outputs as compact JSON trimmed to the fields it declares"""
+    
+    context_fields: Dict[str, List[str]] = Field(
+        default_factory=dict,
+        description="Upstream task name -> fields of its output this task needs",
+    )
+    
+    def compact_context(self) -> Optional[str]:
+        """Build the context string from the declared upstream fields only"""
+        if not self.context_fields or not isinstance(self.context, list):
+            return None
+        
+        sections = []
+        for upstream_task in self.context:
+            fields = self.context_fields.get(upstream_task.name)
+            if fields is None or upstream_task.output is None:
+                continue
+            compact = compact_output(upstream_task.output, fields)
+            if isinstance(compact, list):
+                # Under budget pressure, only the top-ranked startups go downstream
+                compact = keep_top_startups(compact, budget.top_startups(len(compact)))
+            sections.append(f"{upstream_task.name}: {dumps_compact(compact)}")
+        return "\n".join(sections)
+    
+    def execute_sync(self, agent=None, context: Optional[str] = None, tools=None):
+        budget.start_task(self.name)
+        events.emit("task.start", task=self.name)
+        if budget.level() == "exhausted":
+            return self._skip_for_budget(agent)
+        compact = self.compact_context()
+        with profiler.phase(self.name):
+            return super().execute_sync(agent=agent, context=compact if compact is not None else context, tools=tools)
+    
+    def _skip_for_budget(self, agent=None):
+        """Finish without calling the LLM once the run budget is spent"""
+        events.emit("task.skipped", f"⏭️  Budget exhausted, skipping {self.name}", task=self.name, reason="budget")
+        self.output = skipped_output(self, "budget exhausted", agent)
+        if self.callback:
+            self.callback(self.output)
+        return self.output
+
 
 @CrewBase
 class Horizon():
@@ -23,7 +103,8 @@ class Horizon():
     
     def __init__(self):
         super().__init__()
-        # Initialize custom tools
+        # Initialize custom tools (cheap: the built-in tools and the startup
+        # database are only constructed when a tool first runs)
         self.startup_discovery_tool = StartupDiscoveryTool()
         self.company_analysis_tool = CompanyAnalysisTool()
         self.funding_research_tool = FundingResearchTool()
@@ -37,6 +118,20 @@ class Horizon():
         
         # Storage for results
         self.results_storage = {}
+        
+        # Per-task metric marks (elapsed time and token usage at the last task boundary)
+        self._task_mark = time.monotonic()
+        self._token_mark: Dict[str, int] = {}
+        
+        # Streaming writer for the artifacts of the run in progress
+        self._exporter: Optional[StreamingRunExporter] = None
+        
+        # Change-data-capture: database records at run start and the run's changeset
+        self._baseline: Dict[str, Dict[str, Any]] = {}
+        self._delta_only = False
+        self.changeset: Optional[Changeset] = None
+        self._discovered_startups: List[Dict[str, Any]] = []
+        install_crewai_listeners(metrics)
 
     # =============================================================================
     # CrewAI Framework Methods (Agents, Tasks, Crew)
@@ -49,7 +144,8 @@ class Horizon():
             config=self.agents_config['discovery_agent'],
             tools=self.discovery_tools,
             verbose=True,
-            allow_delegation=False
+            allow_delegation=False,
+            **self._llm_args()
         )
 
     @agent
@@ -59,7 +155,8 @@ class Horizon():
             config=self.agents_config['qualification_agent'],
             tools=self.analysis_tools,
             verbose=True,
-            allow_delegation=False
+            allow_delegation=False,
+            **self._llm_args()
         )
     
     @agent
@@ -69,7 +166,8 @@ class Horizon():
             config=self.agents_config['funding_intelligence_agent'],
             tools=self.research_tools,
             verbose=True,
-            allow_delegation=False
+            allow_delegation=False,
+            **self._llm_args()
         )
     
     @agent
@@ -79,7 +177,8 @@ class Horizon():
             config=self.agents_config['leadership_scout_agent'],
             tools=self.research_tools,
             verbose=True,
-            allow_delegation=False
+            allow_delegation=False,
+            **self._llm_args()
         )
     
     @agent
@@ -89,7 +188,8 @@ class Horizon():
             config=self.agents_config['market_intelligence_agent'],
             tools=self.market_tools,
             verbose=True,
-            allow_delegation=False
+            allow_delegation=False,
+            **self._llm_args()
         )
     
     @agent
@@ -99,55 +199,59 @@ class Horizon():
             config=self.agents_config['validation_agent'],
             tools=[scrape_tool, website_search_tool],
             verbose=True,
-            allow_delegation=False
+            allow_delegation=False,
+            **self._llm_args()
         )
 
     @task
     def discovery_task(self) -> Task:
         """Discover AI startups in target country"""
-        return Task(
-            config=self.tasks_config['discovery_task'],
-            output_file='discovered_startups.json'
-        )
+        return self._structured_task('discovery_task', 'discovered_startups.json')
 
     @task
     def qualification_task(self) -> Task:
         """Analyze and qualify discovered startups"""
-        return Task(
-            config=self.tasks_config['qualification_task'],
-            output_file='startup_qualifications.json'
-        )
+        return self._structured_task('qualification_task', 'startup_qualifications.json')
     
     @task
     def funding_research_task(self) -> Task:
         """Research funding information for qualified startups"""
-        return Task(
-            config=self.tasks_config['funding_research_task'],
-            output_file='funding_analysis.json'
-        )
+        return self._structured_task('funding_research_task', 'funding_analysis.json')
     
     @task
     def leadership_research_task(self) -> Task:
         """Research technical leadership for startups"""
-        return Task(
-            config=self.tasks_config['leadership_research_task'],
-            output_file='leadership_profiles.json'
-        )
+        return self._structured_task('leadership_research_task', 'leadership_profiles.json')
     
     @task
     def market_analysis_task(self) -> Task:
         """Analyze market trends and ecosystem"""
-        return Task(
-            config=self.tasks_config['market_analysis_task'],
-            output_file='market_analysis.json'
-        )
+        return self._structured_task('market_analysis_task', 'market_analysis.json')
     
     @task
     def validation_and_scoring_task(self) -> Task:
         """Validate data and create comprehensive scoring"""
-        return Task(
-            config=self.tasks_config['validation_and_scoring_task'],
-            output_file='validated_startup_database.json'
+        return self._structured_task('validation_and_scoring_task', 'validated_startup_database.json')
+
+    def _llm_args(self) -> Dict[str, Any]:
+        """Route agent LLM calls through the cassette when recording or replaying"""
+        if get_cassette().mode == "off":
+            return {}
+        return {'llm': cassette_llm()}
+    
+    def _structured_task(self, task_name: str, output_file: str) -> Task:
+        """Build a task with a typed output and a compact context of the upstream fields it declares"""
+        context_fields = CONTEXT_FIELDS.get(task_name, {})
+        optional_args = {}
+        if context_fields:
+            optional_args['context'] = [getattr(self, upstream)() for upstream in context_fields]
+        
+        return CompactContextTask(
+            config=self.tasks_config[task_name],
+            output_file=output_file,
+            output_pydantic=TASK_OUTPUT_MODELS[task_name],
+            context_fields=context_fields,
+            **optional_args
         )
 
     @crew
@@ -158,20 +262,25 @@ class Horizon():
             tasks=self.tasks,
             process=Process.sequential,
             verbose=True,
+            task_callback=self._on_task_complete,
         )
 
     # =============================================================================
     # Business Logic Methods (Discovery Operations)
     # =============================================================================
     
-    def discover_country(self, country: str, specific_ventures: Optional[List[str]] = None) -> Dict[str, Any]:
-        """Run complete startup discovery for a specific country"""
+    def discover_country(self, country: str, specific_ventures: Optional[List[str]] = None,
+                         sharded: Optional[bool] = None, delta_only: Optional[bool] = None) -> Dict[str, Any]:
+        """Run complete startup discovery for a specific country.
         
-        print(f"\nStarting AI Startup Discovery for {country}")
-        print(f"Target: NVIDIA Inception Program Candidates")
+        With `delta_only`, tasks after discovery only see startups that are new or
+        changed since the previous run.
+        """
         
-        if specific_ventures:
-            print(f"📋 Specific ventures to research: {', '.join(specific_ventures)}")
+        if sharded is None:
+            sharded = Config.SHARDED_MODE
+        if delta_only is None:
+            delta_only = Config.DELTA_ONLY
         
         # Prepare inputs for the crew
         inputs = {
@@ -183,34 +292,76 @@ class Horizon():
             'specific_ventures': ', '.join(specific_ventures) if specific_ventures else self._get_config_value('LATAM_VCS', 'Major venture capital firm portfolios (Kaszek, Monashees, MAYA Capital)'),
         }
         
+        metrics.reset(run_id=datetime.now().strftime("%Y%m%d_%H%M%S"), labels={"country": country})
+        budget.reset(Config.RUN_BUDGET, task_share=Config.TASK_BUDGET_SHARE, degrade_at=Config.BUDGET_DEGRADE_AT,
+                     critical_at=Config.BUDGET_CRITICAL_AT, top_startups=Config.BUDGET_TOP_STARTUPS)
+        self._task_mark = time.monotonic()
+        self._token_mark = {}
+        self._exporter = self._open_exporter(country)
+        events.open(os.path.join(os.path.dirname(self._exporter.base_filename), "events.jsonl"), run_id=metrics.run_id)
+        events.emit("run.start", f"\nStarting AI Startup Discovery for {country}\nTarget: NVIDIA Inception Program Candidates",
+                    country=country, sharded=sharded, delta_only=delta_only, ventures=specific_ventures or [])
+        if specific_ventures:
+            events.log(f"📋 Specific ventures to research: {', '.join(specific_ventures)}")
+        profiler.start(os.path.dirname(self._exporter.base_filename))
+        
+        # Snapshot before the crew runs: the discovery tools write to the database during the run
+        db = self.startup_discovery_tool._get_db()
+        self._baseline = db.snapshot()
+        self._delta_only = delta_only
+        self.changeset = None
+        self._discovered_startups = []
+        
         try:
             # Execute the crew
-            crew_results = self.crew().kickoff(inputs=inputs)
+            if sharded:
+                crew_results = self._kickoff_sharded(inputs)
+            else:
+                crew_results = self.crew().kickoff(inputs=inputs)
+            metrics.set_totals(getattr(crew_results, 'token_usage', None))
             
             # Process and store results
             processed_results = self._process_crew_results(crew_results, country)
+            if self.changeset is not None:
+                processed_results['changeset'] = self.changeset.to_dict()
+                # Record this run's discoveries so the next run diffs against them
+                db.upsert_startups(self._discovered_startups)
             self.results_storage[country] = processed_results
             
-            # Export results
-            self._export_to_formats(processed_results, country)
+            # Export results (task outputs were streamed as they completed)
+            with profiler.phase("export"):
+                self._export_to_formats(processed_results, country, exporter=self._exporter)
             
-            print(f"✅ Successfully completed discovery for {country}")
+            events.emit("run.end", f"✅ Successfully completed discovery for {country}", country=country,
+                        status="success", duration_s=round(metrics.elapsed(), 3), tokens=metrics.totals,
+                        changeset=self.changeset.counts() if self.changeset is not None else None,
+                        budget=budget.snapshot())
             return processed_results
             
         except Exception as e:
             error_msg = f"❌ Error processing {country}: {str(e)}"
-            print(error_msg)
+            events.emit("run.end", error_msg, level="error", country=country, status="error",
+                        error=f"{e.__class__.__name__}: {e}", duration_s=round(metrics.elapsed(), 3))
+            # Keep whatever was streamed before the failure
+            self._exporter.close(self._summary_report_footer(self._exporter.base_filename, error=error_msg))
             self.results_storage[country] = {"error": error_msg}
             return {"error": error_msg}
+        
+        finally:
+            self._exporter = None
+            for profile_file in profiler.stop():
+                events.log(f"   - Profile: {profile_file}", artifact=profile_file)
+            events.close()
     
     def discover_multiple_countries(self, countries: List[str], 
                                    specific_ventures_per_country: Optional[Dict[str, List[str]]] = None) -> Dict[str, Any]:
         """Run discovery for multiple countries"""
         
-        print("🌎 Starting Multi-Country AI Startup Discovery")
-        print(f"📍 Target Countries: {', '.join(countries)}")
+        events.log(f"🌎 Starting Multi-Country AI Startup Discovery\n📍 Target Countries: {', '.join(countries)}",
+                   countries=countries)
         
         all_results = {}
+        consolidated_report = self._open_consolidated_report()
         
         for country in countries:
             specific_ventures = None
@@ -219,13 +370,14 @@ class Horizon():
             
             result = self.discover_country(country, specific_ventures)
             all_results[country] = result
+            consolidated_report.add_country(country, result)
             
             # Add delay between countries to be respectful to APIs
             import time
             time.sleep(30)  # 30 second delay between countries
         
-        # Create consolidated report
-        self._create_consolidated_report(all_results)
+        # Finish consolidated report
+        self._close_consolidated_report(consolidated_report)
         
         return all_results
 
@@ -242,14 +394,291 @@ class Horizon():
             return str(attr_value)
         return default_value
     
+    def _kickoff_sharded(self, inputs: Dict[str, Any]):
+        """Run the pipeline with per-startup fan-out for the tasks in Config.SHARDED_TASKS.
+        
+        Consecutive regular tasks still run as a sequential crew; each of them is given
+        every earlier task as context, so downstream tasks see the merged shard results.
+        """
+        from crewai.crews.crew_output import CrewOutput
+        from crewai.types.usage_metrics import UsageMetrics
+        
+        self.crew()  # Instantiates self.agents and self.tasks in declaration order
+        
+        tasks_output = []
+        token_usage: Dict[str, int] = {}
+        completed: List[Task] = []
+        pending: List[Task] = []
+        
+        def add_usage(usage: Dict[str, int]) -> None:
+            for key, value in usage.items():
+                token_usage[key] = token_usage.get(key, 0) + value
+        
+        def run_pending() -> None:
+            if not pending:
+                return
+            if completed:
+                for i, pending_task in enumerate(pending):
+                    if not isinstance(pending_task.context, list):
+                        pending_task.context = completed + pending[:i]
+            agents = list({id(t.agent): t.agent for t in pending}.values())
+            segment_results = Crew(
+                agents=agents,
+                tasks=list(pending),
+                process=Process.sequential,
+                verbose=True,
+                task_callback=self._on_task_complete,
+            ).kickoff(inputs=inputs)
+            tasks_output.extend(segment_results.tasks_output)
+            add_usage(usage_to_dict(getattr(segment_results, 'token_usage', None)))
+            completed.extend(pending)
+            pending.clear()
+        
+        for task_instance in self.tasks:
+            if task_instance.name not in Config.SHARDED_TASKS:
+                pending.append(task_instance)
+                continue
+            
+            run_pending()
+            startups = []
+            for upstream_task in completed:
+                startups = startup_records(upstream_task.output) if upstream_task.output else []
+                if startups:
+                    break
+            
+            budget.start_task(task_instance.name)
+            skipped = None
+            if budget.level() == "exhausted":
+                events.emit("task.skipped", f"⏭️  Budget exhausted, skipping {task_instance.name}",
+                            task=task_instance.name, reason="budget")
+                skipped = "budget exhausted"
+            elif not startups and self._delta_only and self.changeset is not None:
+                events.emit("task.skipped", f"⏭️  No new or changed startups, skipping {task_instance.name}",
+                            task=task_instance.name, reason="no_changes")
+                skipped = "no new or changed startups"
+            elif not startups:
+                events.log(f"⚠️  No startup records to shard for {task_instance.name}, running it as a single task",
+                           level="warning", task=task_instance.name)
+                pending.append(task_instance)
+                run_pending()
+                continue
+            
+            if skipped is not None:
+                # Finished like a skipped sequential task: no shards, no task metrics
+                task_instance.output = skipped_output(task_instance, skipped)
+                tasks_output.append(task_instance.output)
+                self._stream_task_output(task_instance.output)
+                completed.append(task_instance)
+                continue
+            
+            startups = keep_top_startups(startups, budget.top_startups(len(startups)))
+            with profiler.phase(task_instance.name):
+                task_output, usage = self._run_sharded_task(task_instance, startups, inputs)
+            task_instance.output = task_output
+            tasks_output.append(task_output)
+            self._stream_task_output(task_output)
+            add_usage(usage)
+            completed.append(task_instance)
+            
+            # Shards ran concurrently; resynchronize the sequential task marks
+            self._task_mark = time.monotonic()
+            self._token_mark = self._current_token_usage()
+        
+        run_pending()
+        
+        return CrewOutput(
+            raw=tasks_output[-1].raw if tasks_output else "",
+            tasks_output=tasks_output,
+            token_usage=UsageMetrics(**token_usage),
+        )
+    
+    def _run_sharded_task(self, task_instance: Task, startups: List[Dict[str, Any]],
+                          inputs: Dict[str, Any]):
+        """Fan a task out over startup shards on a worker pool and merge the shard outputs"""
+        from crewai.tasks.task_output import TaskOutput
+        
+        task_name = task_instance.name
+        task_config = self.tasks_config[task_name]
+        shard_fields = CONTEXT_FIELDS.get(task_name, {}).get('discovery_task')
+        if shard_fields:
+            startups = [project_record(startup, shard_fields) for startup in startups]
+        shards = make_shards(startups, Config.SHARD_SIZE)
+        
+        events.emit("task.start", f"🔀 {task_name}: {len(startups)} startups in {len(shards)} shards "
+                    f"({Config.SHARD_WORKERS} workers)", task=task_name, startups=len(startups),
+                    shards=len(shards), workers=Config.SHARD_WORKERS)
+        
+        positions = {id(shard): index for index, shard in enumerate(shards)}
+        
+        def run_shard(shard: List[Dict[str, Any]]):
+            shard_agent = task_instance.agent.copy()
+            shard_task = Task(
+                name=f"{task_name}_shard",
+                description=task_config['description'] + (
+                    "\n\nAnalyze only the startups in this shard:\n{shard_startups}\n"
+                ),
+                expected_output=task_config['expected_output'] + (
+                    " Return a JSON list with one object per startup, identified by its name."
+                ),
+                agent=shard_agent,
+            )
+            shard_inputs = {**inputs, 'shard_startups': dumps_compact(shard)}
+            # Shards still queued when the budget runs out are skipped, like the sequential tasks
+            if budget.level() == "exhausted":
+                return None
+            shard_name = f"{task_name}.shard"
+            events.emit("task.start", task=shard_name, shard=positions[id(shard)], startups=len(shard))
+            shard_started = time.monotonic()
+            shard_results = Crew(
+                agents=[shard_agent],
+                tasks=[shard_task],
+                process=Process.sequential,
+                verbose=False,
+            ).kickoff(inputs=shard_inputs)
+            self._record_task(shard_name, shard_agent.role, time.monotonic() - shard_started,
+                              usage_to_dict(getattr(shard_results, 'token_usage', None)),
+                              shard=positions[id(shard)])
+            return shard_results
+        
+        started = time.monotonic()
+        results, failures = run_shards(shards, run_shard, Config.SHARD_WORKERS)
+        
+        merged_records = []
+        usage: Dict[str, int] = {}
+        skipped = [index for index, shard_results in results if shard_results is None]
+        results = [(index, shard_results) for index, shard_results in results if shard_results is not None]
+        for index, shard_results in results:
+            merged_records.extend(records_for_shard(shard_results.raw, shards[index]))
+            for key, value in usage_to_dict(getattr(shard_results, 'token_usage', None)).items():
+                usage[key] = usage.get(key, 0) + value
+        
+        for failure in failures:
+            events.error("shard.error", f"❌ {task_name} shard {failure['shard']} ({', '.join(failure['startups'])}) "
+                         f"failed: {failure['error']}", task=task_name, **failure)
+        if skipped:
+            events.emit("task.skipped", f"⏭️  Budget exhausted, skipped {len(skipped)} of {len(shards)} "
+                        f"{task_name} shards", task=task_name, reason="budget", shards=skipped)
+        
+        # Agents and the budget were charged per shard; the task totals are only reported
+        duration = time.monotonic() - started
+        metrics.record("task", task_name, duration=duration, tokens=usage, error=bool(failures))
+        events.emit("task.end", task=task_name, agent=task_instance.agent.role.strip(),
+                    duration_s=round(duration, 4), tokens=usage, shards=len(shards), failed_shards=len(failures))
+        
+        payload = {
+            "startups": merged_records,
+            "shards": len(shards),
+            "failed_shards": failures,
+        }
+        if skipped:
+            payload["skipped_shards"] = skipped
+        raw_output = json.dumps(payload, indent=2, ensure_ascii=False)
+        if task_instance.output_file:
+            with open(task_instance.output_file, "w", encoding="utf-8") as f:
+                f.write(raw_output)
+        
+        task_output = TaskOutput(
+            description=task_config['description'],
+            name=task_name,
+            expected_output=task_config['expected_output'],
+            raw=raw_output,
+            json_dict=payload,
+            agent=task_instance.agent.role,
+        )
+        return task_output, usage
+    
+    def _current_token_usage(self) -> Dict[str, int]:
+        """Sum the token usage accumulated so far by every agent of the crew"""
+        usage: Dict[str, int] = {}
+        for crew_agent in getattr(self, 'agents', None) or []:
+            for key, value in agent_token_usage(crew_agent).items():
+                usage[key] = usage.get(key, 0) + value
+        return usage
+    
+    def _record_task_metrics(self, task_output) -> None:
+        """Attribute the time and tokens spent since the previous task to the finished task and its agent"""
+        now = time.monotonic()
+        duration = now - self._task_mark
+        self._task_mark = now
+        
+        usage = self._current_token_usage()
+        tokens = {key: value - self._token_mark.get(key, 0) for key, value in usage.items()}
+        self._token_mark = usage
+        
+        task_name = getattr(task_output, 'name', None) or getattr(task_output, 'description', 'unknown_task')[:50]
+        agent_name = str(getattr(task_output, 'agent', None) or 'unknown_agent').strip()
+        self._record_task(task_name, agent_name, duration, tokens)
+    
+    def _record_task(self, task_name: str, agent_name: str, duration: float, tokens: Dict[str, int],
+                     **fields: Any) -> None:
+        """Record a finished task or shard for its agent, emit its task.end event and charge its tokens"""
+        agent_name = agent_name.strip()
+        metrics.record("task", task_name, duration=duration, tokens=tokens)
+        metrics.record("agent", agent_name, duration=duration, tokens=tokens)
+        events.emit("task.end", task=task_name, agent=agent_name, duration_s=round(duration, 4), tokens=tokens,
+                    **fields)
+        budget.charge("tokens", tokens.get('total_tokens', 0))
+    
+    def _task_key(self, task_output) -> str:
+        """Name under which a task's output is stored and exported"""
+        return getattr(task_output, 'name', None) or getattr(task_output, 'description', 'unknown_task')[:50]
+    
+    def _task_payload(self, task_output) -> Any:
+        """Structured output of a task, or its raw text when it has none"""
+        structured = output_data(task_output)
+        return structured if structured is not None else str(task_output)
+    
+    def _on_task_complete(self, task_output) -> None:
+        """Record metrics and stream the finished task's output to the run exporter"""
+        self._record_task_metrics(task_output)
+        if self._task_key(task_output) == 'discovery_task':
+            self._capture_changes(task_output)
+        self._stream_task_output(task_output)
+    
+    def _capture_changes(self, task_output) -> None:
+        """Diff the discovered startups against the run-start snapshot; in delta mode, keep only the changes.
+        
+        The task output is edited in place, so downstream tasks reading it as context
+        (or sharding over it) only receive added and modified startups.
+        """
+        self._discovered_startups = startup_records(task_output)
+        self.changeset = self.startup_discovery_tool._get_db().changeset(
+            self._discovered_startups, baseline=self._baseline
+        )
+        events.emit("changeset", f"🔁 Changes since last run: {self.changeset.describe()}", **self.changeset.counts())
+        if self._delta_only:
+            replace_startups(task_output, self.changeset.filter_records(self._discovered_startups))
+        if Config.WEBSITE_CHECKS:
+            self._check_websites(task_output)
+    
+    def _check_websites(self, task_output) -> None:
+        """Canonicalize and liveness-check the discovered websites locally, so validation doesn't scrape them"""
+        startups = startup_records(task_output)
+        if not startups:
+            return
+        started = time.perf_counter()
+        checked = WebsiteChecker().check_records(startups)
+        replace_startups(task_output, checked)
+        statuses: Dict[str, int] = {}
+        for startup in checked:
+            status = startup.get("website_status") or "missing"
+            statuses[status] = statuses.get(status, 0) + 1
+        events.emit("websites.checked",
+                    f"🌐 Checked {len(checked)} websites in {time.perf_counter() - started:.1f}s: "
+                    + ", ".join(f"{count} {status}" for status, count in sorted(statuses.items())),
+                    checked=len(checked), **statuses)
+    
+    def _stream_task_output(self, task_output) -> None:
+        if self._exporter is not None:
+            self._exporter.write_task(self._task_key(task_output), self._task_payload(task_output))
+    
     def _process_crew_results(self, crew_results, country: str) -> Dict[str, Any]:
         """Process and structure the crew results"""
         
         if hasattr(crew_results, 'tasks_output'):
             task_results = {}
             for task_output in crew_results.tasks_output:
-                task_name = task_output.description[:50] if hasattr(task_output, 'description') else 'unknown_task'
-                task_results[task_name] = str(task_output)
+                task_results[self._task_key(task_output)] = self._task_payload(task_output)
         else:
             task_results = {"crew_output": str(crew_results)}
         
@@ -263,8 +692,8 @@ class Horizon():
             }
         }
     
-    def _export_to_formats(self, results: Dict[str, Any], country: str) -> None:
-        """Export results to multiple formats"""
+    def _open_exporter(self, country: str) -> StreamingRunExporter:
+        """Create the run folder and start streaming the country's artifacts into it"""
         
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         folder_name = f"{timestamp}"
@@ -273,39 +702,46 @@ class Horizon():
         # Create the folder if it doesn't exist
         os.makedirs(folder_name, exist_ok=True)
         
-        # Export comprehensive JSON
-        with open(f"{base_filename}.json", "w", encoding="utf-8") as f:
-            json.dump(results, f, indent=2, ensure_ascii=False)
+        return StreamingRunExporter(base_filename, self._summary_report_header(country))
     
+    def _export_to_formats(self, results: Dict[str, Any], country: str,
+                           exporter: Optional[StreamingRunExporter] = None) -> None:
+        """Export results to multiple formats.
+        
+        During a run, task outputs have already been streamed to `exporter` as they
+        arrived; without one, the results are streamed task by task here.
+        """
+        
+        if exporter is None:
+            exporter = self._open_exporter(country)
+            for task_name, task_result in results.get('task_results', {}).items():
+                exporter.write_task(task_name, task_result)
+        
+        base_filename = exporter.base_filename
         
-        # Extract startup data for CSV export
-        startup_data = []
-        for task_name, task_result in results.items():
-            if isinstance(task_result, str):
-                try:
-                    parsed_result = json.loads(task_result)
-                    if isinstance(parsed_result, dict) and 'startups' in parsed_result:
-                        startup_data.extend(parsed_result['startups'])
-                except json.JSONDecodeError:
-                    continue
+        if self.changeset is not None:
+            with open(f"{base_filename}_changeset.json", "w", encoding="utf-8") as f:
+                json.dump(self.changeset.to_dict(), f, indent=2, ensure_ascii=False)
         
-        # Create DataFrame and export to CSV
-        if startup_data:
-            df = pd.DataFrame(startup_data)
-            df.to_csv(f"{base_filename}.csv", index=False)
+        # Export run metrics (JSON and Prometheus textfile)
+        metrics.write_json(f"{base_filename}_metrics.json")
+        metrics.write_prometheus(f"{base_filename}_metrics.prom")
         
-        # Create summary report
-        self._create_summary_report(results, country, base_filename)
+        # Finish the summary report
+        exporter.close(self._summary_report_footer(base_filename, country=country))
         
-        print(f"\n✅ Results exported:")
-        print(f"   - JSON: {base_filename}.json")
-        print(f"   - CSV: {base_filename}.csv")
-        print(f"   - Summary: {base_filename}_summary.md")
+        events.emit("export", "\n".join([
+            "\n✅ Results exported:",
+            f"   - JSONL: {exporter.jsonl_path}",
+            f"   - CSV: {exporter.csv_path} ({exporter.startups_written} rows)",
+            f"   - Summary: {exporter.summary_path}",
+            f"   - Metrics: {base_filename}_metrics.json, {base_filename}_metrics.prom",
+        ]), base_filename=base_filename, startups=exporter.startups_written, tasks=exporter.tasks_written)
     
-    def _create_summary_report(self, results: Dict[str, Any], country: str, base_filename: str) -> None:
-        """Create a markdown summary report"""
+    def _summary_report_header(self, country: str) -> str:
+        """Markdown summary report up to the detailed results, written before the first task finishes"""
         
-        report_content = f"""# NVIDIA Inception AI Startup Discovery Report
+        return f"""# NVIDIA Inception AI Startup Discovery Report
 ## Country: {country}
 ## Date: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
 
@@ -328,71 +764,89 @@ Six specialized AI agents analyzed:
 ## Detailed Results
 
 """
+    
+    def _summary_report_footer(self, base_filename: str, error: Optional[str] = None,
+                               country: Optional[str] = None) -> str:
+        """Markdown summary report after the detailed results: leaderboard, run metrics and data files"""
         
-        for task_name, task_result in results.items():
-            report_content += f"### {task_name.replace('_', ' ').title()}\n\n"
-            
-            if isinstance(task_result, str):
-                truncated_result = task_result[:1000] + "..." if len(task_result) > 1000 else task_result
-                report_content += f"```\n{truncated_result}\n```\n\n"
-            else:
-                report_content += f"{str(task_result)}\n\n"
+        status = f"\n## Run Failed\n\n{error}\n" if error else ""
+        if self.changeset is not None:
+            scope = "only these were analyzed" if self._delta_only else "all were analyzed"
+            status += f"\n## Changes Since Last Run\n\n{self.changeset.describe()} ({scope}).\n"
+        leaderboard = self._leaderboard_section(country) if country else ""
+        degradations = budget.snapshot()["degradations"]
+        budget_notes = "".join(
+            f"\n- {d['level']} after {d['after_s']}s ({d['task'] or 'run'})" for d in degradations
+        )
         
-        report_content += f"""
+        return f"""{status}{leaderboard}
+## Run Metrics
+
+Total wall time: {metrics.elapsed():.1f}s — total tokens: {metrics.totals.get('total_tokens', 0)}
+
+Budget: {budget.describe()}{budget_notes}
+
+{metrics.markdown_table()}
 ## Data Files
 
-- Complete data: `{base_filename}.json`
+- Complete data (JSON lines): `{base_filename}.jsonl`
 - Startup database: `{base_filename}.csv`
 - This summary: `{base_filename}_summary.md`
+- Run metrics: `{base_filename}_metrics.json`, `{base_filename}_metrics.prom`
 
 ---
 
 *Report generated by NVIDIA Inception AI Startup Discovery System*
 """
+    
+    def _leaderboard_section(self, country: str, limit: int = 10) -> str:
+        """Top-scored startups of the country, read from the database's materialized leaderboard"""
         
-        with open(f"{base_filename}_summary.md", "w", encoding="utf-8") as f:
-            f.write(report_content)
+        top = self.startup_discovery_tool._get_db().leaderboard(country=country, limit=limit)
+        if not top:
+            return ""
+        rows = "\n".join(f"| {i} | {entry['name']} | {entry['score']:.2f} |" for i, entry in enumerate(top, 1))
+        return f"""
+## Top Startups in {country}
+
+| # | Startup | Score |
+|---|---------|-------|
+{rows}
+"""
     
-    def _create_consolidated_report(self, all_results: Dict[str, Any]) -> None:
-        """Create a consolidated report across all countries"""
+    def _open_consolidated_report(self) -> ConsolidatedReportWriter:
+        """Start the consolidated report; countries are appended as they complete"""
         
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"nvidia_inception_consolidated_{timestamp}"
         
-        # Export consolidated JSON
-        with open(f"{filename}.json", "w", encoding="utf-8") as f:
-            json.dump(all_results, f, indent=2, ensure_ascii=False)
-        
-        # Create consolidated markdown report
-        report_content = f"""# NVIDIA Inception: Multi-Country AI Startup Discovery
+        return ConsolidatedReportWriter(filename, f"""# NVIDIA Inception: Multi-Country AI Startup Discovery
 ## Generated: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
 
 ---
 
 ## Countries Analyzed
 
-"""
-        
-        for country, results in all_results.items():
-            status = "✅ Success" if "error" not in results else "❌ Error"
-            report_content += f"- **{country}**: {status}\n"
+""")
+    
+    def _close_consolidated_report(self, report: ConsolidatedReportWriter) -> None:
+        """Write the summary statistics and close the consolidated report"""
         
-        report_content += f"""
+        report.close(f"""
 
 ## Summary Statistics
 
-- Total countries analyzed: {len(all_results)}
-- Successful discoveries: {len([r for r in all_results.values() if 'error' not in r])}
-- Failed discoveries: {len([r for r in all_results.values() if 'error' in r])}
+- Total countries analyzed: {report.successes + report.failures}
+- Successful discoveries: {report.successes}
+- Failed discoveries: {report.failures}
 
 ---
 
 *Consolidated report generated by NVIDIA Inception AI Startup Discovery System*
-"""
-        
-        with open(f"{filename}_consolidated.md", "w", encoding="utf-8") as f:
-            f.write(report_content)
+""")
         
-        print(f"\n📊 Consolidated Report Created:")
-        print(f"   - JSON: {filename}.json")
-        print(f"   - Summary: {filename}_consolidated.md")
\ No newline at end of file
+        events.emit("export", "\n".join([
+            "\n📊 Consolidated Report Created:",
+            f"   - JSONL: {report.jsonl_path}",
+            f"   - Summary: {report.markdown_path}",
+        ]), consolidated=report.jsonl_path, successes=report.successes, failures=report.failures)
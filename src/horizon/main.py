@@ -1,31 +1,42 @@
 #!/usr/bin/env python
 import sys
+import time
 import warnings
 
 from datetime import datetime
 
 
 from .config import Config
-from .crew import Horizon  
+from .utils.events import events
 
 warnings.filterwarnings("ignore", category=SyntaxWarning, module="pysbd")
 
+
+def _apply_profile_flag():
+    """Turn a `--profile[=modes]` argument into HORIZON_PROFILE and drop it from argv"""
+    import os
+    
+    for arg in list(sys.argv[1:]):
+        if arg == "--profile" or arg.startswith("--profile="):
+            os.environ["HORIZON_PROFILE"] = arg.partition("=")[2] or "all"
+            sys.argv.remove(arg)
+
 def run():
     """
     Run the crew.
     """
-    print("🤖 NVIDIA Inception AI Startup Discovery System")
-    print("=" * 60)
+    _apply_profile_flag()
+    events.log("🤖 NVIDIA Inception AI Startup Discovery System\n" + "=" * 60)
     
     if Config.OPENAI_API_KEY == "your-openai-api-key":
-        print("⚠️  Warning: OPENAI_API_KEY not configured")
+        events.log("⚠️  Warning: OPENAI_API_KEY not configured", level="warning")
         return
     
     resend_api_key = Config.RESEND_API_KEY
     if resend_api_key == 'your-resend-api-key':
-        print("⚠️  Warning: RESEND_API_KEY not configured")
-        print("     Set RESEND_API_KEY environment variable to enable email sending")
-        print("     Proceeding without email functionality...")
+        events.log("⚠️  Warning: RESEND_API_KEY not configured\n"
+                   "     Set RESEND_API_KEY environment variable to enable email sending\n"
+                   "     Proceeding without email functionality...", level="warning")
     
 
     recipient_emails = [
@@ -38,10 +49,12 @@ def run():
     target_countries = ["Mexico", "Brazil"]
   
     
-    print(f"✅ Proceeding with: {', '.join(target_countries)}")
-    print()
+    events.log(f"✅ Proceeding with: {', '.join(target_countries)}\n", countries=target_countries)
     
 
+    # Imported lazily so that lightweight commands don't pay for crewAI at startup
+    from .crew import Horizon
+    
     try:
         discovery_system = Horizon()
         
@@ -116,40 +129,35 @@ def run():
                     'completion_status': 'success'
                 }
             
-            # Send email only if we have meaningful task results
+            # Queue the email only if we have meaningful task results; `deliver` sends it
             if len(task_results) > 2:  # More than just total_tasks and completion_status
-                print("📧 Sending email with formatted results...")
+                from .outbox import Outbox
+                from .resend_client import NVIDIAEmailSender
                 
-                email_sender = NVIDIAEmailSender(resend_api_key)
-                
-                email_result = email_sender.send_report_email(
+                message = NVIDIAEmailSender(resend_api_key).render_report(
                     task_results=task_results,
-                    to_emails=recipient_emails,
                     subject=f"Horizon Discovery Report - {target_countries[0]} - {datetime.now().strftime('%Y-%m-%d')}",
                     from_email=Config.RESEND_FROM_EMAIL
                 )
-                
-                if email_result['success']:
-                    print(f"✅ Email sent successfully to: {', '.join(recipient_emails)}")
-                    print(f"📧 Email ID: {email_result.get('email_id')}")
-                else:
-                    print(f"❌ Email sending failed: {email_result.get('error')}")
-                    print("     Check your Resend API key and domain verification")
+                message_id = Outbox().enqueue(message, recipient_emails, metadata={"countries": target_countries})
+                events.emit("email.queued", f"📮 Report queued for {', '.join(recipient_emails)} ({message_id})\n"
+                            "     Run `deliver` to send it",
+                            message_id=message_id, recipients=recipient_emails)
             else:
-                print("⚠️  No meaningful task results found to email")
-                print("     Results structure may have changed - check crew implementation")
+                events.log("⚠️  No meaningful task results found to email\n"
+                           "     Results structure may have changed - check crew implementation", level="warning")
         
         
-        print("\n🎉 Startup Discovery Complete!")
-        print("📁 Check the generated files for detailed results:")
-        print("   - JSON files: Complete structured data")
-        print("   - CSV files: Spreadsheet-friendly format") 
-        print("   - Markdown files: Human-readable summaries")
+        events.log("\n🎉 Startup Discovery Complete!\n"
+                   "📁 Check the generated files for detailed results:\n"
+                   "   - JSON files: Complete structured data\n"
+                   "   - CSV files: Spreadsheet-friendly format\n"
+                   "   - Markdown files: Human-readable summaries")
         
         return results
         
     except Exception as e:
-        print(f"❌ Error running startup discovery: {e}")
+        events.error("error", f"❌ Error running startup discovery: {e}", error=f"{e.__class__.__name__}: {e}")
         raise
     
     
@@ -164,6 +172,8 @@ def train():
         "topic": "AI LLMs",
         'current_year': str(datetime.now().year)
     }
+    from .crew import Horizon
+    
     try:
         # CHANGED: Use StartupDiscoverySystem instead of Horizon
         Horizon().crew().train(n_iterations=int(sys.argv[1]), filename=sys.argv[2], inputs=inputs)
@@ -175,6 +185,8 @@ def replay():
     """
     Replay the crew execution from a specific task.
     """
+    from .crew import Horizon
+    
     try:
         # CHANGED: Use StartupDiscoverySystem instead of Horizon
         Horizon().crew().replay(task_id=sys.argv[1])
@@ -191,9 +203,176 @@ def test():
         "current_year": str(datetime.now().year)
     }
     
+    from .crew import Horizon
+    
     try:
         # CHANGED: Use StartupDiscoverySystem instead of Horizon
         Horizon().crew().test(n_iterations=int(sys.argv[1]), eval_llm=sys.argv[2], inputs=inputs)
 
     except Exception as e:
-        raise Exception(f"An error occurred while testing the crew: {e}")
\ No newline at end of file
+        raise Exception(f"An error occurred while testing the crew: {e}")
+
+
+def _run_with_cassette(mode: str):
+    """Run discovery for one country while recording to / replaying from a cassette"""
+    from .utils.cassette import configure_cassette
+    
+    _apply_profile_flag()
+    if len(sys.argv) < 3:
+        print(f"Usage: {mode}_run <cassette.jsonl> <country> [latency_scale] [--profile[=cprofile,memory,sample]]")
+        return None
+    
+    cassette_path, country = sys.argv[1], sys.argv[2]
+    latency_scale = float(sys.argv[3]) if len(sys.argv) > 3 else 0.0
+    cassette = configure_cassette(cassette_path, mode=mode, latency_scale=latency_scale)
+    
+    if mode == "replay":
+        events.log(f"📼 Replaying {cassette_path} ({', '.join(f'{k}: {v}' for k, v in cassette.stats().items())})",
+                   cassette=cassette_path, mode=mode)
+    else:
+        events.log(f"📼 Recording external calls to {cassette_path}", cassette=cassette_path, mode=mode)
+    
+    from .crew import Horizon
+    return Horizon().discover_country(country)
+
+def record_run():
+    """
+    Run discovery for a country and record every external call to a cassette.
+    """
+    return _run_with_cassette("record")
+
+def replay_run():
+    """
+    Run discovery for a country offline, serving external calls from a cassette.
+    """
+    return _run_with_cassette("replay")
+
+def rescore():
+    """
+    Score the startup database locally with Config.SCORING_WEIGHTS and print the leaderboard.
+    
+    Optional `criterion=weight` arguments rank under what-if weights without saving.
+    """
+    from .utils.database import DEFAULT_DB_PATH, StartupDB
+    
+    usage = f"Usage: rescore [criterion=weight ...]  (criteria: {', '.join(Config.SCORING_WEIGHTS)})"
+    weights = {}
+    for arg in sys.argv[1:]:
+        criterion, _, weight = arg.partition("=")
+        try:
+            weights[criterion] = float(weight)
+        except ValueError:
+            weights[criterion] = -1.0
+        if criterion not in Config.SCORING_WEIGHTS or not 0 <= weights[criterion] < float("inf"):
+            print(f"Invalid weight '{arg}'\n{usage}")
+            return None
+    if weights and sum(dict(Config.SCORING_WEIGHTS, **weights).values()) <= 0:
+        print(f"Weights must sum to a positive value\n{usage}")
+        return None
+    
+    db = StartupDB(DEFAULT_DB_PATH)
+    if weights:
+        print(f"🔮 What-if weights: {', '.join(f'{k}={v}' for k, v in weights.items())}")
+        what_if = dict(Config.SCORING_WEIGHTS, **weights)
+        ranked = db.ranked_startups(limit=20, weights=what_if)
+    else:
+        rescored = db.rescore()
+        print(f"🔢 Re-scored {rescored} new or changed startups")
+        ranked = db.ranked_startups(limit=20)
+    
+    for position, startup in enumerate(ranked, 1):
+        print(f"{position:>3}. {startup['score']:5.2f}  {startup.get('name', '')} ({startup.get('country', '')})")
+    return ranked
+
+def similar():
+    """
+    Print the startups most similar to a stored startup, or to a free-text description.
+    
+    Usage: `similar <name or text> [--k=N]`.
+    """
+    from .utils.database import DEFAULT_DB_PATH, StartupDB
+    
+    usage = "Usage: similar <startup name or description> [--k=N]  (N >= 1)"
+    k = 10
+    words = []
+    for arg in sys.argv[1:]:
+        if arg.startswith("--k="):
+            value = arg.partition("=")[2]
+            if not value.isdigit() or int(value) < 1:
+                print(f"Invalid '{arg}'\n{usage}")
+                return None
+            k = int(value)
+        else:
+            words.append(arg)
+    if not words:
+        print(usage)
+        return None
+    query = " ".join(words)
+    
+    started = time.perf_counter()
+    neighbours = StartupDB(DEFAULT_DB_PATH).similar_startups(query, k)
+    print(f"🧭 {len(neighbours)} startups similar to '{query}' ({(time.perf_counter() - started) * 1000:.0f}ms)")
+    for position, startup in enumerate(neighbours, 1):
+        print(f"{position:>3}. {startup['similarity']:5.2f}  {startup.get('name', '')} "
+              f"({startup.get('country', '')}) {startup.get('market', '')}")
+    return neighbours
+
+def cluster_startups():
+    """
+    Group the startup database into clusters by description and print each one.
+    
+    An optional argument sets the number of clusters (default 10).
+    """
+    from collections import Counter
+    from .utils.database import DEFAULT_DB_PATH, StartupDB
+    
+    usage = "Usage: cluster_startups [number of clusters >= 1]"
+    if len(sys.argv) > 2 or (len(sys.argv) == 2 and (not sys.argv[1].isdigit() or int(sys.argv[1]) < 1)):
+        print(f"Invalid arguments: {' '.join(sys.argv[1:])}\n{usage}")
+        return None
+    k = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    groups = StartupDB(DEFAULT_DB_PATH).clusters(k)
+    for number, members in enumerate(groups, 1):
+        markets = Counter(str(s.get('market') or 'unknown') for s in members).most_common(3)
+        print(f"🗂️ Cluster {number}: {len(members)} startups, mostly {', '.join(m for m, _ in markets)}")
+        print(f"     e.g. {', '.join(s.get('name', '') for s in members[:5])}")
+    return groups
+
+def check_websites():
+    """
+    Check every startup website in the database locally and print a status summary.
+    
+    Optional country arguments limit the check; `--apply` saves the canonical
+    websites, statuses and redirect targets (`website_final`) back to the database.
+    """
+    from .utils.database import DEFAULT_DB_PATH, StartupDB
+    from .utils.websites import WebsiteChecker
+    
+    args = sys.argv[1:]
+    apply = "--apply" in args
+    countries = {arg.lower() for arg in args if arg != "--apply"}
+    
+    db = StartupDB(DEFAULT_DB_PATH)
+    startups = db.load_startups()
+    selected = [i for i, s in enumerate(startups)
+                if not countries or str(s.get('country', '')).lower() in countries]
+    
+    started = time.perf_counter()
+    checked = WebsiteChecker().check_records([startups[i] for i in selected])
+    elapsed = time.perf_counter() - started
+    
+    statuses = {}
+    for startup in checked:
+        status = startup.get('website_status') or 'missing'
+        statuses[status] = statuses.get(status, 0) + 1
+        if status in ('dead', 'tls-invalid', 'invalid'):
+            print(f"  ⚠️ {startup.get('name', '')}: {startup.get('website', '')} ({status})")
+    print(f"🌐 Checked {len(checked)} websites in {elapsed:.1f}s: "
+          + ", ".join(f"{count} {status}" for status, count in sorted(statuses.items())))
+    
+    if apply:
+        for i, startup in zip(selected, checked):
+            startups[i] = startup
+        db.save_startups(startups)
+        print(f"💾 Saved canonical websites for {len(checked)} startups")
+    return statuses
@@ -0,0 +1,199 @@
+"""Typed task outputs and the compact context each task consumes."""
+import json
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel, Field
+
+from horizon.utils.sharding import parse_json_output
+
+
+class StartupRecord(BaseModel):
+    """A discovered startup, using the database field names."""
+    name: str = Field(..., description="Company name")
+    website: Optional[str] = Field(None, description="Website URL")
+    description: Optional[str] = Field(None, description="Brief business description")
+    location: Optional[str] = Field(None, description="Primary location/city")
+    country: Optional[str] = Field(None, description="Country")
+    technology: Optional[str] = Field(None, description="Core AI technology focus")
+    market: Optional[str] = Field(None, description="Target market and customers")
+    founded: Optional[str] = Field(None, description="Founding year")
+    milestones: Optional[str] = Field(None, description="Key milestones and investors")
+    source_url: Optional[str] = Field(None, description="Where the information was found")
+    website_status: Optional[str] = Field(None, description="Set by the local website check; leave empty")
+    website_final: Optional[str] = Field(None, description="Set by the local website check; leave empty")
+
+class StartupList(BaseModel):
+    """Output of the discovery task."""
+    startups: List[StartupRecord] = Field(default_factory=list)
+
+class QualificationRecord(BaseModel):
+    """Technical assessment of one startup."""
+    name: str
+    ai_technologies: List[str] = Field(default_factory=list, description="Primary AI/ML technologies used")
+    frameworks: List[str] = Field(default_factory=list, description="Development frameworks and tools")
+    products: Optional[str] = Field(None, description="Core products and technical differentiation")
+    market_positioning: Optional[str] = Field(None, description="Target segments and competitive advantages")
+    gpu_potential: Optional[str] = Field(None, description="GPU/CUDA utilization potential")
+    nvidia_alignment_score: Optional[float] = Field(None, description="NVIDIA alignment score (1-10)")
+    justification: Optional[str] = Field(None, description="Short justification of the score")
+
+class QualificationList(BaseModel):
+    """Output of the qualification task."""
+    startups: List[QualificationRecord] = Field(default_factory=list)
+
+class FundingRecord(BaseModel):
+    """Funding history and investors of one startup."""
+    name: str
+    latest_round: Optional[str] = Field(None, description="Latest round stage and date")
+    latest_round_amount: Optional[str] = Field(None, description="Latest round amount")
+    total_raised: Optional[str] = Field(None, description="Total capital raised to date")
+    lead_investors: List[str] = Field(default_factory=list)
+    investors: List[str] = Field(default_factory=list)
+    investment_attractiveness_score: Optional[float] = Field(None, description="Investment attractiveness (1-10)")
+    notes: Optional[str] = None
+
+class FundingList(BaseModel):
+    """Output of the funding research task."""
+    startups: List[FundingRecord] = Field(default_factory=list)
+
+class LeaderProfile(BaseModel):
+    """A technical leader of a startup."""
+    name: str
+    role: Optional[str] = None
+    linkedin_url: Optional[str] = None
+    background: Optional[str] = None
+
+class LeadershipRecord(BaseModel):
+    """Technical leadership of one startup."""
+    name: str
+    leaders: List[LeaderProfile] = Field(default_factory=list)
+    team_strength_score: Optional[float] = Field(None, description="Team strength (1-10)")
+
+class LeadershipList(BaseModel):
+    """Output of the leadership research task."""
+    startups: List[LeadershipRecord] = Field(default_factory=list)
+
+class MarketAnalysis(BaseModel):
+    """Output of the market analysis task."""
+    country: Optional[str] = None
+    summary: str = Field(..., description="Executive summary of the AI ecosystem")
+    active_sectors: List[str] = Field(default_factory=list)
+    opportunities: List[str] = Field(default_factory=list)
+    investment_climate: Optional[str] = None
+    risks: List[str] = Field(default_factory=list)
+    recommendations: List[str] = Field(default_factory=list)
+
+class ValidatedStartup(BaseModel):
+    """Validated and scored startup."""
+    name: str
+    website: Optional[str] = None
+    technology_innovation: Optional[float] = None
+    market_potential: Optional[float] = None
+    team_strength: Optional[float] = None
+    funding_attractiveness: Optional[float] = None
+    nvidia_alignment: Optional[float] = None
+    traction: Optional[float] = None
+    overall_score: Optional[float] = None
+    tier: Optional[str] = Field(None, description="Tier 1, Tier 2 or Tier 3")
+    quality_flags: List[str] = Field(default_factory=list)
+    recommendation: Optional[str] = None
+
+class ValidatedList(BaseModel):
+    """Output of the validation and scoring task."""
+    startups: List[ValidatedStartup] = Field(default_factory=list)
+    top_priorities: List[str] = Field(default_factory=list)
+
+
+# Pydantic output model of each task
+TASK_OUTPUT_MODELS = {
+    "discovery_task": StartupList,
+    "qualification_task": QualificationList,
+    "funding_research_task": FundingList,
+    "leadership_research_task": LeadershipList,
+    "market_analysis_task": MarketAnalysis,
+    "validation_and_scoring_task": ValidatedList,
+}
+
+# Upstream fields each consumer task needs: {consumer: {upstream task: [fields]}}
+CONTEXT_FIELDS: Dict[str, Dict[str, List[str]]] = {
+    "qualification_task": {
+        "discovery_task": ["name", "website", "technology", "market"],
+    },
+    "funding_research_task": {
+        "discovery_task": ["name", "website", "milestones"],
+        "qualification_task": ["name", "nvidia_alignment_score"],
+    },
+    "leadership_research_task": {
+        "discovery_task": ["name", "website"],
+    },
+    "market_analysis_task": {
+        "discovery_task": ["name", "technology", "market"],
+        "qualification_task": ["name", "ai_technologies"],
+        "funding_research_task": ["name", "latest_round", "total_raised", "lead_investors"],
+    },
+    "validation_and_scoring_task": {
+        "discovery_task": ["name", "website", "website_status", "website_final", "description", "technology",
+                           "market", "founded"],
+        "qualification_task": ["name", "ai_technologies", "gpu_potential", "nvidia_alignment_score"],
+        "funding_research_task": ["name", "total_raised", "lead_investors", "investment_attractiveness_score"],
+        "leadership_research_task": ["name", "team_strength_score"],
+        "market_analysis_task": ["summary", "active_sectors"],
+    },
+}
+
+# Upper bound for upstream outputs that could not be parsed into records
+MAX_RAW_CONTEXT_CHARS = 2000
+
+
+def project_record(record: Dict[str, Any], fields: List[str]) -> Dict[str, Any]:
+    """Keep only the requested, non-empty fields of a record"""
+    return {field: record[field] for field in fields if record.get(field) not in (None, "", [], {})}
+
+
+def output_data(task_output: Any) -> Any:
+    """Return the structured data of a TaskOutput (pydantic, JSON dict or parsed raw)"""
+    if getattr(task_output, "pydantic", None) is not None:
+        return task_output.pydantic.model_dump(exclude_none=True)
+    if getattr(task_output, "json_dict", None):
+        return task_output.json_dict
+    return parse_json_output(getattr(task_output, "raw", None))
+
+
+def startup_records(task_output: Any) -> List[Dict[str, Any]]:
+    """Return the per-startup records of a task output"""
+    data = output_data(task_output)
+    if isinstance(data, dict):
+        data = data.get("startups")
+    if isinstance(data, list):
+        return [record for record in data if isinstance(record, dict)]
+    return []
+
+
+def replace_startups(task_output: Any, startups: List[Dict[str, Any]]) -> None:
+    """Swap the startup list of a TaskOutput in place, keeping its other fields"""
+    data = output_data(task_output)
+    if not isinstance(data, dict) or not isinstance(data.get("startups"), list):
+        return
+    data = dict(data, startups=startups)
+    if getattr(task_output, "pydantic", None) is not None:
+        task_output.pydantic = type(task_output.pydantic).model_validate(data)
+    if getattr(task_output, "json_dict", None):
+        task_output.json_dict = data
+    task_output.raw = json.dumps(data, indent=2, ensure_ascii=False)
+
+
+def compact_output(task_output: Any, fields: List[str]) -> Any:
+    """Trim an upstream task output to the fields a consumer declared"""
+    data = output_data(task_output)
+    if isinstance(data, dict) and isinstance(data.get("startups"), list):
+        data = data["startups"]
+    if isinstance(data, list):
+        return [project_record(record, fields) for record in data if isinstance(record, dict)]
+    if isinstance(data, dict):
+        return project_record(data, fields)
+    return (getattr(task_output, "raw", "") or "")[:MAX_RAW_CONTEXT_CHARS]
+
+
+def dumps_compact(data: Any) -> str:
+    """Serialize context without indentation or extra whitespace"""
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False)
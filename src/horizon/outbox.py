@@ -0,0 +1,255 @@
+#!/usr/bin/env python
+"""
+Persistent outbox for report emails.
+
+Discovery runs render their report and enqueue it here instead of sending it,
+so a slow or failing email API never holds a run and never loses a report.
+Each message is one JSON file, moved between folders with atomic renames:
+
+    pending/      waiting to be sent (or retried once `next_attempt_at` passes)
+    processing/   claimed by a worker
+    sent/         delivered to every recipient
+    dead/         gave up after OUTBOX_MAX_ATTEMPTS (or a non-retryable error)
+
+A retry only goes to the recipients that haven't received the message yet.
+
+    deliver               # send everything that is due, then exit
+    deliver --watch       # keep draining the outbox
+    deliver --status      # list queued and dead-lettered messages
+    deliver --requeue-dead
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from .config import Config
+from .utils.events import events
+
+FOLDERS = ("tmp", "pending", "processing", "sent", "dead")
+
+
+class Outbox:
+    """Folder-per-state message queue; every state change is an atomic rename"""
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = Path(root or Config.OUTBOX_DIR)
+        for folder in FOLDERS:
+            (self.root / folder).mkdir(parents=True, exist_ok=True)
+
+    def _path(self, folder: str, message_id: str) -> Path:
+        return self.root / folder / f"{message_id}.json"
+
+    def _write(self, folder: str, entry: Dict[str, Any]) -> None:
+        """Write `entry` into `folder`, going through tmp/ so readers never see a partial file"""
+        tmp_path = self._path("tmp", entry["id"])
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self._path(folder, entry["id"]))
+
+    def enqueue(self, message: Dict[str, Any], recipients: List[str],
+                metadata: Optional[Dict[str, Any]] = None) -> str:
+        """Queue a rendered message (from, subject, html, text) for delivery; returns its id"""
+        message_id = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+        self._write("pending", {
+            "id": message_id,
+            "created_at": datetime.now().isoformat(),
+            "message": message,
+            "recipients": list(recipients),
+            "metadata": metadata or {},
+            "attempts": 0,
+            "next_attempt_at": 0.0,
+            "status": {},
+            "errors": [],
+        })
+        return message_id
+
+    def _read(self, path: Path) -> Dict[str, Any]:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def entries(self, folder: str) -> List[Dict[str, Any]]:
+        entries = []
+        for path in sorted((self.root / folder).glob("*.json")):
+            try:
+                entries.append(self._read(path))
+            except (OSError, ValueError):
+                continue
+        return entries
+
+    def claim(self, now: Optional[float] = None, skip: Iterable[str] = ()) -> Optional[Dict[str, Any]]:
+        """Move the oldest due message (not in `skip`) to processing/; None when nothing is due"""
+        now = time.time() if now is None else now
+        for path in sorted((self.root / "pending").glob("*.json")):
+            if path.stem in skip:
+                continue
+            try:
+                entry = self._read(path)
+            except (OSError, ValueError):
+                continue
+            if entry.get("next_attempt_at", 0) > now:
+                continue
+            try:
+                # The rename is the lock: only one worker can move the file
+                os.replace(path, self._path("processing", entry["id"]))
+            except FileNotFoundError:
+                continue
+            # Renames keep the old mtime; refresh it so recover() doesn't take this claim as stale
+            os.utime(self._path("processing", entry["id"]))
+            return entry
+        return None
+
+    def complete(self, entry: Dict[str, Any]) -> None:
+        self._write("sent", entry)
+        self._path("processing", entry["id"]).unlink(missing_ok=True)
+
+    def retry(self, entry: Dict[str, Any], delay_seconds: float) -> None:
+        entry["next_attempt_at"] = time.time() + delay_seconds
+        self._write("pending", entry)
+        self._path("processing", entry["id"]).unlink(missing_ok=True)
+
+    def dead_letter(self, entry: Dict[str, Any]) -> None:
+        self._write("dead", entry)
+        self._path("processing", entry["id"]).unlink(missing_ok=True)
+
+    def recover(self, stale_seconds: float = 3600.0) -> int:
+        """Return messages left in processing/ by a worker that died to pending/"""
+        recovered = 0
+        for path in (self.root / "processing").glob("*.json"):
+            if time.time() - path.stat().st_mtime >= stale_seconds:
+                os.replace(path, self.root / "pending" / path.name)
+                recovered += 1
+        return recovered
+
+    def requeue_dead(self) -> int:
+        """Give every dead-lettered message a fresh set of attempts"""
+        requeued = 0
+        for entry in self.entries("dead"):
+            entry["attempts"] = 0
+            entry["next_attempt_at"] = 0.0
+            self._write("pending", entry)
+            self._path("dead", entry["id"]).unlink(missing_ok=True)
+            requeued += 1
+        return requeued
+
+    def counts(self) -> Dict[str, int]:
+        return {folder: len(list((self.root / folder).glob("*.json"))) for folder in FOLDERS if folder != "tmp"}
+
+
+class OutboxWorker:
+    """Drains an outbox through NVIDIAEmailSender, retrying and dead-lettering"""
+
+    def __init__(self, outbox: Outbox, api_key: Optional[str] = None, max_attempts: Optional[int] = None,
+                 retry_minutes: Optional[float] = None):
+        from .resend_client import NVIDIAEmailSender
+
+        self.outbox = outbox
+        self.sender = NVIDIAEmailSender(api_key or Config.RESEND_API_KEY)
+        self.max_attempts = max_attempts or Config.OUTBOX_MAX_ATTEMPTS
+        self.retry_seconds = 60 * (Config.OUTBOX_RETRY_MINUTES if retry_minutes is None else retry_minutes)
+
+    def process(self, entry: Dict[str, Any]) -> str:
+        """Deliver one claimed message; returns sent, retry or dead"""
+        status = entry.setdefault("status", {})
+        remaining = [r for r in entry["recipients"] if status.get(r, {}).get("status") != "sent"]
+        entry["attempts"] += 1
+        entry["last_attempt_at"] = datetime.now().isoformat()
+
+        result = self.sender.send_message(entry["message"], remaining)
+        status.update(result.get("delivery", {}).get("status", {}))
+        if result["success"]:
+            self.outbox.complete(entry)
+            events.emit("outbox.sent", f"✅ {entry['id']}: sent to {len(remaining)} recipient(s)",
+                        message_id=entry["id"], recipients=len(remaining), attempts=entry["attempts"])
+            return "sent"
+
+        error = result.get("error", "unknown error")
+        entry["errors"].append({"at": entry["last_attempt_at"], "error": error})
+        failed = [status[r] for r in remaining if status.get(r, {}).get("status") == "failed"]
+        permanent = bool(failed) and not any(s.get("retryable", True) for s in failed)
+        if permanent or entry["attempts"] >= self.max_attempts:
+            self.outbox.dead_letter(entry)
+            events.error("outbox.dead", f"💀 {entry['id']} dead-lettered after {entry['attempts']} attempt(s): {error}",
+                         message_id=entry["id"], attempts=entry["attempts"], error=error)
+            return "dead"
+
+        delay = self.retry_seconds * 2 ** (entry["attempts"] - 1)
+        self.outbox.retry(entry, delay)
+        events.emit("retry", f"🔁 {entry['id']}: attempt {entry['attempts']} failed ({error}), "
+                    f"retrying in {delay / 60:.0f} min", level="warning", kind="outbox",
+                    message_id=entry["id"], attempt=entry["attempts"], delay_s=delay, error=error)
+        return "retry"
+
+    def drain(self) -> Dict[str, int]:
+        """Process every message that is due now, each at most once"""
+        outcomes = {"sent": 0, "retry": 0, "dead": 0}
+        attempted = set()
+        self.outbox.recover()
+        while True:
+            entry = self.outbox.claim(skip=attempted)
+            if entry is None:
+                return outcomes
+            attempted.add(entry["id"])
+            outcomes[self.process(entry)] += 1
+
+    def watch(self, poll_seconds: float = 30.0) -> None:
+        """Keep draining until interrupted"""
+        try:
+            while True:
+                self.drain()
+                time.sleep(poll_seconds)
+        except KeyboardInterrupt:
+            events.log("\n🛑 Outbox worker stopped")
+
+
+def print_status(outbox: Outbox) -> None:
+    counts = outbox.counts()
+    print(f"📮 Outbox {outbox.root}: " + ", ".join(f"{count} {folder}" for folder, count in counts.items()))
+    print("=" * 60)
+    for folder in ("pending", "processing", "dead"):
+        for entry in outbox.entries(folder):
+            sent = sum(1 for s in entry.get("status", {}).values() if s.get("status") == "sent")
+            due = datetime.fromtimestamp(entry.get("next_attempt_at") or 0)
+            line = (f"{folder:<10}  {entry['id']}  {entry['message'].get('subject', '')[:50]}  "
+                    f"{sent}/{len(entry['recipients'])} sent, {entry.get('attempts', 0)} attempt(s)")
+            if folder == "pending" and entry.get("next_attempt_at"):
+                line += f", next {due.strftime('%Y-%m-%d %H:%M')}"
+            if entry.get("errors"):
+                line += f", last error: {entry['errors'][-1]['error'][:80]}"
+            print(line)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Deliver the report emails queued in the outbox")
+    parser.add_argument("--outbox", default=None, help=f"outbox folder (default {Config.OUTBOX_DIR})")
+    parser.add_argument("--watch", action="store_true", help="keep draining the outbox until interrupted")
+    parser.add_argument("--poll", type=float, default=30.0, help="seconds between drains with --watch")
+    parser.add_argument("--status", action="store_true", help="list queued and dead-lettered messages and exit")
+    parser.add_argument("--requeue-dead", action="store_true", help="move dead-lettered messages back to pending")
+    args = parser.parse_args(sys.argv[1:] if argv is None else argv)
+
+    outbox = Outbox(args.outbox)
+    if args.status:
+        print_status(outbox)
+        return
+    if args.requeue_dead:
+        events.log(f"♻️  Requeued {outbox.requeue_dead()} dead-lettered message(s)")
+
+    worker = OutboxWorker(outbox)
+    if args.watch:
+        worker.watch(args.poll)
+        return
+    outcomes = worker.drain()
+    events.emit("outbox.drained", f"📮 Outbox drained: {outcomes['sent']} sent, {outcomes['retry']} to retry, "
+                f"{outcomes['dead']} dead-lettered", **outcomes)
+
+
+if __name__ == "__main__":
+    main()
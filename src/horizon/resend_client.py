@@ -1,19 +1,15 @@
-import resend
 import json
 import os
-from typing import Dict, Any, List
+from typing import Callable, Dict, Any, List, Optional, Union
 from datetime import datetime
 
-class NVIDIAEmailSender:
-    def __init__(self, api_key: str):
-        """Initialize Resend email sender with API key"""
-        resend.api_key = api_key
-        
-    def format_task_results_for_email(self, task_results: Dict[str, Any]) -> str:
-        """Format task results into HTML email content"""
-        timestamp = datetime.now().strftime("%B %d, %Y at %I:%M %p UTC")
-        
-        html_content = f"""<!DOCTYPE html>
+from horizon.config import Config
+from horizon.utils.changeset import METADATA_KEYS, Changeset
+from horizon.utils.fragments import fragment_key
+from horizon.utils.templates import Template, escape_html, fingerprint, render_markdown
+
+# Templates and display names are compiled once, at import
+_PAGE_HEAD = Template("""<!DOCTYPE html>
 <html>
 <head>
     <meta charset="utf-8">
@@ -146,264 +142,434 @@ class NVIDIAEmailSender:
         <h1>🚀 NVIDIA Inception AI Startup Discovery Report</h1>
         <p>Comprehensive AI Startup Analysis - Brazil</p>
         <p>Generated on {timestamp}</p>
+        {changes_line}
     </div>
-"""
+""")
 
-        # Process each task result
-        for task_name, task_result in task_results.items():
-            if task_name in ['total_tasks', 'completion_status']:
-                continue
-                
-            html_content += self._format_task_section(task_name, task_result)
-        
-        # Add completion summary
-        if 'total_tasks' in task_results and 'completion_status' in task_results:
-            total_tasks = task_results.get('total_tasks', 'N/A')
-            completion_status = task_results.get('completion_status', 'Unknown').upper()
-            
-        
-        html_content += """
+_PAGE_FOOTER = """
             <div class="footer">
                 <p>This report was generated by the NVIDIA Inception AI Startup Discovery System</p>
             </div>
         </body>
         </html>
         """
-        
-        return html_content
-    
-    def _format_task_section(self, task_name: str, task_result: Any) -> str:
-        """Format individual task section based on task type"""
-        # Clean up task name for display
-        display_name = self._get_task_display_name(task_name)
-        
-        section_html = f"""
+
+_TASK_SECTION = Template("""
         <div class="task-section">
             <div class="task-title">
                 {display_name}
             </div>
+        """)
+
+_TEXT_CONTENT = Template('<div class="text-content">{content}</div>')
+
+_SECTION_NOTE = Template('<p style="font-size: 13px; color: #666;"><em>{note}</em></p>')
+
+_STARTUP_CARD = Template('''
+            <div class="startup-card">
+                <div class="startup-name">{name}</div>''')
+
+_STARTUP_WEBSITE = Template('<a href="{website}" class="startup-website">{website}</a>')
+
+_STARTUP_DESCRIPTION = Template('<div class="startup-description">{description}</div>')
+
+_DETAIL_ITEM = Template('''
+                    <div class="detail-item">
+                        <span class="detail-label">{label}:</span> {value}
+                    </div>
+                    ''')
+
+_DICT_BLOCK = Template("<strong>{key}:</strong><br><pre style='background: #f5f5f5; padding: 10px; "
+                       "border-radius: 4px; overflow-x: auto;'>{content}</pre><br>")
+
+_DICT_ITEM = Template("<strong>{key}:</strong> {value}<br>")
+
+# Fields shown in a card's header rather than among its details
+_CARD_FIELDS = frozenset(['Company Name', 'name', 'Website', 'website', 'Description', 'description'])
+
+_TASK_DISPLAY_NAMES = {
+    'discovery_task': 'AI Startup Discovery',
+    'qualification_task': 'Technical Analysis',
+    'funding_research_task': 'Funding Research',
+    'leadership_research_task': 'Leadership Profiling',
+    'market_analysis_task': 'Market Intelligence',
+    'validation_and_scoring_task': 'Validation & Scoring',
+    'Discover AI startups in Brazil by researching': 'AI Startup Discovery',
+    'For each discovered startup, conduct detailed tech': 'Technical Analysis',
+    'Research comprehensive funding information for eac': 'Funding Research',
+    'Identify and profile key technical leadership for ': 'Leadership Profiling',
+    'Conduct comprehensive market analysis for Brazil A': 'Market Intelligence',
+    'Validate all collected startup information and cre': 'Validation & Scoring'
+}
+
+# Bump when the rendering code (not just a template) changes, to invalidate cached fragments
+RENDER_VERSION = "1"
+FRAGMENT_VERSION = fingerprint(_TASK_SECTION, _TEXT_CONTENT, _SECTION_NOTE, _STARTUP_CARD, _STARTUP_WEBSITE, _STARTUP_DESCRIPTION,
+                               _DETAIL_ITEM, _DICT_BLOCK, _DICT_ITEM, extra=RENDER_VERSION)
+
+
+class NVIDIAEmailSender:
+    def __init__(self, api_key: str, use_fragment_cache: bool = True):
+        """Initialize Resend email sender with API key"""
+        self.api_key = api_key
+        self.fragments = None
+        if use_fragment_cache and Config.FRAGMENT_CACHE_SIZE > 0:
+            from horizon.utils.fragments import FragmentCache
+            self.fragments = FragmentCache(Config.FRAGMENT_CACHE_PATH, max_entries=Config.FRAGMENT_CACHE_SIZE,
+                                           max_bytes=Config.FRAGMENT_CACHE_MAX_BYTES)
+        
+    def format_task_results_for_email(self, task_results: Dict[str, Any],
+                                      changeset: Optional[Union[Changeset, Dict[str, Any]]] = None,
+                                      notes: Optional[Dict[str, str]] = None) -> str:
+        """Format task results into HTML email content.
+        
+        With a `changeset`, only startups that are new or changed since the previous run are included.
+        `notes` adds a line at the end of the named task sections.
         """
+        changeset = self._as_changeset(changeset)
+        if changeset is not None:
+            task_results = changeset.filter_task_results(task_results)
+        return self._render_html(task_results, changeset, notes)
+    
+    def _render_html(self, task_results: Dict[str, Any], changeset: Optional[Changeset],
+                     notes: Optional[Dict[str, str]], cache_sections: bool = True) -> str:
+        """Render already filtered task results as the HTML page; cards are cached even without `cache_sections`"""
+        changes_line = f"<p>Since last run: {changeset.describe()}</p>" if changeset is not None else ""
+        timestamp = datetime.now().strftime("%B %d, %Y at %I:%M %p UTC")
+        
+        out: List[str] = []
+        _PAGE_HEAD.render_into(out, {"timestamp": timestamp, "changes_line": changes_line})
+        for task_name, task_result in task_results.items():
+            if task_name in METADATA_KEYS:
+                continue
+            self._render_cached(out, "html-section", self._section_inputs(task_name, task_result, notes),
+                                self._render_task_section, cache_sections)
+        out.append(_PAGE_FOOTER)
+        if self.fragments is not None:
+            self.fragments.flush()
+        return "".join(out)
+    
+    def _render_cached(self, out: List[str], kind: str, inputs: tuple, render: Callable[..., None],
+                       cache: bool = True) -> None:
+        """Append the fragment for `inputs`, rendering it with `render(out, *inputs)` on a cache miss"""
+        if self.fragments is None or not cache:
+            render(out, *inputs)
+            return
+        key = fragment_key(FRAGMENT_VERSION, kind, *inputs)
+        fragment = self.fragments.get(key)
+        if fragment is None:
+            parts: List[str] = []
+            render(parts, *inputs)
+            fragment = "".join(parts)
+            self.fragments.put(key, fragment)
+        out.append(fragment)
+    
+    def _section_inputs(self, task_name: str, task_result: Any, notes: Optional[Dict[str, str]]) -> tuple:
+        note = notes.get(task_name) if notes else None
+        return (task_name, task_result, note) if note else (task_name, task_result)
+    
+    def _render_task_section(self, out: List[str], task_name: str, task_result: Any, note: str = "") -> None:
+        """Render one task section based on task type"""
+        _TASK_SECTION.render_into(out, {"display_name": self._get_task_display_name(task_name)})
         
         # Handle different types of task results
         if isinstance(task_result, str):
             # Try to parse as JSON first
             try:
                 parsed_result = json.loads(task_result)
-                section_html += self._format_parsed_result(parsed_result)
             except (json.JSONDecodeError, ValueError):
-                processed_text = self._process_markdown_formatting(self._format_text_content(task_result))
-                section_html += f'<div class="text-content">{processed_text}</div>'
+                processed_text = render_markdown(self._format_text_content(task_result))
+                _TEXT_CONTENT.render_into(out, {"content": processed_text})
+            else:
+                self._render_parsed_result(out, parsed_result)
         
         elif isinstance(task_result, (list, dict)):
-            section_html += self._format_structured_data(task_result)
+            self._render_structured_data(out, task_result)
         
         else:
-            section_html += f'<div class="text-content">{self._escape_html(str(task_result))}</div>'
+            _TEXT_CONTENT.render_into(out, {"content": escape_html(task_result)})
         
-        section_html += "</div>"
-        return section_html
+        if note:
+            _SECTION_NOTE.render_into(out, {"note": escape_html(note)})
+        out.append("</div>")
     
-    def _format_parsed_result(self, data: Dict[str, Any]) -> str:
-        """Format parsed JSON data"""
+    def _render_parsed_result(self, out: List[str], data: Any) -> None:
+        """Render parsed JSON data"""
         if isinstance(data, list):
-            return self._format_startup_list(data)
+            self._render_startup_list(out, data)
         elif isinstance(data, dict) and 'startups' in data:
-            return self._format_startup_list(data['startups'])
+            self._render_startup_list(out, data['startups'])
         else:
-            return f'<div class="text-content">{self._format_dict_content(data)}</div>'
+            _TEXT_CONTENT.render_into(out, {"content": self._format_dict_content(data)})
     
-    def _format_startup_list(self, startups: List[Dict[str, Any]]) -> str:
-        """Format list of startups into cards"""
+    def _render_startup_list(self, out: List[str], startups: List[Dict[str, Any]]) -> None:
+        """Render a list of startups as cards"""
         if not startups:
-            return '<div class="text-content">No startups found in this section.</div>'
+            _TEXT_CONTENT.render_into(out, {"content": "No startups found in this section."})
+            return
         
-        html = '<div class="startup-grid">'
+        # Detail labels repeat on every card, so each one is escaped once
+        labels: Dict[str, str] = {}
+        out.append('<div class="startup-grid">')
+        if self.fragments is None:
+            for startup in startups:
+                self._render_startup_card(out, startup, labels)
+        else:
+            # Unchanged startups come from the cache, looked up in one batch
+            keys = [fragment_key(FRAGMENT_VERSION, "html-card", startup) for startup in startups]
+            cached = self.fragments.get_many(keys)
+            rendered: Dict[str, str] = {}
+            for key, startup in zip(keys, startups):
+                fragment = cached.get(key) or rendered.get(key)
+                if fragment is None:
+                    parts: List[str] = []
+                    self._render_startup_card(parts, startup, labels)
+                    fragment = rendered[key] = "".join(parts)
+                out.append(fragment)
+            self.fragments.put_many(rendered)
+        out.append('</div>')
+    
+    def _render_startup_card(self, out: List[str], startup: Dict[str, Any], labels: Dict[str, str]) -> None:
+        """Render one startup card"""
+        name = startup.get('Company Name', startup.get('name', 'Unknown Company'))
+        website = startup.get('Website', startup.get('website', ''))
+        description = startup.get('Description', startup.get('description', ''))
         
-        for startup in startups:
-            name = self._escape_html(startup.get('Company Name', startup.get('name', 'Unknown Company')))
-            website = startup.get('Website', startup.get('website', ''))
-            description = self._escape_html(startup.get('Description', startup.get('description', '')))
-            
-            html += f'''
-            <div class="startup-card">
-                <div class="startup-name">{name}</div>'''
-            
-            if website:
-                html += f'<a href="{self._escape_html(website)}" class="startup-website">{self._escape_html(website)}</a>'
-            
-            if description:
-                html += f'<div class="startup-description">{description}</div>'
-            
-            html += '<div class="startup-details">'
-            
-            # Add additional details
-            for key, value in startup.items():
-                if key not in ['Company Name', 'name', 'Website', 'website', 'Description', 'description'] and value:
-                    escaped_key = self._escape_html(str(key))
-                    escaped_value = self._escape_html(str(value))
-                    html += f'''
-                    <div class="detail-item">
-                        <span class="detail-label">{escaped_key}:</span> {escaped_value}
-                    </div>
-                    '''
-            
-            html += '</div></div>'
+        _STARTUP_CARD.render_into(out, {"name": escape_html(name)})
+        if website:
+            _STARTUP_WEBSITE.render_into(out, {"website": escape_html(website)})
+        if description:
+            _STARTUP_DESCRIPTION.render_into(out, {"description": escape_html(description)})
         
-        html += '</div>'
-        return html
+        out.append('<div class="startup-details">')
+        for key, value in startup.items():
+            if key in _CARD_FIELDS or not value:
+                continue
+            label = labels.get(key)
+            if label is None:
+                label = labels[key] = escape_html(key)
+            _DETAIL_ITEM.render_into(out, {"label": label, "value": escape_html(value)})
+        out.append('</div></div>')
     
-    def _format_structured_data(self, data: Any) -> str:
-        """Format structured data (dict or list)"""
+    def _render_structured_data(self, out: List[str], data: Any) -> None:
+        """Render structured data (dict or list)"""
         if isinstance(data, list):
-            return self._format_startup_list(data)
+            self._render_startup_list(out, data)
+        elif isinstance(data, dict) and isinstance(data.get('startups'), list):
+            self._render_startup_list(out, data['startups'])
         elif isinstance(data, dict):
-            return f'<div class="text-content">{self._format_dict_content(data)}</div>'
+            _TEXT_CONTENT.render_into(out, {"content": self._format_dict_content(data)})
         else:
-            return f'<div class="text-content">{self._escape_html(str(data))}</div>'
+            _TEXT_CONTENT.render_into(out, {"content": escape_html(data)})
     
     def _format_dict_content(self, data: Dict[str, Any]) -> str:
         """Format dictionary content for display"""
-        html = ""
+        out: List[str] = []
         for key, value in data.items():
-            escaped_key = self._escape_html(str(key))
+            escaped_key = escape_html(key)
             if isinstance(value, (dict, list)):
-                html += f"<strong>{escaped_key}:</strong><br>"
                 try:
-                    json_str = json.dumps(value, indent=2)
-                    escaped_json = self._escape_html(json_str)
-                    html += f"<pre style='background: #f5f5f5; padding: 10px; border-radius: 4px; overflow-x: auto;'>{escaped_json}</pre><br>"
-                except:
-                    html += f"<pre style='background: #f5f5f5; padding: 10px; border-radius: 4px; overflow-x: auto;'>{self._escape_html(str(value))}</pre><br>"
+                    content = json.dumps(value, indent=2)
+                except (TypeError, ValueError):
+                    content = str(value)
+                _DICT_BLOCK.render_into(out, {"key": escaped_key, "content": escape_html(content)})
             else:
-                escaped_value = self._process_markdown_formatting(self._escape_html(str(value)))
-                html += f"<strong>{escaped_key}:</strong> {escaped_value}<br>"
-        return html
+                _DICT_ITEM.render_into(out, {"key": escaped_key, "value": render_markdown(escape_html(value))})
+        return "".join(out)
     
     def _format_text_content(self, text: str) -> str:
         """Format plain text content with basic HTML formatting"""
-        # Escape HTML first
-        escaped_text = self._escape_html(text)
-        
-        # Convert newlines to HTML breaks
-        formatted_text = escaped_text.replace('\n', '<br>')
-        
-        return formatted_text
-    
-    def _escape_html(self, text: str) -> str:
-        """Escape HTML characters"""
-        if not isinstance(text, str):
-            text = str(text)
-        
-        return (text.replace('&', '&amp;')
-                   .replace('<', '&lt;')
-                   .replace('>', '&gt;')
-                   .replace('"', '&quot;')
-                   .replace("'", '&#x27;'))
+        # Escape HTML first, then convert newlines to HTML breaks
+        return escape_html(text).replace('\n', '<br>')
     
     def _get_task_display_name(self, task_name: str) -> str:
         """Get human-readable task name"""
-        task_names = {
-            'Discover AI startups in Brazil by researching': 'AI Startup Discovery',
-            'For each discovered startup, conduct detailed tech': 'Technical Analysis',
-            'Research comprehensive funding information for eac': 'Funding Research',
-            'Identify and profile key technical leadership for ': 'Leadership Profiling',
-            'Conduct comprehensive market analysis for Brazil A': 'Market Intelligence',
-            'Validate all collected startup information and cre': 'Validation & Scoring'
-        }
-        
-        for key, display_name in task_names.items():
+        for key, display_name in _TASK_DISPLAY_NAMES.items():
             if task_name.startswith(key):
                 return display_name
         
         return task_name[:50] + "..." if len(task_name) > 50 else task_name
     
-    def _process_markdown_formatting(self, text: str) -> str:
-        """Process markdown formatting in text"""
-        import re
+    def render_report(self,
+                      task_results: Dict[str, Any],
+                      subject: str = "NVIDIA Inception AI Startup Discovery Report",
+                      from_email: str = "noreply@yourdomain.com",
+                      changeset: Optional[Union[Changeset, Dict[str, Any]]] = None,
+                      max_bytes: Optional[int] = None,
+                      archive_path: Optional[str] = None) -> Dict[str, Any]:
+        """Render the report email (HTML and text) without sending it.
         
-        # Handle **bold** text
-        text = re.sub(r'\*\*(.*?)\*\*', r'<strong>\1</strong>', text)
-        
-        # Handle *italic* text (but not the ones already processed as bold)
-        text = re.sub(r'(?<!\*)\*([^*]+)\*(?!\*)', r'<em>\1</em>', text)
+        When the full report would not fit in `max_bytes` (default Config.EMAIL_MAX_BYTES, 0 for no
+        limit), the email inlines only the top startups and previews of each section, and the full
+        dataset is written to `{archive_path}.csv.gz` / `.jsonl.gz` and attached when small enough.
+        """
+        max_bytes = Config.EMAIL_MAX_BYTES if max_bytes is None else max_bytes
+        changeset = self._as_changeset(changeset)
+        if changeset is not None:
+            task_results = changeset.filter_task_results(task_results)
         
-        # Handle markdown links [text](url)
-        text = re.sub(r'\[([^\]]+)\]\(([^)]+)\)', r'<a href="\2" style="color: #76b900;">\1</a>', text)
+        message = {"from": from_email, "subject": subject}
+        # A serialized size estimate spares rendering the full report when it clearly can't fit
+        if max_bytes <= 0 or not self._estimate_exceeds(task_results, max_bytes):
+            message["html"] = self._render_html(task_results, changeset, None)
+            message["text"] = self._create_text_version(task_results)
+            if max_bytes <= 0 or len(message["html"].encode("utf-8")) + len(message["text"].encode("utf-8")) <= max_bytes:
+                return message
+        message.update(self._render_digest(task_results, changeset, max_bytes, archive_path))
+        return message
+    
+    def _estimate_exceeds(self, task_results: Dict[str, Any], max_bytes: int) -> bool:
+        """Whether the task results alone, serialized, already exceed `max_bytes`"""
+        from horizon.utils.export import bounded_json
         
-        return text
+        remaining = max_bytes
+        for task_name, task_result in task_results.items():
+            if task_name in METADATA_KEYS:
+                continue
+            remaining -= len(task_result) if isinstance(task_result, str) else len(bounded_json(task_result, remaining))
+            if remaining < 0:
+                return True
+        return False
     
-    def send_report_email(self, 
-                         task_results: Dict[str, Any], 
-                         to_emails: List[str], 
-                         subject: str = "NVIDIA Inception AI Startup Discovery Report",
-                         from_email: str = "noreply@yourdomain.com") -> Dict[str, Any]:
-        """Send formatted task results via email"""
+    def _render_digest(self, task_results: Dict[str, Any], changeset: Optional[Changeset], max_bytes: int,
+                       archive_path: Optional[str]) -> Dict[str, Any]:
+        """HTML and text of the top startups that fit in `max_bytes`, with the full data as attachments"""
+        from horizon.utils.digest import ReportDigest, attachments, write_dataset_archives
+        from horizon.utils.events import events
+        
+        archive_path = archive_path or os.path.join(
+            Config.EMAIL_ARCHIVE_DIR, f"horizon_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+        archive = write_dataset_archives(task_results, archive_path)
+        files = attachments(archive["paths"], Config.EMAIL_MAX_ATTACHMENT_BYTES)
+        if files:
+            where = "the attached " + " and ".join(f["filename"] for f in files)
+        else:
+            where = " and ".join(archive["paths"]) + " (too large to attach)"
+        
+        top_n, preview_chars = Config.EMAIL_INLINE_STARTUPS, Config.EMAIL_PREVIEW_CHARS
+        digest = ReportDigest(task_results, top_n, where)
+        while True:
+            results, notes = digest.render(top_n, preview_chars)
+            # Digest sections differ on every attempt and every run, so only their cards are cached
+            html_content = self._render_html(results, changeset, notes, cache_sections=False)
+            text_content = self._create_text_version(results, notes, cache_sections=False)
+            size = len(html_content.encode("utf-8")) + len(text_content.encode("utf-8"))
+            if size <= max_bytes or (top_n == 0 and preview_chars <= 100):
+                break
+            top_n, preview_chars = top_n // 2, max(100, preview_chars // 2)
         
-        html_content = self.format_task_results_for_email(task_results)
+        events.emit("email.digest", f"✂️  Report over {max_bytes // 1000} KB: inlined the top {top_n} startups "
+                    f"per section ({size // 1000} KB), full data in {', '.join(archive['paths'])}",
+                    inline_startups=top_n, size_bytes=size, startups=archive["startups"],
+                    attached=bool(files), archives=archive["paths"])
+        message = {"html": html_content, "text": text_content}
+        if files:
+            message["attachments"] = files
+        return message
+    
+    def send_message(self,
+                     message: Dict[str, Any],
+                     to_emails: List[str],
+                     personalize: Optional[Callable[[str, Dict[str, Any]], Dict[str, Any]]] = None,
+                     status_path: Optional[str] = None) -> Dict[str, Any]:
+        """Send a rendered message to every recipient.
         
-        # Create text version for better compatibility
-        text_content = self._create_text_version(task_results)
+        Each recipient gets their own copy, sent in parallel batches with retries; `personalize`
+        may adjust one recipient's email and `status_path` saves the per-recipient delivery status.
+        """
+        from horizon.utils.delivery import NewsletterDelivery, ResendClient
         
         try:
-            params = {
-                "from": from_email,
-                "to": to_emails,
-                "subject": subject,
-                "html": html_content,
-                "text": text_content
-            }
-            
-            response = resend.Emails.send(params)
-            
-            return {
-                "success": True,
-                "message": "Email sent successfully",
-                "email_id": response.get('id'),
-                "recipients": to_emails
-            }
-            
+            client = ResendClient(self.api_key)
+            try:
+                delivery = NewsletterDelivery(client)
+                report = delivery.deliver(message, to_emails, personalize)
+            finally:
+                client.close()
+            if status_path:
+                delivery.write_status(status_path)
         except Exception as e:
             return {
                 "success": False,
                 "error": str(e),
                 "recipients": to_emails
             }
+        
+        email_ids = [entry.get('email_id') for entry in report['status'].values() if entry.get('email_id')]
+        result = {
+            "success": report['success'],
+            "message": f"Email sent to {report['sent']} of {report['recipients']} recipients",
+            "email_id": email_ids[0] if email_ids else None,
+            "recipients": to_emails,
+            "delivery": report
+        }
+        if not report['success']:
+            errors = {entry.get('error') for entry in report['status'].values() if entry.get('error')}
+            result["error"] = "; ".join(sorted(errors)) or "No recipients"
+        return result
+    
+    def send_report_email(self, 
+                         task_results: Dict[str, Any], 
+                         to_emails: List[str], 
+                         subject: str = "NVIDIA Inception AI Startup Discovery Report",
+                         from_email: str = "noreply@yourdomain.com",
+                         changeset: Optional[Union[Changeset, Dict[str, Any]]] = None,
+                         personalize: Optional[Callable[[str, Dict[str, Any]], Dict[str, Any]]] = None,
+                         status_path: Optional[str] = None) -> Dict[str, Any]:
+        """Render and send task results via email (only the delta when a `changeset` is given)"""
+        message = self.render_report(task_results, subject, from_email, changeset)
+        return self.send_message(message, to_emails, personalize, status_path)
+    
+    def _as_changeset(self, changeset: Optional[Union[Changeset, Dict[str, Any]]]) -> Optional[Changeset]:
+        if isinstance(changeset, dict):
+            return Changeset.from_dict(changeset)
+        return changeset
     
-    def _create_text_version(self, task_results: Dict[str, Any]) -> str:
+    def _render_text_section(self, out: List[str], task_name: str, task_result: Any, note: str = "") -> None:
+        """Render one task section of the plain text version"""
+        display_name = self._get_task_display_name(task_name)
+        out.append(f"\n{display_name}\n{'=' * len(display_name)}\n\n")
+        
+        if isinstance(task_result, str):
+            try:
+                out.append(json.dumps(json.loads(task_result), indent=2))
+            except ValueError:
+                out.append(task_result)
+        elif isinstance(task_result, (dict, list)):
+            out.append(json.dumps(task_result, indent=2, ensure_ascii=False))
+        else:
+            out.append(str(task_result))
+        out.append("\n\n")
+        if note:
+            out.append(f"{note}\n\n")
+    
+    def _create_text_version(self, task_results: Dict[str, Any], notes: Optional[Dict[str, str]] = None,
+                             cache_sections: bool = True) -> str:
         """Create plain text version of the report"""
         timestamp = datetime.now().strftime("%B %d, %Y at %I:%M %p UTC")
         
-        text_content = f"""
+        out = [f"""
 NVIDIA Inception AI Startup Discovery Report
 ============================================
 
 Generated on: {timestamp}
 
-"""
+"""]
 
         for task_name, task_result in task_results.items():
-            if task_name in ['total_tasks', 'completion_status']:
+            if task_name in METADATA_KEYS:
                 continue
-                
-            display_name = self._get_task_display_name(task_name)
-            text_content += f"\n{display_name}\n"
-            text_content += "=" * len(display_name) + "\n\n"
-            
-            if isinstance(task_result, str):
-                try:
-                    parsed_result = json.loads(task_result)
-                    text_content += json.dumps(parsed_result, indent=2) + "\n\n"
-                except:
-                    text_content += task_result + "\n\n"
-            else:
-                text_content += str(task_result) + "\n\n"
+            self._render_cached(out, "text-section", self._section_inputs(task_name, task_result, notes),
+                                self._render_text_section, cache_sections)
+        if self.fragments is not None:
+            self.fragments.flush()
         
         # Add summary
         if 'total_tasks' in task_results and 'completion_status' in task_results:
             total_tasks = task_results.get('total_tasks', 'N/A')
             completion_status = task_results.get('completion_status', 'Unknown').upper()
             
-            text_content += f"""
+            out.append(f"""
 Execution Summary
 =================
 Total Tasks Completed: {total_tasks}
@@ -411,6 +577,6 @@ Status: {completion_status}
 
 ---
 This report was generated by the NVIDIA Inception AI Startup Discovery System
-"""
+""")
         
-        return text_content
\ No newline at end of file
+        return "".join(out)
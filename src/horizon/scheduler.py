@@ -0,0 +1,308 @@
+#!/usr/bin/env python
+"""
+Recurring discovery scheduler.
+
+Keeps a persisted priority queue of (country, venture, refresh type) jobs for
+every country in Config.TARGET_COUNTRIES, ordered by when each job's data goes
+stale. Jobs that keep finding new or changed startups come due sooner; jobs
+that find nothing drift back to their base refresh interval. Runs are bounded
+by a concurrency limit, a runs-per-hour budget and a per-country cooldown, and
+the queue survives restarts:
+
+    schedule              # run forever
+    schedule --once       # run everything that is due, then exit
+    schedule --status     # print the queue
+"""
+import argparse
+import heapq
+import json
+import multiprocessing
+import os
+import signal
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .config import Config
+from .utils.events import events
+
+REFRESH_TYPES = ("delta", "venture", "full")
+
+# Expected yield is an exponential moving average of new + changed startups per run
+YIELD_SMOOTHING = 0.5
+# A job yielding this many startups per run is refreshed twice as often
+YIELD_SCALE = 10.0
+MIN_INTERVAL_FRACTION = 0.25
+
+# Failed jobs retry after 15 minutes, doubling up to their refresh interval
+RETRY_BASE_SECONDS = 900
+
+
+def job_id(country: str, refresh: str, venture: Optional[str] = None) -> str:
+    return f"{refresh}:{country}:{venture or '*'}"
+
+
+def _format_time(timestamp: Optional[float]) -> str:
+    return datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M") if timestamp else "never"
+
+
+class JobQueue:
+    """Discovery jobs keyed by id, with a heap ordered by due time, persisted as JSON"""
+
+    def __init__(self, path: Path, refresh_hours: Optional[Dict[str, float]] = None):
+        self.path = Path(path)
+        self.refresh_hours = refresh_hours or Config.SCHEDULER_REFRESH_HOURS
+        self.jobs: Dict[str, Dict[str, Any]] = {}
+        self.country_runs: Dict[str, float] = {}
+        self.recent_starts: List[float] = []
+        self._heap: List[Tuple[float, int, str]] = []
+        self._load()
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"⚠️  Could not read scheduler state {self.path}: {e}; starting fresh")
+            return
+        self.jobs = state.get("jobs", {})
+        self.country_runs = state.get("country_runs", {})
+        self.recent_starts = state.get("recent_starts", [])
+        for job in self.jobs.values():
+            # A job that was running when the scheduler stopped is due again
+            job["running"] = False
+        self._rebuild_heap()
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"jobs": self.jobs, "country_runs": self.country_runs,
+                       "recent_starts": self.recent_starts}, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def _rebuild_heap(self) -> None:
+        self._heap = [self._heap_entry(job) for job in self.jobs.values()]
+        heapq.heapify(self._heap)
+
+    def _heap_entry(self, job: Dict[str, Any]) -> Tuple[float, int, str]:
+        # Among jobs due at the same time, cheaper refreshes go first
+        return (job["due_at"], REFRESH_TYPES.index(job["refresh"]), job["id"])
+
+    def _schedule(self, job: Dict[str, Any], due_at: float) -> None:
+        job["due_at"] = due_at
+        heapq.heappush(self._heap, self._heap_entry(job))
+
+    def sync(self, countries: List[str], ventures: List[str], now: float) -> None:
+        """Create jobs for new targets and drop jobs for targets that were removed"""
+        wanted = {}
+        for country in countries:
+            wanted[job_id(country, "delta")] = (country, "delta", None)
+            wanted[job_id(country, "full")] = (country, "full", None)
+            for venture in ventures:
+                wanted[job_id(country, "venture", venture)] = (country, "venture", venture)
+
+        for key in set(self.jobs) - set(wanted):
+            del self.jobs[key]
+        for key, (country, refresh, venture) in wanted.items():
+            if key not in self.jobs:
+                # A country's first delta run already covers everything, so its first full run can wait
+                due_at = now + self.refresh_hours["delta"] * 3600 if refresh == "full" else now
+                self.jobs[key] = {"id": key, "country": country, "refresh": refresh, "venture": venture,
+                                  "due_at": due_at, "last_run": None, "runs": 0, "failures": 0,
+                                  "expected_yield": None, "last_error": None, "running": False}
+        self._rebuild_heap()
+
+    def interval(self, job: Dict[str, Any]) -> float:
+        """Refresh interval in seconds, shortened for jobs that keep yielding new startups"""
+        base = self.refresh_hours[job["refresh"]] * 3600
+        expected = job.get("expected_yield") or 0.0
+        return base * max(MIN_INTERVAL_FRACTION, 1.0 / (1.0 + expected / YIELD_SCALE))
+
+    def next_ready(self, now: float, busy_countries: set, cooldown_seconds: float) -> Optional[Dict[str, Any]]:
+        """Most overdue job whose country is neither running nor cooling down, or None"""
+        skipped = []
+        ready = None
+        while self._heap and self._heap[0][0] <= now:
+            entry = heapq.heappop(self._heap)
+            job = self.jobs.get(entry[2])
+            if job is None or job["running"] or job["due_at"] != entry[0]:
+                continue  # stale heap entry
+            country = job["country"]
+            if country in busy_countries or now - self.country_runs.get(country, 0.0) < cooldown_seconds:
+                skipped.append(entry)
+                continue
+            ready = job
+            break
+        for entry in skipped:
+            heapq.heappush(self._heap, entry)
+        return ready
+
+    def next_due_at(self) -> Optional[float]:
+        while self._heap and self._heap[0][2] not in self.jobs:
+            heapq.heappop(self._heap)
+        return self._heap[0][0] if self._heap else None
+
+    def runs_in_last_hour(self, now: float) -> int:
+        self.recent_starts = [start for start in self.recent_starts if now - start < 3600]
+        return len(self.recent_starts)
+
+    def start(self, job: Dict[str, Any], now: float) -> None:
+        job["running"] = True
+        self.country_runs[job["country"]] = now
+        self.recent_starts.append(now)
+
+    def finish(self, job: Dict[str, Any], result: Dict[str, Any], now: float) -> None:
+        job["running"] = False
+        job["runs"] += 1
+        if "error" in result:
+            job["failures"] += 1
+            job["last_error"] = result["error"]
+            retry = min(self.interval(job), RETRY_BASE_SECONDS * 2 ** (job["failures"] - 1))
+            self._schedule(job, now + retry)
+            return
+
+        job["failures"] = 0
+        job["last_error"] = None
+        job["last_run"] = now
+        found = float(result.get("yield", 0))
+        previous = job.get("expected_yield")
+        job["expected_yield"] = found if previous is None else \
+            YIELD_SMOOTHING * found + (1 - YIELD_SMOOTHING) * previous
+        self._schedule(job, now + self.interval(job))
+
+    def ordered(self) -> List[Dict[str, Any]]:
+        return sorted(self.jobs.values(), key=lambda job: (job["due_at"], REFRESH_TYPES.index(job["refresh"])))
+
+
+def run_job(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Run one discovery job in a worker process and report how many startups were new or changed"""
+    from .crew import Horizon
+
+    ventures = [job["venture"]] if job.get("venture") else None
+    try:
+        result = Horizon().discover_country(job["country"], specific_ventures=ventures,
+                                            delta_only=job["refresh"] != "full")
+    except Exception as e:
+        return {"error": f"{type(e).__name__}: {e}"}
+    if "error" in result:
+        return {"error": result["error"]}
+    counts = result.get("changeset", {}).get("counts", {})
+    return {"yield": counts.get("added", 0) + counts.get("modified", 0)}
+
+
+class DiscoveryScheduler:
+    """Runs due jobs from a JobQueue within concurrency, rate and cooldown budgets"""
+
+    def __init__(self, queue: JobQueue, concurrency: Optional[int] = None,
+                 max_runs_per_hour: Optional[int] = None, cooldown_hours: Optional[float] = None):
+        self.queue = queue
+        self.concurrency = max(1, concurrency or Config.SCHEDULER_CONCURRENCY)
+        self.max_runs_per_hour = max_runs_per_hour or Config.SCHEDULER_MAX_RUNS_PER_HOUR
+        self.cooldown_seconds = 3600 * (Config.SCHEDULER_COUNTRY_COOLDOWN_HOURS if cooldown_hours is None
+                                        else cooldown_hours)
+        self._stopping = False
+
+    def stop(self, *_args) -> None:
+        if not self._stopping:
+            print("\n🛑 Stopping after running jobs finish...")
+        self._stopping = True
+
+    def _launch_ready(self, pool: ProcessPoolExecutor, running: Dict[Any, Dict[str, Any]]) -> None:
+        now = time.time()
+        while len(running) < self.concurrency and self.queue.runs_in_last_hour(now) < self.max_runs_per_hour:
+            busy = {job["country"] for job in running.values()}
+            job = self.queue.next_ready(now, busy, self.cooldown_seconds)
+            if job is None:
+                return
+            self.queue.start(job, now)
+            self.queue.save()
+            label = f" ({job['venture']})" if job["venture"] else ""
+            events.emit("job.start", f"▶️  {job['refresh']} refresh for {job['country']}{label}",
+                        job=job["id"], country=job["country"], venture=job["venture"], refresh=job["refresh"])
+            running[pool.submit(run_job, dict(job))] = job
+
+    def run(self, once: bool = False, poll_seconds: float = 60.0) -> None:
+        """Run jobs as they come due; with `once`, exit when nothing is due or running"""
+        signal.signal(signal.SIGINT, self.stop)
+        signal.signal(signal.SIGTERM, self.stop)
+
+        # Separate processes keep each run's metrics, cassette and exporter state apart
+        context = multiprocessing.get_context("spawn")
+        running: Dict[Any, Dict[str, Any]] = {}
+        with ProcessPoolExecutor(max_workers=self.concurrency, mp_context=context) as pool:
+            while True:
+                if not self._stopping:
+                    self._launch_ready(pool, running)
+                if not running and (once or self._stopping):
+                    break
+
+                timeout = poll_seconds
+                next_due = self.queue.next_due_at()
+                if next_due is not None and next_due > time.time():
+                    timeout = min(poll_seconds, max(1.0, next_due - time.time()))
+                if not running:
+                    time.sleep(timeout)
+                    continue
+                done, _ = wait(list(running), timeout=timeout, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    job = running.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        result = {"error": f"{type(e).__name__}: {e}"}
+                    self.queue.finish(job, result, time.time())
+                    self.queue.save()
+                    if "error" in result:
+                        events.error("job.end", f"❌ {job['id']} failed: {result['error']}",
+                                     job=job["id"], error=result["error"], next_due=job["due_at"])
+                    else:
+                        events.emit("job.end", f"✅ {job['id']}: {result['yield']} new or changed startups, "
+                                    f"next run {_format_time(job['due_at'])}",
+                                    job=job["id"], found=result["yield"], next_due=job["due_at"])
+
+
+def print_status(queue: JobQueue) -> None:
+    print(f"🗓️  Discovery queue ({len(queue.jobs)} jobs, state in {queue.path})")
+    print("=" * 60)
+    for job in queue.ordered():
+        expected = job.get("expected_yield")
+        expected = "?" if expected is None else f"{expected:.1f}"
+        status = f" ⚠️ {job['failures']} failure(s)" if job["failures"] else ""
+        print(f"{_format_time(job['due_at'])}  {job['id']:<45} last {_format_time(job['last_run'])}, "
+              f"expected yield {expected}{status}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the recurring discovery scheduler"""
+    parser = argparse.ArgumentParser(description="Keep every target country's startup data fresh")
+    parser.add_argument("--once", action="store_true", help="Run the jobs that are due, then exit")
+    parser.add_argument("--status", action="store_true", help="Print the job queue and exit")
+    parser.add_argument("--countries", nargs="*", help="Countries to keep fresh (default: Config.TARGET_COUNTRIES)")
+    parser.add_argument("--no-ventures", action="store_true", help="Skip per-venture refresh jobs")
+    parser.add_argument("--state", default=Config.SCHEDULER_STATE_PATH, help="Queue state file")
+    parser.add_argument("--poll", type=float, default=60.0, help="Seconds between queue checks")
+    args = parser.parse_args(argv)
+
+    queue = JobQueue(Path(args.state))
+    queue.sync(args.countries or Config.TARGET_COUNTRIES, [] if args.no_ventures else Config.LATAM_VCS, time.time())
+    queue.save()
+
+    if args.status:
+        print_status(queue)
+        return 0
+
+    print("🗓️  NVIDIA Inception discovery scheduler")
+    print("=" * 60)
+    DiscoveryScheduler(queue).run(once=args.once, poll_seconds=args.poll)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,6 +3,10 @@ from .startup_discovery_tools import (
     CompanyAnalysisTool,
     FundingResearchTool,
     LinkedInSearchTool,
+    LazyTool,
+    PooledScrapeTool,
+    get_scrape_tool,
+    get_website_search_tool,
     scrape_tool,
     website_search_tool
 )
@@ -12,6 +16,10 @@ __all__ = [
     "CompanyAnalysisTool",
     "FundingResearchTool",
     "LinkedInSearchTool",
+    "LazyTool",
+    "PooledScrapeTool",
+    "get_scrape_tool",
+    "get_website_search_tool",
     "scrape_tool",
     "website_search_tool"
 ]
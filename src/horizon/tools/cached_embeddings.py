@@ -0,0 +1,37 @@
+"""
+ChromaDB embedding function backed by the persistent embedding cache.
+
+Imported only when WebsiteSearchTool is built, since it pulls in chromadb.
+"""
+from chromadb.api.types import Documents, EmbeddingFunction, Embeddings
+
+from horizon.config import Config
+from horizon.utils.embeddings import CachedEmbedder, get_embedding_cache
+
+# What WebsiteSearchTool embeds with when no model is configured (chromadb's ONNX default)
+DEFAULT_MODEL = "chromadb/all-MiniLM-L6-v2"
+
+
+class CachedEmbeddingFunction(EmbeddingFunction[Documents]):
+    """Embeds through `inner` only the documents missing from the embedding cache"""
+
+    def __init__(self, inner: EmbeddingFunction, model: str):
+        self._embedder = CachedEmbedder(inner, model, get_embedding_cache())
+
+    def __call__(self, input: Documents) -> Embeddings:
+        return self._embedder(list(input))
+
+
+def cached_embedding_function(model: str = "") -> CachedEmbeddingFunction:
+    """Embedding function for `model` ("provider/model_name", default Config.EMBEDDING_MODEL), cached on disk"""
+    model = model or Config.EMBEDDING_MODEL
+    if not model:
+        from chromadb.utils.embedding_functions import DefaultEmbeddingFunction
+        return CachedEmbeddingFunction(DefaultEmbeddingFunction(), DEFAULT_MODEL)
+
+    from crewai.rag.embeddings.factory import get_embedding_function
+    provider, _, model_name = model.partition("/")
+    options = {"provider": provider, "model_name": model_name}
+    if provider == "openai":
+        options["api_key"] = Config.OPENAI_API_KEY
+    return CachedEmbeddingFunction(get_embedding_function(options), model)
@@ -1,18 +1,148 @@
 from crewai.tools import BaseTool
-from crewai_tools import ScrapeWebsiteTool, WebsiteSearchTool
-from typing import Type, List, Dict, Any, Optional
+from typing import Callable, Type, List, Dict, Any, Iterator, Optional
 from pydantic import BaseModel, Field
-import requests
+import itertools
 import json
+import threading
 import time
 import re
-from urllib.parse import urljoin, urlparse
-from pathlib import Path
-from horizon.utils.database import StartupDB
+from collections import OrderedDict
+from horizon.config import Config
+from horizon.crawler import fresh_portfolios, portfolio_companies
+from horizon.utils.budget import budget
+from horizon.utils.database import DEFAULT_DB_PATH, StartupDB, StartupSink
+from horizon.utils.cassette import get_cassette
+from horizon.utils.events import events
+from horizon.utils.http import scrape_text
+from horizon.utils.metrics import metrics
+
+# Non-empty lines of a search result, matched lazily instead of splitting the whole text
+_LINE_PATTERN = re.compile(r"[^\n]+")
+
+# Built-in CrewAI tools are constructed on first use: importing crewai_tools and
+# building WebsiteSearchTool pulls in the whole RAG/embedding stack.
+_builtin_tools: Dict[str, BaseTool] = {}
+_builtin_tools_lock = threading.Lock()
+
+
+class ScrapeWebsiteInput(BaseModel):
+    """Input schema for the lazily built website scraper."""
+    website_url: str = Field(..., description="Mandatory website url to read the file")
+
+
+class PooledScrapeTool(BaseTool):
+    """Drop-in for ScrapeWebsiteTool that fetches through the shared pooled HTTP client"""
+    name: str = "Read website content"
+    description: str = "A tool that can be used to read a website content."
+    args_schema: Type[BaseModel] = ScrapeWebsiteInput
+
+    def _run(self, website_url: str) -> str:
+        return scrape_text(website_url)
+
+
+def get_scrape_tool() -> BaseTool:
+    """Return the shared scraper, building it on first call"""
+    with _builtin_tools_lock:
+        if "scrape_tool" not in _builtin_tools:
+            _builtin_tools["scrape_tool"] = PooledScrapeTool()
+        return _builtin_tools["scrape_tool"]
+
+
+def get_website_search_tool() -> BaseTool:
+    """Return the shared WebsiteSearchTool, building it on first call"""
+    with _builtin_tools_lock:
+        if "website_search_tool" not in _builtin_tools:
+            from crewai_tools import WebsiteSearchTool
+            if Config.EMBEDDING_CACHE_SIZE > 0:
+                from crewai.rag.chromadb.config import ChromaDBConfig
+                from horizon.tools.cached_embeddings import cached_embedding_function
+                # Chunks already embedded in any earlier task or run come from the embedding cache
+                config = ChromaDBConfig(embedding_function=cached_embedding_function())
+                _builtin_tools["website_search_tool"] = WebsiteSearchTool(config=config)
+            else:
+                _builtin_tools["website_search_tool"] = WebsiteSearchTool()
+        return _builtin_tools["website_search_tool"]
+
+
+class WebsiteSearchInput(BaseModel):
+    """Input schema for the lazily built website search."""
+    search_query: str = Field(..., description="Mandatory search query you want to use to search a specific website")
+    website: Optional[str] = Field(None, description="Valid website URL you want to search on")
+
+
+class LazyTool(BaseTool):
+    """Stand-in handed to agents that builds the real tool only when it is first run"""
+    factory: Callable[[], BaseTool] = Field(exclude=True)
+    budget_kind: Optional[str] = Field(None, exclude=True, description="Run budget charged per call")
+
+    def _run(self, *args, **kwargs) -> Any:
+        if self.budget_kind:
+            budget.spend(self.budget_kind)
+        request = {"args": list(args), "kwargs": kwargs}
+        return get_cassette().call("tool", self.name, request, lambda: self.factory().run(*args, **kwargs))
+
+
+scrape_tool = LazyTool(
+    name="Read website content",
+    description="A tool that can be used to read a website content.",
+    args_schema=ScrapeWebsiteInput,
+    factory=get_scrape_tool,
+    budget_kind="scrapes",
+)
+website_search_tool = LazyTool(
+    name="Search in a specific website",
+    description="A tool that can be used to semantic search a query from a specific URL content.",
+    args_schema=WebsiteSearchInput,
+    factory=get_website_search_tool,
+    budget_kind="searches",
+)
+
+
+# Results of earlier searches and scrapes, served instead of new calls once the budget runs low
+RESULT_CACHE_SIZE = 512
+_result_cache: "OrderedDict[tuple, str]" = OrderedDict()
+_result_cache_lock = threading.Lock()
+
+
+def _budgeted_call(kind: str, tool_name: str, request: Dict[str, Any], fn: Callable[[], str]) -> str:
+    """Charge a search or scrape to the budget, preferring a cached result when the budget is tight"""
+    cache_key = (tool_name, json.dumps(request, sort_keys=True))
+    with metrics.timed("tool", tool_name) as call:
+        with _result_cache_lock:
+            cached = _result_cache.get(cache_key)
+        if cached is not None and budget.prefer_cache():
+            call["cache_hit"] = True
+            events.emit("cache.hit", tool=tool_name, request=request, pressure=round(budget.pressure(), 3))
+            return cached
+
+        budget.spend(kind)
+        result = get_cassette().call("tool", tool_name, request, fn)
+        with _result_cache_lock:
+            _result_cache[cache_key] = result
+            _result_cache.move_to_end(cache_key)
+            if len(_result_cache) > RESULT_CACHE_SIZE:
+                _result_cache.popitem(last=False)
+        return result
+
+
+def _search(query: str) -> str:
+    """Run a website search on behalf of a custom tool, recording its latency"""
+    return _budgeted_call("searches", "website_search_tool", {"query": query},
+                          lambda: get_website_search_tool().run(query))
+
+
+def _scrape(website_url: str) -> str:
+    """Scrape a website on behalf of a custom tool, recording its latency"""
+    return _budgeted_call("scrapes", "scrape_tool", {"website_url": website_url},
+                          lambda: get_scrape_tool().run(website_url))
+
+
+def _rate_limit(seconds: float) -> None:
+    """Sleep between external calls, recording the time spent waiting"""
+    with metrics.timed("sleep", "rate_limit"):
+        # When replaying a cassette, sleeps follow the simulated latency factor
+        get_cassette().sleep(seconds)
 
-# Initialize built-in CrewAI tools
-scrape_tool = ScrapeWebsiteTool()
-website_search_tool = WebsiteSearchTool()
 
 class StartupSearchInput(BaseModel):
     """Input schema for startup search tool."""
@@ -47,10 +177,11 @@ class StartupDiscoveryTool(BaseTool):
     args_schema: Type[BaseModel] = StartupSearchInput
     db: Optional[StartupDB] = Field(None, exclude=True)
 
-    def __init__(self, **kwargs):
-        super().__init__(**kwargs)
-        # Change to store full startup data
-        self.db = StartupDB(Path("outputs/startup_database.json"))
+    def _get_db(self) -> StartupDB:
+        """Open the startup database on first use"""
+        if self.db is None:
+            self.db = StartupDB(DEFAULT_DB_PATH)
+        return self.db
 
     def _run(self, country: str, industry: str = "AI", specific_ventures: Optional[List[str]] = None, funding_stage: str = "all") -> str:
         """Discover startups by searching multiple online sources"""
@@ -69,35 +200,38 @@ class StartupDiscoveryTool(BaseTool):
             f"ALLVP {country} investments" if country in ["Mexico", "Colombia"] else f"{country} VC investments",
             f"{country} startup accelerators companies"
         ]
+        # Portfolios kept fresh by the crawler (crawl_portfolios) need no search; their companies come from the crawl
+        fresh = fresh_portfolios(country=country)
+        crawled = sorted(vc for vc in fresh if any(vc in query for query in startup_sources))
+        startup_sources = [query for query in startup_sources if not any(vc in query for vc in fresh)]
+        
+        # Candidates are staged in bounded chunks and committed once at the end
+        with StartupSink(self._get_db()) as sink:
+            # Limit searches, fewer once the run budget gets tight
+            for search_query in startup_sources[:budget.limit(5)]:
+                try:
+                    search_result = _search(search_query)
+                    if search_result:
+                        sink.extend(self._extract_companies_from_text(search_result, country, industry))
+                        _rate_limit(2)  # Rate limiting
+                except Exception as e:
+                    events.error("tool.error", f"Search error for query '{search_query}': {e}",
+                                 tool="startup_discovery", query=search_query, error=str(e))
+                    continue
         
-        discovered_startups = []
-        existing_startups = self.db.load_startups()
-        
-        for search_query in startup_sources[:5]:  # Limit searches
-            try:
-                search_result = website_search_tool.run(search_query)
-                if search_result:
-                    companies = self._extract_companies_from_text(search_result, country, industry)
-                    discovered_startups.extend(companies)
-                    time.sleep(2)  # Rate limiting
-            except Exception as e:
-                print(f"Search error for query '{search_query}': {e}")
-                continue
-        
-        for startup in discovered_startups:
-            startup['country'] = country
-            startup['industry'] = industry
-        
-        added_count = self.db.add_startups(discovered_startups)
+        # The crawler already stored these; they are reported on their own so search results keep the preview
+        portfolio = list(itertools.islice(portfolio_companies(crawled, country), sink.preview_size))
         
         return json.dumps({
             "country": country,
             "industry": industry,
             "search_type": "general_discovery",
-            "total_found": len(discovered_startups),
-            "newly_added": added_count,
-            "startups": discovered_startups[:20],
-            "sources_searched": len(startup_sources)
+            "total_found": sink.received,
+            "newly_added": sink.added,
+            "startups": sink.preview,
+            "sources_searched": len(startup_sources),
+            "crawled_portfolios": crawled,
+            "portfolio_companies": portfolio
         }, indent=2)
     
     def _search_specific_ventures(self, ventures: List[str], country: str, industry: str) -> str:
@@ -123,16 +257,17 @@ class StartupDiscoveryTool(BaseTool):
                 f'site:crunchbase.com "{venture}"'
             ]
             
-            for query in search_queries:
+            for query in search_queries[:budget.limit(len(search_queries))]:
                 try:
-                    result = website_search_tool.run(query)
+                    result = _search(query)
                     if result:
                         info = self._extract_venture_specific_info(result, venture)
                         if info:
                             venture_data["found_info"].extend(info)
-                    time.sleep(1.5)  # Shorter delay for specific searches
+                    _rate_limit(1.5)  # Shorter delay for specific searches
                 except Exception as e:
-                    print(f"Error searching for {venture}: {e}")
+                    events.error("tool.error", f"Error searching for {venture}: {e}",
+                                 tool="venture_search", query=query, error=str(e))
                     continue
             
             # Deduplicate and clean venture data
@@ -214,26 +349,19 @@ class StartupDiscoveryTool(BaseTool):
         
         return unique_info[:10]  # Top 10 most relevant
     
-    def _extract_companies_from_text(self, text: str, country: str, industry: str) -> List[Dict]:
-        """Extract company information from search results text"""
-        companies = []
-        lines = text.split('\n')
-        
-        for line in lines:
-            line = line.strip()
+    def _extract_companies_from_text(self, text: str, country: str, industry: str) -> Iterator[Dict]:
+        """Yield company candidates from search results text, one line at a time"""
+        for match in _LINE_PATTERN.finditer(text):
+            line = match.group().strip()
             if len(line) > 15 and any(keyword in line.lower() for keyword in ['startup', 'company', 'ai', 'tech', 'founded']):
                 company_name = self._extract_company_name(line)
                 if company_name and len(company_name) > 2:
-                    potential_company = {
+                    yield {
                         "name": company_name,
                         "description": line[:200],
                         "country": country,
                         "industry": industry,
-                        "source_line": line
                     }
-                    companies.append(potential_company)
-        
-        return companies
     
     def _extract_company_name(self, text: str) -> str:
         """Extract potential company name from text"""
@@ -262,7 +390,7 @@ class CompanyAnalysisTool(BaseTool):
         """Analyze company website for detailed information"""
         
         try:
-            website_content = scrape_tool.run(website_url)
+            website_content = _scrape(website_url)
             
             if not website_content:
                 return json.dumps({"error": "Could not access website", "url": website_url})
@@ -413,16 +541,17 @@ class FundingResearchTool(BaseTool):
             "total_searches": len(funding_queries)
         }
         
-        for query in funding_queries:
+        for query in funding_queries[:budget.limit(len(funding_queries))]:
             try:
-                search_result = website_search_tool.run(query)
+                search_result = _search(query)
                 if search_result:
                     funding_data = self._extract_funding_info(search_result, company_name)
                     if funding_data:
                         funding_info["funding_data"].extend(funding_data)
-                time.sleep(2)  # Rate limiting
+                _rate_limit(2)  # Rate limiting
             except Exception as e:
-                print(f"Funding search error for {company_name}: {e}")
+                events.error("tool.error", f"Funding search error for {company_name}: {e}",
+                             tool="funding_search", query=query, error=str(e))
                 continue
         
         funding_info["funding_data"] = self._deduplicate_funding_data(funding_info["funding_data"])
@@ -445,7 +574,6 @@ class FundingResearchTool(BaseTool):
                     "description": line[:200],
                     "amount": amount_match.group(0) if amount_match else None,
                     "round_type": funding_round.group(0) if funding_round else None,
-                    "source_line": line
                 }
                 
                 funding_data.append(funding_entry)
@@ -489,15 +617,16 @@ class LinkedInSearchTool(BaseTool):
             "profiles_found": []
         }
         
-        for query in search_queries:
+        for query in search_queries[:budget.limit(len(search_queries))]:
             try:
-                search_result = website_search_tool.run(query)
+                search_result = _search(query)
                 if search_result:
                     profiles = self._extract_profile_info(search_result, person_name, company_name)
                     profile_info["profiles_found"].extend(profiles)
-                time.sleep(2)
+                _rate_limit(2)
             except Exception as e:
-                print(f"LinkedIn search error: {e}")
+                events.error("tool.error", f"LinkedIn search error: {e}",
+                             tool="linkedin_search", query=query, error=str(e))
                 continue
         
         profile_info["profiles_found"] = self._deduplicate_profiles(profile_info["profiles_found"])
@@ -570,6 +699,10 @@ __all__ = [
     'CompanyAnalysisTool', 
     'FundingResearchTool',
     'LinkedInSearchTool',
+    'LazyTool',
+    'PooledScrapeTool',
+    'get_scrape_tool',
+    'get_website_search_tool',
     'scrape_tool',
     'website_search_tool'
 ]
\ No newline at end of file
@@ -0,0 +1,157 @@
+"""Run and task budgets for wall time, searches, scrapes and LLM tokens.
+
+Tools and the crew wrapper charge every external call to the run budget and
+to the budget of the task in progress. As either fills up the run degrades
+instead of overrunning: fewer queries per entity, only the top-ranked
+startups, and cached results in place of new calls. Once a budget is spent,
+further calls are refused and remaining tasks are skipped.
+"""
+import math
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from horizon.utils.events import events
+
+BUDGET_KINDS = ("wall_seconds", "searches", "scrapes", "tokens")
+LEVELS = ("normal", "degraded", "critical", "exhausted")
+
+
+class BudgetExhausted(RuntimeError):
+    """Raised when a call would exceed the run or task budget"""
+
+
+class RunBudget:
+    """Thread-safe budget counters for one run and the task in progress"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self, limits: Optional[Dict[str, float]] = None, task_share: float = 1.0,
+              degrade_at: float = 0.7, critical_at: float = 0.9, top_startups: int = 10) -> None:
+        """Start a fresh run; a limit of 0 (or a missing one) means unlimited"""
+        with self._lock:
+            self.limits = {kind: float((limits or {}).get(kind) or 0) for kind in BUDGET_KINDS}
+            self.task_share = task_share
+            self.degrade_at = degrade_at
+            self.critical_at = critical_at
+            self.top_startups_limit = top_startups
+            self.used = {kind: 0.0 for kind in BUDGET_KINDS if kind != "wall_seconds"}
+            self._started = time.monotonic()
+            self.task: Optional[str] = None
+            self._task_started = self._started
+            self.task_used = dict(self.used)
+            self.refused = 0
+            self.degradations: List[Dict[str, Any]] = []
+            self._last_level = "normal"
+
+    def start_task(self, name: str) -> None:
+        """Begin charging the per-task budget of `name`"""
+        with self._lock:
+            self.task = name
+            self._task_started = time.monotonic()
+            self.task_used = {kind: 0.0 for kind in self.used}
+
+    def _fractions(self) -> Dict[str, float]:
+        now = time.monotonic()
+        used = dict(self.used, wall_seconds=now - self._started)
+        task_used = dict(self.task_used, wall_seconds=now - self._task_started)
+        fractions = {}
+        for kind, limit in self.limits.items():
+            if limit <= 0:
+                continue
+            fraction = used[kind] / limit
+            if self.task is not None and self.task_share < 1.0:
+                fraction = max(fraction, task_used[kind] / (limit * self.task_share))
+            fractions[kind] = fraction
+        return fractions
+
+    def pressure(self) -> float:
+        """Largest used fraction over every run and task budget"""
+        with self._lock:
+            return max(self._fractions().values(), default=0.0)
+
+    def level(self) -> str:
+        """normal, degraded, critical or exhausted; changes are logged once"""
+        pressure = self.pressure()
+        if pressure >= 1.0:
+            level = "exhausted"
+        elif pressure >= self.critical_at:
+            level = "critical"
+        elif pressure >= self.degrade_at:
+            level = "degraded"
+        else:
+            level = "normal"
+        with self._lock:
+            changed = level != self._last_level
+            if changed:
+                self._last_level = level
+                self.degradations.append({"level": level, "task": self.task,
+                                          "after_s": round(time.monotonic() - self._started, 1)})
+        if changed:
+            events.emit("budget.level", f"💸 Budget {level} ({pressure:.0%} used) during {self.task or 'run'}",
+                        level="info" if level == "normal" else "warning", budget_level=level,
+                        pressure=round(pressure, 3), task=self.task)
+        return level
+
+    def charge(self, kind: str, amount: float = 1.0) -> None:
+        """Count usage against the run and the current task"""
+        with self._lock:
+            self.used[kind] = self.used.get(kind, 0.0) + amount
+            self.task_used[kind] = self.task_used.get(kind, 0.0) + amount
+
+    def spend(self, kind: str) -> None:
+        """Charge one call of `kind`, or raise BudgetExhausted if the budget is spent"""
+        with self._lock:
+            fraction = self._fractions()
+            over = fraction.get(kind, 0.0) >= 1.0 or fraction.get("wall_seconds", 0.0) >= 1.0
+            if over:
+                self.refused += 1
+        if over:
+            raise BudgetExhausted(f"{kind} budget exhausted for {self.task or 'run'}")
+        self.charge(kind)
+
+    def limit(self, count: int) -> int:
+        """How many of `count` planned queries to issue at the current level"""
+        level = self.level()
+        if level == "exhausted":
+            return 0
+        if level == "critical":
+            return min(count, 1)
+        if level == "degraded":
+            return max(1, math.ceil(count / 2))
+        return count
+
+    def prefer_cache(self) -> bool:
+        return self.level() != "normal"
+
+    def top_startups(self, count: int) -> int:
+        """How many of `count` startups downstream tasks should still analyze"""
+        level = self.level()
+        if level == "normal":
+            return count
+        limit = self.top_startups_limit if level == "degraded" else max(1, self.top_startups_limit // 3)
+        return min(count, limit)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            used = dict(self.used, wall_seconds=round(time.monotonic() - self._started, 1))
+            return {
+                "limits": dict(self.limits),
+                "used": used,
+                "refused_calls": self.refused,
+                "degradations": list(self.degradations),
+            }
+
+    def describe(self) -> str:
+        snapshot = self.snapshot()
+        parts = []
+        for kind in BUDGET_KINDS:
+            limit = snapshot["limits"][kind]
+            used = snapshot["used"].get(kind, 0)
+            parts.append(f"{kind} {used:g}/{limit:g}" if limit else f"{kind} {used:g}")
+        return ", ".join(parts)
+
+
+budget = RunBudget()
@@ -0,0 +1,185 @@
+"""
+Record/replay harness for external calls (search, scraping and LLM).
+
+In ``record`` mode every call goes out live and its request, response and
+latency are appended to a JSONL cassette. In ``replay`` mode the same calls
+are served from the cassette, optionally sleeping for the recorded latency,
+so full runs can be profiled and compared on a machine with no network.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+CASSETTE_MODES = ("off", "record", "replay")
+
+
+class CassetteMiss(LookupError):
+    """Raised in replay mode when a call was never recorded"""
+
+
+class ReplayedError(RuntimeError):
+    """Re-raised in replay mode for calls that failed while recording"""
+
+
+def request_key(kind: str, name: str, request: Any) -> str:
+    """Stable key for a call: kind, name and the canonical JSON of its request"""
+    canonical = json.dumps([kind, name, request], sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class Cassette:
+    """JSONL cassette of external interactions, keyed by request"""
+
+    def __init__(self, path: Optional[Path] = None, mode: str = "off", latency_scale: float = 0.0):
+        if mode not in CASSETTE_MODES:
+            raise ValueError(f"Unknown cassette mode '{mode}', expected one of {', '.join(CASSETTE_MODES)}")
+        if mode != "off" and path is None:
+            raise ValueError("A cassette path is required to record or replay")
+
+        self.path = Path(path) if path else None
+        self.mode = mode
+        self.latency_scale = latency_scale
+        self._lock = threading.Lock()
+        self._interactions: Dict[str, List[Dict[str, Any]]] = {}
+        self._cursors: Dict[str, int] = {}
+
+        if self.mode == "replay":
+            self._load()
+        elif self.mode == "record":
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == "replay"
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            raise FileNotFoundError(f"Cassette not found: {self.path}")
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    interaction = json.loads(line)
+                    self._interactions.setdefault(interaction["key"], []).append(interaction)
+
+    def call(self, kind: str, name: str, request: Any, fn: Callable[[], Any]) -> Any:
+        """Run `fn` live, record it, or replay it, depending on the mode"""
+        if self.mode == "off":
+            return fn()
+
+        key = request_key(kind, name, request)
+        if self.mode == "replay":
+            return self._replay(key, kind, name)
+
+        start = time.perf_counter()
+        error = None
+        response = None
+        try:
+            response = fn()
+            return response
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            self._append({
+                "key": key,
+                "kind": kind,
+                "name": name,
+                "request": request,
+                "response": response,
+                "error": error,
+                "duration_s": round(time.perf_counter() - start, 4),
+            })
+
+    def _append(self, interaction: Dict[str, Any]) -> None:
+        line = json.dumps(interaction, ensure_ascii=False, default=str)
+        with self._lock:
+            self._interactions.setdefault(interaction["key"], []).append(interaction)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+    def _replay(self, key: str, kind: str, name: str) -> Any:
+        with self._lock:
+            recorded = self._interactions.get(key)
+            if not recorded:
+                raise CassetteMiss(f"No recorded {kind} call '{name}' for this request in {self.path}")
+            # Repeated identical calls are served in recording order, then the last one repeats
+            cursor = self._cursors.get(key, 0)
+            interaction = recorded[min(cursor, len(recorded) - 1)]
+            self._cursors[key] = cursor + 1
+
+        self.sleep(interaction.get("duration_s", 0.0))
+        if interaction.get("error"):
+            raise ReplayedError(interaction["error"])
+        return interaction.get("response")
+
+    def sleep(self, recorded_seconds: float) -> None:
+        """Sleep for a recorded duration, scaled by the simulated latency factor"""
+        delay = recorded_seconds * (self.latency_scale if self.replaying else 1.0)
+        if delay > 0:
+            time.sleep(delay)
+
+    def stats(self) -> Dict[str, int]:
+        """Number of recorded interactions per kind"""
+        counts: Dict[str, int] = {}
+        for interactions in self._interactions.values():
+            for interaction in interactions:
+                counts[interaction["kind"]] = counts.get(interaction["kind"], 0) + 1
+        return counts
+
+
+_cassette: Optional[Cassette] = None
+_cassette_lock = threading.Lock()
+
+
+def configure_cassette(path: Optional[str], mode: str = "off", latency_scale: float = 0.0) -> Cassette:
+    """Install the process-wide cassette"""
+    global _cassette
+    with _cassette_lock:
+        _cassette = Cassette(Path(path) if path else None, mode, latency_scale)
+        return _cassette
+
+
+def get_cassette() -> Cassette:
+    """Return the process-wide cassette, configured from the environment on first use.
+
+    HORIZON_CASSETTE: cassette file, HORIZON_CASSETTE_MODE: off/record/replay,
+    HORIZON_REPLAY_LATENCY: factor applied to recorded latencies when replaying (0 = none).
+    """
+    global _cassette
+    if _cassette is None:
+        path = os.getenv("HORIZON_CASSETTE")
+        mode = os.getenv("HORIZON_CASSETTE_MODE", "replay" if path else "off")
+        latency_scale = float(os.getenv("HORIZON_REPLAY_LATENCY", "0"))
+        with _cassette_lock:
+            if _cassette is None:
+                _cassette = Cassette(Path(path) if path else None, mode, latency_scale)
+    return _cassette
+
+
+_cassette_llm_class = None
+
+
+def cassette_llm(model: Optional[str] = None):
+    """Build a crewAI LLM whose completions go through the process-wide cassette"""
+    global _cassette_llm_class
+    if _cassette_llm_class is None:
+        from crewai import LLM
+
+        class CassetteLLM(LLM):
+            """crewAI LLM that records or replays its completions"""
+
+            def call(self, messages, *args, **kwargs):
+                request = {"model": self.model, "messages": messages}
+                return get_cassette().call(
+                    "llm", self.model, request,
+                    lambda: super(CassetteLLM, self).call(messages, *args, **kwargs)
+                )
+
+        _cassette_llm_class = CassetteLLM
+
+    model = model or os.getenv("MODEL") or os.getenv("OPENAI_MODEL_NAME") or "gpt-4o-mini"
+    return _cassette_llm_class(model=model)
@@ -0,0 +1,101 @@
+"""
+Change-data-capture between runs.
+
+A run's discovered startups are compared with the database as it was when the
+run started: a startup is modified when upserting it would change the stored
+record's hash (the same `record_hash` scoring uses to decide what to re-score,
+so the two never disagree). The result
+is a changeset (added, modified, unchanged) that downstream tasks, exports and
+the email sender can use to work on the delta only.
+"""
+import json
+from typing import Any, Dict, Iterable, List, Optional
+
+from horizon.utils.database import record_hash
+
+# Task result keys that are run metadata rather than task outputs
+METADATA_KEYS = ("total_tasks", "completion_status", "changeset")
+
+
+def startup_key(record: Dict[str, Any]) -> str:
+    return str(record.get("name", record.get("Company Name", ""))).lower().strip()
+
+
+class Changeset:
+    """Names of the startups added, modified and unchanged since the previous run"""
+
+    def __init__(self, added: Optional[List[str]] = None, modified: Optional[List[str]] = None,
+                 unchanged: Optional[List[str]] = None):
+        self.added = added or []
+        self.modified = modified or []
+        self.unchanged = unchanged or []
+        self._changed = {name.lower().strip() for name in self.added + self.modified}
+
+    @classmethod
+    def compute(cls, records: Iterable[Dict[str, Any]], baseline: Dict[str, Dict[str, Any]]) -> "Changeset":
+        """Classify standardized `records` against `baseline` (key -> stored record)"""
+        changeset = cls()
+        seen = set()
+        for record in records:
+            key = startup_key(record)
+            if not key or key in seen:
+                continue
+            seen.add(key)
+            name = record.get("name", record.get("Company Name", key))
+            previous = baseline.get(key)
+            if previous is None:
+                changeset.added.append(name)
+            # Upserts keep the stored fields an update doesn't carry, so compare the merged record
+            elif record_hash(dict(previous, **record)) != record_hash(previous):
+                changeset.modified.append(name)
+            else:
+                changeset.unchanged.append(name)
+        changeset._changed = {name.lower().strip() for name in changeset.added + changeset.modified}
+        return changeset
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Changeset":
+        return cls(data.get("added"), data.get("modified"), data.get("unchanged"))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"added": self.added, "modified": self.modified, "unchanged": self.unchanged,
+                "counts": self.counts()}
+
+    def counts(self) -> Dict[str, int]:
+        return {"added": len(self.added), "modified": len(self.modified), "unchanged": len(self.unchanged)}
+
+    def __bool__(self) -> bool:
+        return bool(self._changed)
+
+    def describe(self) -> str:
+        counts = self.counts()
+        return f"{counts['added']} new, {counts['modified']} updated, {counts['unchanged']} unchanged"
+
+    def is_changed(self, record: Dict[str, Any]) -> bool:
+        return startup_key(record) in self._changed
+
+    def filter_records(self, records: Iterable[Any]) -> List[Any]:
+        """Keep the added and modified startups (non-startup items are kept as they are)"""
+        return [r for r in records if not isinstance(r, dict) or not startup_key(r) or self.is_changed(r)]
+
+    def filter_result(self, result: Any) -> Any:
+        """Restrict one task result (a startup list, or a dict or JSON text holding one) to the delta"""
+        if isinstance(result, str):
+            try:
+                parsed = json.loads(result)
+            except json.JSONDecodeError:
+                return result
+            filtered = self.filter_result(parsed)
+            return result if filtered is parsed else json.dumps(filtered, indent=2, ensure_ascii=False)
+        if isinstance(result, list):
+            return self.filter_records(result)
+        if isinstance(result, dict) and isinstance(result.get("startups"), list):
+            return dict(result, startups=self.filter_records(result["startups"]))
+        return result
+
+    def filter_task_results(self, task_results: Dict[str, Any]) -> Dict[str, Any]:
+        """Restrict every task result to the delta, leaving run metadata alone"""
+        return {
+            name: result if name in METADATA_KEYS else self.filter_result(result)
+            for name, result in task_results.items()
+        }
@@ -1,13 +1,46 @@
 # Updated database.py
 from datetime import datetime
+import hashlib
+import itertools
 import json
+import os
+import tempfile
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from horizon.utils.websites import canonicalize_url
+
+DEFAULT_DB_PATH = Path("outputs/startup_database.json")
+
+# Fields that change without the startup itself changing
+VOLATILE_FIELDS = ('discovery_date', 'score', 'website_status', 'website_final')
+
+# Per-criterion scores (1-10) kept from validated records, see Config.SCORING_WEIGHTS
+SCORE_FIELDS = ('technology_innovation', 'market_potential', 'team_strength',
+                'funding_attractiveness', 'nvidia_alignment', 'traction')
+
+
+def _digest(content: Dict[str, Any]) -> str:
+    canonical = json.dumps(content, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(canonical.encode('utf-8')).hexdigest()
+
+
+def record_hash(record: Dict[str, Any]) -> str:
+    """Content hash of a startup record, ignoring volatile fields."""
+    return _digest({k: v for k, v in record.items() if k not in VOLATILE_FIELDS})
+
+
 class StartupDB:
     """A proper JSON-based database for storing and retrieving full startup data."""
 
     def __init__(self, db_path: Path):
         self.db_path = db_path
+        self.scores_path = db_path.with_suffix('.scores.npz')
+        self.leaderboards_path = db_path.with_suffix('.leaderboards.json')
+        self.similarity_path = db_path.with_suffix('.similarity')
+        self._scoring = None
+        self._leaderboards = None
+        self._similarity = None
         if not self.db_path.exists():
             self.db_path.parent.mkdir(parents=True, exist_ok=True)
             self.db_path.write_text(json.dumps([], indent=2))
@@ -21,11 +54,13 @@ class StartupDB:
             return []
 
     def save_startups(self, startups: List[Dict[str, Any]]) -> None:
-        """Save startups to the database."""
-        with open(self.db_path, 'w', encoding='utf-8') as f:
+        """Save startups to the database, replacing the file atomically."""
+        tmp_path = self.db_path.with_suffix(self.db_path.suffix + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
             json.dump(startups, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.db_path)
 
-    def add_startups(self, new_startups: List[Dict[str, Any]]) -> int:
+    def add_startups(self, new_startups: Iterable[Dict[str, Any]]) -> int:
         """Add new startups to the database, avoiding duplicates."""
         existing_startups = self.load_startups()
         existing_names = {s.get('name', '').lower().strip() for s in existing_startups}
@@ -41,15 +76,166 @@ class StartupDB:
                 added_count += 1
         
         if added_count > 0:
+            # Only the new rows are featurized; everything else comes from the score cache
+            self._apply_scores(existing_startups)
             self.save_startups(existing_startups)
         
         return added_count
 
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Every stored startup keyed by lowercased name, as a changeset baseline."""
+        return {s.get('name', '').lower().strip(): s for s in self.load_startups()}
+
+    def changeset(self, startups: List[Dict[str, Any]], baseline: Optional[Dict[str, Dict[str, Any]]] = None):
+        """Classify startups as added, modified or unchanged against `baseline` (default: the stored data)."""
+        from horizon.utils.changeset import Changeset
+        if baseline is None:
+            baseline = self.snapshot()
+        return Changeset.compute((self._standardize_startup_data(startup) for startup in startups), baseline)
+
+    def upsert_startups(self, startups: List[Dict[str, Any]]):
+        """Add new startups and update changed ones in place; returns the changeset."""
+        existing_startups = self.load_startups()
+        index = {s.get('name', '').lower().strip(): i for i, s in enumerate(existing_startups)}
+        changeset = self.changeset(startups, {key: existing_startups[i] for key, i in index.items()})
+        if not changeset:
+            return changeset
+
+        for startup in startups:
+            if not changeset.is_changed(startup):
+                continue
+            standardized = self._standardize_startup_data(startup)
+            key = standardized.get('name', '').lower().strip()
+            if key in index:
+                # Keep the original discovery date and any fields the update doesn't carry
+                previous = existing_startups[index[key]]
+                standardized['discovery_date'] = previous.get('discovery_date', standardized['discovery_date'])
+                existing_startups[index[key]] = dict(previous, **standardized)
+            else:
+                index[key] = len(existing_startups)
+                existing_startups.append(standardized)
+
+        self._apply_scores(existing_startups)
+        self.save_startups(existing_startups)
+        return changeset
+
+    def scoring_engine(self):
+        """Vectorized scoring engine for this database, loaded from its score cache."""
+        if self._scoring is None:
+            from horizon.utils.scoring import ScoringEngine  # NumPy is only needed once scores are used
+            self._scoring = ScoringEngine(self.scores_path)
+        return self._scoring
+
+    def leaderboards(self):
+        """Top-K leaderboards (overall, per country, per sector), loaded from disk."""
+        if self._leaderboards is None:
+            from horizon.config import Config
+            from horizon.utils.leaderboard import Leaderboards
+            self._leaderboards = Leaderboards(self.leaderboards_path, k=Config.LEADERBOARD_SIZE)
+        return self._leaderboards
+
+    def similarity_index(self):
+        """On-disk similarity index over startup descriptions, loaded from its memory-mapped files."""
+        if self._similarity is None:
+            from horizon.config import Config
+            from horizon.utils.similarity import SimilarityIndex
+            self._similarity = SimilarityIndex(self.similarity_path, Config.SIMILARITY_DIMENSIONS,
+                                               Config.SIMILARITY_BITS)
+        return self._similarity
+
+    def _apply_scores(self, startups: List[Dict[str, Any]], rerank: bool = False) -> int:
+        engine = self.scoring_engine()
+        rescored = engine.update(startups)
+        self._apply_similarity(startups, engine)
+        by_key = {}
+        for startup in startups:
+            key = startup.get('name', '').lower().strip()
+            score = engine.score_of(key)
+            if score is not None:
+                startup['score'] = score
+                by_key.setdefault(key, startup)
+        engine.save()
+
+        # Only re-scored startups touch the leaderboards, at O(log K) per board
+        boards = self.leaderboards()
+        scored = ((key, record, record['score']) for key, record in by_key.items())
+        if rerank or not boards.loaded:
+            boards.rebuild(scored)
+        else:
+            for key in engine.removed_keys:
+                boards.remove(key)
+            for key in engine.changed_keys:
+                if key in by_key:
+                    boards.update(key, by_key[key], by_key[key]['score'])
+            stale = boards.dirty()
+            if stale:
+                boards.rebuild(scored, only=stale)
+        boards.save()
+        return rescored
+
+    def _apply_similarity(self, startups: List[Dict[str, Any]], engine=None) -> None:
+        from horizon.config import Config
+        if not Config.SIMILARITY_INDEX:
+            return
+        index = self.similarity_index()
+        if engine is not None and len(index) == len(engine.keys):
+            # In step with the scoring engine, which already knows what this write changed
+            changed = set(engine.changed_keys)
+            written = index.update((s for s in startups if s.get('name', '').lower().strip() in changed),
+                                   engine.removed_keys) if changed or engine.removed_keys else 0
+        else:
+            # Rows are keyed by a hash of their text, so only new or edited descriptions are re-vectorized
+            written = index.sync(startups)
+        if written:
+            index.save()
+
+    def similar_startups(self, query: str, k: int = 10) -> List[Dict[str, Any]]:
+        """The `k` startups most similar to a stored startup's name, or to free text, with their `similarity`."""
+        startups = {s.get('name', '').lower().strip(): s for s in self.load_startups()}
+        index = self.similarity_index()
+        if len(index) != len(startups):
+            if index.sync(list(startups.values())):
+                index.save()
+        if query.lower().strip() in index:
+            neighbours = index.similar_to(query, k)
+        else:
+            neighbours = index.nearest(index.query_vector({'description': query}), k)
+        return [dict(startups[key], similarity=similarity) for key, similarity in neighbours if key in startups]
+
+    def clusters(self, k: int = 10, iterations: int = 10) -> List[List[Dict[str, Any]]]:
+        """Startups grouped into `k` clusters by description, largest cluster first."""
+        startups = {s.get('name', '').lower().strip(): s for s in self.load_startups()}
+        groups = self.similarity_index().clusters(k, iterations)
+        return [[startups[key] for key in members if key in startups] for members in groups.values()]
+
+    def rescore(self, weights: Optional[Dict[str, float]] = None) -> int:
+        """Re-score changed startups (or all of them under new weights) and save the scores.
+
+        Returns the number of startups whose features were recomputed.
+        """
+        startups = self.load_startups()
+        if weights is not None:
+            self.scoring_engine().set_weights(weights)
+        rescored = self._apply_scores(startups, rerank=weights is not None)
+        self.save_startups(startups)
+        return rescored
+
+    def ranked_startups(self, limit: Optional[int] = None,
+                        weights: Optional[Dict[str, float]] = None) -> List[Dict[str, Any]]:
+        """Startups ordered by score; `weights` ranks under what-if weights without saving anything."""
+        startups = {s.get('name', '').lower().strip(): s for s in self.load_startups()}
+        engine = self.scoring_engine()
+        engine.update(list(startups.values()))
+        scores = engine.what_if(weights) if weights is not None else None
+        return [dict(startups[key], score=score) for key, score in engine.ranking(limit, scores)]
+
     def _standardize_startup_data(self, startup: Dict[str, Any]) -> Dict[str, Any]:
         """Standardize startup data structure."""
         standardized = {
             'name': startup.get('name', startup.get('Company Name', '')),
             'website': startup.get('website', startup.get('Website', '')),
+            'website_status': startup.get('website_status', ''),
+            'website_final': startup.get('website_final', ''),
             'description': startup.get('description', startup.get('Description', '')),
             'location': startup.get('location', startup.get('Location', '')),
             'country': startup.get('country', ''),
@@ -60,5 +246,148 @@ class StartupDB:
             'source_url': startup.get('source_url', startup.get('Source URL', '')),
             'discovery_date': startup.get('discovery_date', datetime.now().isoformat())
         }
+        standardized.update({field: startup[field] for field in SCORE_FIELDS if startup.get(field) is not None})
+        # Canonical form, so `www.x.com` and `https://x.com/` don't show up as a change
+        standardized['website'] = canonicalize_url(standardized['website']) or standardized['website']
         # Remove empty values
-        return {k: v for k, v in standardized.items() if v}
\ No newline at end of file
+        return {k: v for k, v in standardized.items() if v}
+
+    def leaderboard(self, country: Optional[str] = None, sector: Optional[str] = None,
+                    limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Best-scored startups overall, in a country or in a sector, without loading the database."""
+        if country:
+            board = f"country:{country.lower().strip()}"
+        elif sector:
+            board = f"sector:{sector.lower().strip()}"
+        else:
+            board = 'overall'
+        return self.leaderboards().top(board, limit)
+
+
+def _process_alive(pid: int) -> bool:
+    """Whether process `pid` is still running (assumed so where that can't be checked)."""
+    if pid == os.getpid() or os.name == 'nt':
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True
+    return True
+
+
+class StartupSink:
+    """Batched writer that streams startups into a StartupDB.
+
+    Candidates are buffered up to `chunk_size` and each full chunk is appended
+    to a staging file next to the database, so memory stays bounded however
+    many candidates come in. Everything received is merged, scored and saved
+    with a single add_startups call when the sink is closed, even after the
+    producer failed midway; chunks staged by a process that died before
+    closing its sink are committed by the next sink to close.
+    """
+
+    def __init__(self, db: StartupDB, chunk_size: Optional[int] = None, preview_size: int = 20):
+        if chunk_size is None:
+            from horizon.config import Config
+            chunk_size = Config.DISCOVERY_CHUNK_SIZE
+        self.db = db
+        self.chunk_size = max(1, chunk_size)
+        self.preview_size = preview_size
+        self.preview: List[Dict[str, Any]] = []
+        self.received = 0
+        self.added = 0
+        self.chunks = 0
+        self._buffer: List[Dict[str, Any]] = []
+        self._staging_path: Optional[Path] = None
+
+    def add(self, startup: Dict[str, Any]) -> None:
+        """Buffer one startup, staging the chunk once it is full."""
+        self.received += 1
+        if len(self.preview) < self.preview_size:
+            self.preview.append(startup)
+        self._buffer.append(startup)
+        if len(self._buffer) >= self.chunk_size:
+            self.flush()
+
+    def extend(self, startups: Iterable[Dict[str, Any]]) -> int:
+        """Consume an iterable (typically a generator) of startups; returns how many were received."""
+        before = self.received
+        for startup in startups:
+            self.add(startup)
+        return self.received - before
+
+    def flush(self) -> int:
+        """Append the buffered chunk to the staging file; returns how many startups were staged."""
+        if not self._buffer:
+            return 0
+        chunk, self._buffer = self._buffer, []
+        if self._staging_path is None:
+            self._staging_path = self._new_staging_path()
+        with open(self._staging_path, 'a', encoding='utf-8') as f:
+            for startup in chunk:
+                f.write(json.dumps(startup, ensure_ascii=False, default=str) + '\n')
+        self.chunks += 1
+        return len(chunk)
+
+    def _new_staging_path(self) -> Path:
+        # The pid in the name tells a live sink's staging file from one left by a process that died
+        fd, path = tempfile.mkstemp(prefix=f'{self.db.db_path.stem}.{os.getpid()}.', suffix='.staging.jsonl',
+                                    dir=self.db.db_path.parent)
+        os.close(fd)
+        return Path(path)
+
+    def _orphaned_staging(self) -> List[Path]:
+        """Staging files of sinks whose process died before committing, renamed to be replayed by this one."""
+        prefix = self.db.db_path.stem + '.'
+        claimed = []
+        for path in self.db.db_path.parent.glob(prefix + '*.staging.jsonl'):
+            pid = path.name[len(prefix):].split('.', 1)[0]
+            if not pid.isdigit() or _process_alive(int(pid)):
+                continue
+            claim = self._new_staging_path()
+            try:
+                os.replace(path, claim)
+            except FileNotFoundError:
+                claim.unlink()  # another sink claimed it first
+                continue
+            claimed.append(claim)
+        return claimed
+
+    @staticmethod
+    def _read_staging(path: Path) -> Iterator[Dict[str, Any]]:
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue  # blank, or the last line of a process that died mid-write
+
+    def close(self) -> int:
+        """Commit everything received with one add_startups call; returns how many startups were newly added.
+
+        Staging files left by crashed sinks on the same database are committed along with it.
+        """
+        orphans = self._orphaned_staging()
+        if self._staging_path is None and not orphans:
+            # Nothing was staged: the candidates still fit in the buffer
+            chunk, self._buffer = self._buffer, []
+            added = self.db.add_startups(chunk) if chunk else 0
+        else:
+            self.flush()
+            paths = orphans + ([self._staging_path] if self._staging_path is not None else [])
+            added = self.db.add_startups(itertools.chain.from_iterable(self._read_staging(p) for p in paths))
+            # Only removed once committed; if the commit fails, the next sink to close replays them
+            for path in paths:
+                path.unlink()
+            self._staging_path = None
+        self.added += added
+        return added
+
+    def __enter__(self) -> "StartupSink":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        # Commit what was received even when the producer failed midway
+        self.close()
@@ -0,0 +1,245 @@
+"""Batched, parallel newsletter delivery through the Resend HTTP API.
+
+Every recipient gets their own email (optionally personalized), grouped into
+batch requests of up to 100 emails (one email per request when it carries
+attachments, which the batch endpoint rejects). Batches are sent by a small thread pool
+under a shared token-bucket rate limit. 429 and 5xx responses, as well as
+connection errors, are retried with exponential backoff (honoring Retry-After)
+under the same Idempotency-Key, so a retried batch is never delivered twice.
+Delivery status is tracked per recipient.
+
+Point HORIZON_RESEND_API_URL at `horizon.utils.resend_standin` to load-test
+large recipient lists offline.
+"""
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from horizon.utils.events import events
+
+# Resend accepts at most 100 emails per batch request
+MAX_BATCH_SIZE = 100
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class DeliveryError(RuntimeError):
+    """A failed API call; `retryable` errors are worth sending again"""
+
+    def __init__(self, message: str, status: Optional[int] = None, retry_after: Optional[float] = None,
+                 retryable: bool = False):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+        self.retryable = retryable
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header, given as seconds or as an HTTP date"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)  # HTTP dates are always GMT
+    return max(0.0, when.timestamp() - time.time())
+
+
+class RateLimiter:
+    """Token bucket shared by the sending threads"""
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = rate
+        self.capacity = max(1.0, burst if burst is not None else rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Take one token, sleeping until one is available; returns the time waited"""
+        if self.rate <= 0:
+            return 0.0
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+class ResendClient:
+    """Minimal Resend API client over a pooled keep-alive session"""
+
+    def __init__(self, api_key: str, base_url: Optional[str] = None, timeout: float = 30.0):
+        import requests  # only needed once something is actually sent
+        from horizon.config import Config
+
+        self.base_url = (base_url or Config.RESEND_API_URL).rstrip("/")
+        self.timeout = timeout
+        self._session = requests.Session()
+        self._session.headers.update({"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"})
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=32)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+
+    def send_batch(self, emails: List[Dict[str, Any]], idempotency_key: str) -> List[str]:
+        """Send up to 100 emails in one request; returns their ids in order"""
+        return [item.get("id") for item in self._post("/emails/batch", emails, idempotency_key).get("data", [])]
+
+    def send(self, email: Dict[str, Any], idempotency_key: str) -> str:
+        """Send one email; the only way to send attachments, which batch requests don't accept"""
+        return self._post("/emails", email, idempotency_key).get("id")
+
+    def _post(self, path: str, payload: Any, idempotency_key: str) -> Dict[str, Any]:
+        import requests
+
+        try:
+            response = self._session.post(f"{self.base_url}{path}", data=json.dumps(payload),
+                                          headers={"Idempotency-Key": idempotency_key}, timeout=self.timeout)
+        except requests.RequestException as e:
+            raise DeliveryError(f"{e.__class__.__name__}: {e}", retryable=True) from e
+
+        if response.status_code >= 400:
+            retry_after = response.headers.get("Retry-After")
+            raise DeliveryError(
+                f"HTTP {response.status_code}: {response.text[:200]}",
+                status=response.status_code,
+                retry_after=parse_retry_after(retry_after),
+                retryable=response.status_code in RETRY_STATUSES,
+            )
+        return response.json()
+
+    def close(self) -> None:
+        self._session.close()
+
+
+def _idempotency_key(emails: List[Dict[str, Any]]) -> str:
+    """Same batch, same key: Resend answers a repeated key with the original result"""
+    canonical = json.dumps(emails, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class NewsletterDelivery:
+    """Sends one message to many recipients in parallel batches with retries"""
+
+    def __init__(self, client: ResendClient, batch_size: Optional[int] = None, concurrency: Optional[int] = None,
+                 rate_per_second: Optional[float] = None, max_retries: Optional[int] = None,
+                 backoff_seconds: float = 1.0, max_backoff_seconds: float = 60.0):
+        from horizon.config import Config
+
+        self.client = client
+        self.batch_size = max(1, min(MAX_BATCH_SIZE, batch_size or Config.DELIVERY_BATCH_SIZE))
+        self.concurrency = max(1, concurrency or Config.DELIVERY_CONCURRENCY)
+        self.limiter = RateLimiter(Config.DELIVERY_RATE_PER_SECOND if rate_per_second is None else rate_per_second)
+        self.max_retries = Config.DELIVERY_MAX_RETRIES if max_retries is None else max_retries
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.status: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def deliver(self, message: Dict[str, Any], recipients: List[str],
+                personalize: Optional[Callable[[str, Dict[str, Any]], Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """Send `message` (from, subject, html, text, ...) to every recipient.
+
+        `personalize(recipient, email)` may return a modified email for one recipient.
+        """
+        started = time.monotonic()
+        recipients = list(dict.fromkeys(r.strip() for r in recipients if r and r.strip()))
+        emails = []
+        for recipient in recipients:
+            email = dict(message, to=[recipient])
+            emails.append(personalize(recipient, email) if personalize else email)
+            self.status[recipient] = {"status": "pending", "attempts": 0}
+
+        # Emails with attachments can't go through the batch endpoint
+        batch_size = 1 if message.get("attachments") else self.batch_size
+        batches = [emails[i:i + batch_size] for i in range(0, len(emails), batch_size)]
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="horizon-delivery") as pool:
+            outcomes = list(pool.map(self._send_with_retries, range(len(batches)), batches))
+
+        status = {recipient: self.status[recipient] for recipient in recipients}
+        sent = sum(1 for entry in status.values() if entry["status"] == "sent")
+        report = {
+            "success": bool(recipients) and sent == len(recipients),
+            "recipients": len(recipients),
+            "sent": sent,
+            "failed": len(recipients) - sent,
+            "batches": len(batches),
+            "retries": sum(outcome["retries"] for outcome in outcomes),
+            "duration_s": round(time.monotonic() - started, 3),
+            "status": status,
+        }
+        events.emit("delivery.end", f"📬 Delivered to {sent}/{len(recipients)} recipients in {len(batches)} batches",
+                    level="info" if report["success"] else "error",
+                    **{key: value for key, value in report.items() if key != "status"})
+        return report
+
+    def _send_with_retries(self, index: int, batch: List[Dict[str, Any]]) -> Dict[str, Any]:
+        key = _idempotency_key(batch)
+        recipients = [email["to"][0] for email in batch]
+        attempt = 0
+        while True:
+            attempt += 1
+            self.limiter.acquire()
+            started = time.monotonic()
+            try:
+                if batch[0].get("attachments"):
+                    ids = [self.client.send(batch[0], key)]
+                else:
+                    ids = self.client.send_batch(batch, key)
+            except DeliveryError as e:
+                self._update(recipients, attempts=attempt, error=str(e))
+                if not e.retryable or attempt > self.max_retries:
+                    self._update(recipients, status="failed", retryable=e.retryable)
+                    events.error("delivery.batch", f"❌ Batch {index} failed after {attempt} attempt(s): {e}",
+                                 batch=index, size=len(batch), attempts=attempt, status_code=e.status, error=str(e))
+                    return {"retries": attempt - 1}
+                delay = self._backoff(attempt, e.retry_after)
+                events.emit("retry", level="warning", kind="delivery.batch", batch=index, attempt=attempt,
+                            status_code=e.status, delay_s=round(delay, 3), error=str(e))
+                time.sleep(delay)
+                continue
+
+            for recipient, email_id in zip(recipients, ids):
+                self._update([recipient], status="sent", email_id=email_id, attempts=attempt, error=None)
+            if len(ids) < len(recipients):
+                self._update(recipients[len(ids):], status="failed", attempts=attempt, error="missing from batch response")
+            events.emit("delivery.batch", batch=index, size=len(batch), attempts=attempt,
+                        duration_s=round(time.monotonic() - started, 4))
+            return {"retries": attempt - 1}
+
+    def _backoff(self, attempt: int, retry_after: Optional[float]) -> float:
+        if retry_after is not None:
+            return min(retry_after, self.max_backoff_seconds)
+        delay = min(self.max_backoff_seconds, self.backoff_seconds * 2 ** (attempt - 1))
+        return delay * random.uniform(0.5, 1.0)  # jitter keeps the workers from retrying in lockstep
+
+    def _update(self, recipients: List[str], **fields: Any) -> None:
+        with self._lock:
+            for recipient in recipients:
+                self.status[recipient].update(fields)
+
+    def write_status(self, path: str) -> None:
+        """Save the per-recipient status as JSON, replacing the file atomically"""
+        tmp_path = f"{path}.tmp"
+        with self._lock, open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.status, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, path)
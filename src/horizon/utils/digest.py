@@ -0,0 +1,144 @@
+"""
+Size-budgeted report digests.
+
+Large runs make multi-megabyte emails that are slow to build and send and
+that mail clients clip. In budget mode the email carries a digest instead:
+the top startups of each section by local score, bounded previews of every
+other result and a note pointing at the attachments, while the full dataset
+is written as gzip-compressed CSV and JSONL files, one record at a time.
+"""
+import base64
+import csv
+import gzip
+import json
+import os
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from horizon.utils.changeset import METADATA_KEYS
+from horizon.utils.export import CSV_FIELDS, bounded_json, csv_row
+
+# Items kept from each nested list or dict of a non-startup result
+PREVIEW_ITEMS = 10
+# zlib's default level: nearly level 9's ratio on this data in much less time
+COMPRESS_LEVEL = 6
+
+
+def parse_result(task_result: Any) -> Any:
+    """Task results arrive as JSON strings, parsed data or plain text"""
+    if isinstance(task_result, str):
+        try:
+            return json.loads(task_result)
+        except ValueError:
+            return task_result
+    return task_result
+
+
+def split_startups(task_result: Any) -> Tuple[Optional[List[Dict[str, Any]]], Any]:
+    """(startups, rest) of a parsed task result; startups is None for non-tabular results"""
+    if isinstance(task_result, list):
+        return [s for s in task_result if isinstance(s, dict)], None
+    if isinstance(task_result, dict) and isinstance(task_result.get("startups"), list):
+        rest = {key: value for key, value in task_result.items() if key != "startups"}
+        return [s for s in task_result["startups"] if isinstance(s, dict)], rest or None
+    return None, task_result
+
+
+def preview(value: Any, chars: int, depth: int = 0) -> Any:
+    """A bounded copy of `value`: long strings cut, nested containers trimmed to PREVIEW_ITEMS"""
+    if isinstance(value, str):
+        return value if len(value) <= chars else value[:chars] + "..."
+    if isinstance(value, (list, dict)) and depth >= 2:
+        return bounded_json(value, chars)
+    if isinstance(value, list):
+        items = [preview(item, chars, depth + 1) for item in value[:PREVIEW_ITEMS]]
+        if len(value) > PREVIEW_ITEMS:
+            items.append(f"... {len(value) - PREVIEW_ITEMS} more")
+        return items
+    if isinstance(value, dict):
+        items = {key: preview(item, chars, depth + 1) for key, item in list(value.items())[:PREVIEW_ITEMS]}
+        if len(value) > PREVIEW_ITEMS:
+            items["..."] = f"{len(value) - PREVIEW_ITEMS} more"
+        return items
+    return value
+
+
+class ReportDigest:
+    """Task results parsed and ranked once, then cut to any number of inline startups"""
+
+    def __init__(self, task_results: Dict[str, Any], max_startups: int, where: str = "the attached files"):
+        from horizon.utils.scoring import rank_startups  # NumPy, only needed once a report is over budget
+
+        self.where = where
+        self._sections: Dict[str, Tuple[Any, Optional[List[Dict[str, Any]]], Any, List[int]]] = {}
+        scores: Dict[str, float] = {}
+        for task_name, task_result in task_results.items():
+            if task_name in METADATA_KEYS:
+                self._sections[task_name] = (task_result, None, None, [])
+                continue
+            parsed = parse_result(task_result)
+            startups, rest = split_startups(parsed)
+            ranked = rank_startups(startups, max_startups, scores) if startups else []
+            self._sections[task_name] = (parsed, startups, rest, ranked)
+
+    def render(self, top_n: int, preview_chars: int) -> Tuple[Dict[str, Any], Dict[str, str]]:
+        """(results, notes): the top `top_n` startups and bounded previews, and a note per cut section"""
+        results: Dict[str, Any] = {}
+        notes: Dict[str, str] = {}
+        for task_name, (parsed, startups, rest, ranked) in self._sections.items():
+            if task_name in METADATA_KEYS:
+                results[task_name] = parsed
+            elif startups is None:
+                results[task_name] = preview(parsed, preview_chars)
+                if results[task_name] != parsed:
+                    notes[task_name] = f"Preview only: the full result is in {self.where}."
+            else:
+                # Inline in their original order
+                top = [startups[i] for i in sorted(ranked[:top_n])]
+                results[task_name] = top if rest is None else dict(preview(rest, preview_chars), startups=top)
+                if len(top) < len(startups):
+                    notes[task_name] = (f"Showing the top {len(top)} of {len(startups)} startups; "
+                                        f"every startup is in {self.where}.")
+        return results, notes
+
+
+def iter_dataset(task_results: Dict[str, Any]) -> Iterator[Tuple[str, Dict[str, Any], Any]]:
+    """(task, startup or None, rest) for every startup and every non-tabular result, in order"""
+    for task_name, task_result in task_results.items():
+        if task_name in METADATA_KEYS:
+            continue
+        startups, rest = split_startups(parse_result(task_result))
+        for startup in startups or ():
+            yield task_name, startup, None
+        if rest:
+            yield task_name, None, rest
+
+
+def write_dataset_archives(task_results: Dict[str, Any], base_path: str) -> Dict[str, Any]:
+    """Stream the full task results into `{base_path}.csv.gz` and `{base_path}.jsonl.gz`"""
+    os.makedirs(os.path.dirname(base_path) or ".", exist_ok=True)
+    csv_path, jsonl_path = f"{base_path}.csv.gz", f"{base_path}.jsonl.gz"
+    startups = 0
+    with gzip.open(csv_path, "wt", COMPRESS_LEVEL, encoding="utf-8", newline="") as csv_file, \
+            gzip.open(jsonl_path, "wt", COMPRESS_LEVEL, encoding="utf-8") as jsonl_file:
+        writer = csv.DictWriter(csv_file, fieldnames=CSV_FIELDS, extrasaction="ignore")
+        writer.writeheader()
+        for task_name, startup, rest in iter_dataset(task_results):
+            if startup is not None:
+                writer.writerow(csv_row(task_name, startup))
+                record = {"type": "startup", "task": task_name, "record": startup}
+                startups += 1
+            else:
+                record = {"type": "task", "task": task_name, "result": rest}
+            jsonl_file.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+    return {"paths": [csv_path, jsonl_path], "startups": startups}
+
+
+def attachments(paths: List[str], max_bytes: int) -> List[Dict[str, str]]:
+    """Resend attachments for `paths`, or none when together they exceed `max_bytes`"""
+    if sum(os.path.getsize(path) for path in paths) > max_bytes:
+        return []
+    result = []
+    for path in paths:
+        with open(path, "rb") as f:
+            result.append({"filename": os.path.basename(path), "content": base64.b64encode(f.read()).decode("ascii")})
+    return result
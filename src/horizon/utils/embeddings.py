@@ -0,0 +1,146 @@
+"""
+Persistent embedding cache for the RAG tools.
+
+WebsiteSearchTool chunks and embeds a page on every search, so the same chunks
+were embedded again in every task, country and run. Embeddings are stored in
+one SQLite file keyed by a hash of the model and the exact text, and
+`CachedEmbedder` checks the store before calling the embedding model: only
+texts never seen with that model are sent, in one batch, and a repeat search
+over known content makes no embedding call at all. The least recently written
+entries are evicted beyond `max_entries`.
+"""
+import hashlib
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from horizon.config import Config
+from horizon.utils.metrics import metrics
+
+# SQLite's default limit on host parameters per statement is 999
+_QUERY_CHUNK = 900
+
+
+def embedding_key(model: str, text: str) -> str:
+    """Content hash of a text under one embedding model"""
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(model.encode("utf-8"))
+    digest.update(b"\x00")
+    digest.update(text.encode("utf-8", "surrogatepass"))
+    return digest.hexdigest()
+
+
+class EmbeddingCache:
+    """Embedding vectors keyed by (model, text) hash, stored as float32 blobs in SQLite"""
+
+    def __init__(self, path: str, max_entries: int = 200000):
+        self.max_entries = max_entries
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, model TEXT NOT NULL, "
+            "vector BLOB NOT NULL, stored_at REAL NOT NULL)"
+        )
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, np.ndarray]:
+        """Stored vectors for whichever of `keys` are present"""
+        keys = list(dict.fromkeys(keys))
+        found: Dict[str, np.ndarray] = {}
+        with self._lock:
+            for i in range(0, len(keys), _QUERY_CHUNK):
+                chunk = keys[i:i + _QUERY_CHUNK]
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(chunk))})", chunk
+                )
+                for key, vector in rows:
+                    found[key] = np.frombuffer(vector, dtype=np.float32)
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, model: str, vectors: Dict[str, Sequence[float]]) -> None:
+        """Store vectors by key in one transaction"""
+        if not vectors:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings (key, model, vector, stored_at) VALUES (?, ?, ?, ?)",
+                    ((key, model, np.asarray(vector, dtype=np.float32).tobytes(), now)
+                     for key, vector in vectors.items()),
+                )
+                self._writes += len(vectors)
+                if self._writes >= 1000:
+                    self._writes = 0
+                    self._evict()
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _evict(self) -> None:
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+        if count > self.max_entries:
+            self._conn.execute("DELETE FROM embeddings WHERE key IN "
+                               "(SELECT key FROM embeddings ORDER BY stored_at LIMIT ?)", (count - self.max_entries,))
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+        return {"entries": count, "hits": self.hits, "misses": self.misses}
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+class CachedEmbedder:
+    """Wraps a batch embedding function so only texts missing from the cache are embedded"""
+
+    def __init__(self, embed: Callable[[List[str]], Sequence[Sequence[float]]], model: str,
+                 cache: EmbeddingCache):
+        self.embed = embed
+        self.model = model
+        self.cache = cache
+
+    def __call__(self, texts: List[str]) -> List[np.ndarray]:
+        keys = [embedding_key(self.model, text) for text in texts]
+        with metrics.timed("embedding", self.model) as call:
+            found = self.cache.get_many(keys)
+            missing: Dict[str, str] = {}
+            for key, text in zip(keys, texts):
+                if key not in found:
+                    missing.setdefault(key, text)
+            if missing:
+                vectors = self.embed(list(missing.values()))
+                computed = {key: np.asarray(vector, dtype=np.float32) for key, vector in zip(missing, vectors)}
+                self.cache.put_many(self.model, computed)
+                found.update(computed)
+            else:
+                call["cache_hit"] = True
+        return [found[key] for key in keys]
+
+
+_cache: Optional[EmbeddingCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    """Return the process-wide embedding cache, opening it on first call"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = EmbeddingCache(Config.EMBEDDING_CACHE_PATH, Config.EMBEDDING_CACHE_SIZE)
+        return _cache
@@ -0,0 +1,103 @@
+"""Structured event stream for runs.
+
+Every progress message, task, tool call, cache hit, retry and error is an
+event: one JSON line with a wall-clock timestamp, a monotonic timestamp and,
+for timed events, a duration. Events go to the run's ``events.jsonl`` (and to
+HORIZON_EVENTS, if set, for collecting many runs) and are rendered on stdout.
+
+HORIZON_EVENTS_STDOUT controls the renderer: ``messages`` (default) prints
+human-readable messages only, ``all`` prints every event, ``off`` nothing.
+"""
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import IO, Any, Dict, Iterator, Optional
+
+RENDER_MODES = ("messages", "all", "off")
+
+
+class EventStream:
+    """Thread-safe JSONL event writer with an optional stdout renderer"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._run_file: Optional[IO[str]] = None
+        self._global_file: Optional[IO[str]] = None
+        self.run_id: Optional[str] = None
+        self.render = os.getenv("HORIZON_EVENTS_STDOUT", "messages").lower()
+        if self.render not in RENDER_MODES:
+            self.render = "messages"
+        path = os.getenv("HORIZON_EVENTS")
+        if path:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self._global_file = open(path, "a", encoding="utf-8")
+
+    def open(self, path: str, run_id: Optional[str] = None) -> None:
+        """Start writing the events of a run to `path`"""
+        with self._lock:
+            if self._run_file:
+                self._run_file.close()
+            self._run_file = open(path, "w", encoding="utf-8")
+            self.run_id = run_id
+
+    def close(self) -> None:
+        with self._lock:
+            if self._run_file:
+                self._run_file.close()
+            self._run_file = None
+            self.run_id = None
+
+    def emit(self, type: str, message: Optional[str] = None, level: str = "info", **fields: Any) -> Dict[str, Any]:
+        """Record one event; `message` is what the stdout renderer shows"""
+        event: Dict[str, Any] = {
+            "ts": datetime.now().isoformat(timespec="milliseconds"),
+            "mono": round(time.monotonic(), 6),
+            "type": type,
+            "level": level,
+        }
+        if self.run_id:
+            event["run_id"] = self.run_id
+        if message is not None:
+            event["message"] = message
+        event.update(fields)
+        line = json.dumps(event, ensure_ascii=False, default=str) + "\n"
+
+        with self._lock:
+            for handle in (self._run_file, self._global_file):
+                if handle:
+                    handle.write(line)
+                    handle.flush()
+            if self.render == "all":
+                details = " ".join(f"{key}={value}" for key, value in fields.items())
+                print(f"[{event['ts'][11:]}] {type} {message or ''} {details}".rstrip())
+            elif self.render == "messages" and message is not None:
+                print(message, file=sys.stderr if level == "error" else sys.stdout)
+        return event
+
+    def log(self, message: str, level: str = "info", **fields: Any) -> Dict[str, Any]:
+        """A progress message"""
+        return self.emit("log", message, level=level, **fields)
+
+    def error(self, type: str, message: str, **fields: Any) -> Dict[str, Any]:
+        return self.emit(type, message, level="error", **fields)
+
+    @contextmanager
+    def span(self, type: str, message: Optional[str] = None, **fields: Any) -> Iterator[Dict[str, Any]]:
+        """Time a block and emit one event with its duration; the yielded dict adds fields"""
+        details: Dict[str, Any] = dict(fields)
+        start = time.monotonic()
+        try:
+            yield details
+        except Exception as e:
+            details["error"] = f"{e.__class__.__name__}: {e}"
+            raise
+        finally:
+            level = "error" if details.get("error") else "info"
+            self.emit(type, message, level=level, duration_s=round(time.monotonic() - start, 4), **details)
+
+
+events = EventStream()
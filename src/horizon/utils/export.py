@@ -0,0 +1,170 @@
+"""
+Streaming writers for run artifacts.
+
+Task outputs are written as they arrive: one JSONL line per startup (or per
+non-tabular task result), one CSV row per startup and one markdown section per
+task. Nothing is buffered beyond the record being written, so memory stays
+flat regardless of how many startups or countries a run covers.
+"""
+import csv
+import json
+from typing import Any, Dict, IO, Iterable, Optional
+
+# Standardized startup fields, in CSV column order (see StartupDB._standardize_startup_data)
+CSV_FIELDS = [
+    "task", "name", "website", "description", "location", "country",
+    "technology", "market", "founded", "milestones", "source_url", "extra",
+]
+
+# LLM-style field names mapped to the standardized ones
+FIELD_ALIASES = {
+    "Company Name": "name",
+    "Website": "website",
+    "Description": "description",
+    "Location": "location",
+    "AI Technology Focus": "technology",
+    "Target Market": "market",
+    "Founding Year": "founded",
+    "Key Milestones": "milestones",
+    "Source URL": "source_url",
+}
+
+MARKDOWN_PREVIEW_CHARS = 1000
+
+
+def bounded_json(value: Any, limit: int = MARKDOWN_PREVIEW_CHARS) -> str:
+    """Serialize `value` as indented JSON, stopping once `limit` characters are produced"""
+    chunks = []
+    size = 0
+    for chunk in json.JSONEncoder(indent=2, ensure_ascii=False, default=str).iterencode(value):
+        chunks.append(chunk)
+        size += len(chunk)
+        if size > limit:
+            return "".join(chunks)[:limit] + "..."
+    return "".join(chunks)
+
+
+def csv_row(task_name: str, record: Dict[str, Any]) -> Dict[str, Any]:
+    """CSV row of a startup record: standardized fields as columns, everything else as JSON in `extra`"""
+    row: Dict[str, Any] = {"task": task_name}
+    extra = {}
+    for key, value in record.items():
+        field = FIELD_ALIASES.get(key, key)
+        if field in CSV_FIELDS and field not in ("task", "extra"):
+            row[field] = value
+        else:
+            extra[key] = value
+    if extra:
+        row["extra"] = json.dumps(extra, ensure_ascii=False, default=str)
+    return row
+
+
+class StreamingRunExporter:
+    """Incremental JSONL/CSV/markdown writer for one country run"""
+
+    def __init__(self, base_filename: str, markdown_header: str = ""):
+        self.base_filename = base_filename
+        self.jsonl_path = f"{base_filename}.jsonl"
+        self.csv_path = f"{base_filename}.csv"
+        self.summary_path = f"{base_filename}_summary.md"
+        self.startups_written = 0
+        self.tasks_written = 0
+
+        self._jsonl: IO[str] = open(self.jsonl_path, "w", encoding="utf-8")
+        self._csv_file: IO[str] = open(self.csv_path, "w", encoding="utf-8", newline="")
+        self._csv = csv.DictWriter(self._csv_file, fieldnames=CSV_FIELDS, extrasaction="ignore")
+        self._csv.writeheader()
+        self._markdown: IO[str] = open(self.summary_path, "w", encoding="utf-8")
+        self._markdown.write(markdown_header)
+        self._closed = False
+
+    def write_record(self, record: Dict[str, Any]) -> None:
+        """Append one JSON line"""
+        self._jsonl.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+
+    def write_startups(self, task_name: str, startups: Iterable[Dict[str, Any]]) -> int:
+        """Stream startup records to the JSONL and CSV files"""
+        count = 0
+        for startup in startups:
+            if not isinstance(startup, dict):
+                continue
+            self.write_record({"type": "startup", "task": task_name, "record": startup})
+            self._csv.writerow(csv_row(task_name, startup))
+            count += 1
+        self.startups_written += count
+        return count
+
+    def write_task(self, task_name: str, task_result: Any) -> None:
+        """Write one finished task: its startups, its remaining data and its markdown section"""
+        startups = None
+        if isinstance(task_result, dict) and isinstance(task_result.get("startups"), list):
+            startups = task_result["startups"]
+            rest = {key: value for key, value in task_result.items() if key != "startups"}
+        elif isinstance(task_result, list):
+            startups, rest = task_result, None
+        else:
+            rest = task_result
+
+        startup_count = self.write_startups(task_name, startups) if startups is not None else 0
+        if rest:
+            self.write_record({"type": "task", "task": task_name, "result": rest})
+        self._write_section(task_name, task_result, startup_count)
+        self.tasks_written += 1
+        self.flush()
+
+    def _write_section(self, task_name: str, task_result: Any, startup_count: int) -> None:
+        self._markdown.write(f"### {task_name.replace('_', ' ').title()}\n\n")
+        if startup_count:
+            self._markdown.write(f"Startups: {startup_count}\n\n")
+        if isinstance(task_result, str):
+            preview = task_result[:MARKDOWN_PREVIEW_CHARS] + "..." if len(task_result) > MARKDOWN_PREVIEW_CHARS else task_result
+        else:
+            preview = bounded_json(task_result)
+        self._markdown.write(f"```\n{preview}\n```\n\n")
+
+    def write_markdown(self, text: str) -> None:
+        self._markdown.write(text)
+
+    def flush(self) -> None:
+        for handle in (self._jsonl, self._csv_file, self._markdown):
+            handle.flush()
+
+    def close(self, markdown_footer: str = "") -> None:
+        """Write the markdown footer and close every file"""
+        if self._closed:
+            return
+        self._markdown.write(markdown_footer)
+        for handle in (self._jsonl, self._csv_file, self._markdown):
+            handle.close()
+        self._closed = True
+
+
+class ConsolidatedReportWriter:
+    """Appends each country's results to the consolidated JSONL and markdown report as it completes"""
+
+    def __init__(self, filename: str, markdown_header: str = ""):
+        self.filename = filename
+        self.jsonl_path = f"{filename}.jsonl"
+        self.markdown_path = f"{filename}_consolidated.md"
+        self.successes = 0
+        self.failures = 0
+
+        self._jsonl: IO[str] = open(self.jsonl_path, "w", encoding="utf-8")
+        self._markdown: IO[str] = open(self.markdown_path, "w", encoding="utf-8")
+        self._markdown.write(markdown_header)
+
+    def add_country(self, country: str, results: Dict[str, Any]) -> None:
+        failed = isinstance(results, dict) and "error" in results
+        if failed:
+            self.failures += 1
+        else:
+            self.successes += 1
+        self._jsonl.write(json.dumps({"country": country, "results": results}, ensure_ascii=False, default=str) + "\n")
+        self._markdown.write(f"- **{country}**: {'❌ Error' if failed else '✅ Success'}\n")
+        self._jsonl.flush()
+        self._markdown.flush()
+
+    def close(self, markdown_footer: Optional[str] = None) -> None:
+        self._markdown.write(markdown_footer or "")
+        self._jsonl.close()
+        self._markdown.close()
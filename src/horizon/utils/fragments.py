@@ -0,0 +1,151 @@
+"""On-disk cache of rendered report fragments.
+
+Startup cards and whole report sections are cached under a content hash of
+their input plus a render version, so a recurring newsletter over a mostly
+unchanged database is assembled from cached fragments instead of being
+re-rendered. Entries live in one SQLite file; lookups are batched, new
+entries and recency updates are written in one transaction per render, and
+the least recently used entries are evicted beyond `max_entries` or once the
+stored fragments exceed `max_bytes` (tracked per row, so the total is summed
+from an index rather than from the fragments themselves). Recency is
+only refreshed once per TOUCH_SECONDS, since updating thousands of rows on
+every render would cost more than rendering the cards again.
+"""
+import hashlib
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+# SQLite's default limit on host parameters per statement is 999
+_QUERY_CHUNK = 900
+# Recency is refreshed at most this often per entry; LRU order only needs to be roughly right
+TOUCH_SECONDS = 3600.0
+
+
+def fragment_key(version: str, kind: str, *inputs: Any) -> str:
+    """Content hash of a fragment's inputs; repr is stable for JSON-like data"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{version}\x00{kind}\x00".encode("utf-8"))
+    for value in inputs:
+        digest.update(repr(value).encode("utf-8", "surrogatepass"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+class FragmentCache:
+    """Rendered fragments keyed by content hash, with LRU eviction on disk"""
+
+    def __init__(self, path: str, max_entries: int = 50000, max_bytes: int = 256 * 1024 * 1024):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS fragments (key TEXT PRIMARY KEY, value TEXT NOT NULL, used_at REAL NOT NULL, "
+            "size INTEGER NOT NULL DEFAULT 0)"
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(fragments)")}
+        if "size" not in columns:
+            # Caches written before sizes were tracked
+            self._conn.execute("ALTER TABLE fragments ADD COLUMN size INTEGER NOT NULL DEFAULT 0")
+            self._conn.execute("UPDATE fragments SET size = LENGTH(CAST(value AS BLOB))")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS fragments_lru ON fragments (used_at, size, key)")
+        self._lock = threading.Lock()
+        self._new: Dict[str, str] = {}
+        self._used: set = set()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[str]:
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, str]:
+        """Cached fragments for whichever of `keys` are present"""
+        keys = list(dict.fromkeys(keys))
+        found: Dict[str, str] = {}
+        with self._lock:
+            pending = []
+            for key in keys:
+                if key in self._new:
+                    found[key] = self._new[key]
+                else:
+                    pending.append(key)
+            for i in range(0, len(pending), _QUERY_CHUNK):
+                chunk = pending[i:i + _QUERY_CHUNK]
+                rows = self._conn.execute(
+                    f"SELECT key, value, used_at FROM fragments WHERE key IN ({','.join('?' * len(chunk))})", chunk
+                )
+                stale_before = time.time() - TOUCH_SECONDS
+                for key, value, used_at in rows:
+                    found[key] = value
+                    if used_at < stale_before:
+                        self._used.add(key)
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def put(self, key: str, value: str) -> None:
+        with self._lock:
+            self._new[key] = value
+
+    def put_many(self, fragments: Dict[str, str]) -> None:
+        with self._lock:
+            self._new.update(fragments)
+
+    def flush(self) -> None:
+        """Write new fragments and stale recency updates, then evict the least recently used"""
+        with self._lock:
+            if not self._new and not self._used:
+                return
+            now = time.time()
+            used = [key for key in self._used if key not in self._new]
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO fragments (key, value, used_at, size) VALUES (?, ?, ?, ?)",
+                    ((key, value, now, len(value.encode("utf-8", "surrogatepass")))
+                     for key, value in self._new.items()),
+                )
+                for i in range(0, len(used), _QUERY_CHUNK):
+                    chunk = used[i:i + _QUERY_CHUNK]
+                    self._conn.execute(
+                        f"UPDATE fragments SET used_at = ? WHERE key IN ({','.join('?' * len(chunk))})", [now, *chunk]
+                    )
+                self._evict()
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._new.clear()
+            self._used.clear()
+
+    def _evict(self) -> None:
+        """Drop the least recently used fragments beyond the entry and byte limits"""
+        count, total = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM fragments").fetchone()
+        if count > self.max_entries:
+            self._conn.execute(
+                "DELETE FROM fragments WHERE key IN "
+                "(SELECT key FROM fragments ORDER BY used_at LIMIT ?)", (count - self.max_entries,)
+            )
+        if self.max_bytes > 0 and total > self.max_bytes:
+            # Keep the most recently used fragments whose running size still fits
+            self._conn.execute(
+                "DELETE FROM fragments WHERE key IN (SELECT key FROM "
+                "(SELECT key, SUM(size) OVER (ORDER BY used_at DESC, key) AS kept FROM fragments) WHERE kept > ?)",
+                (self.max_bytes,),
+            )
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            count, total = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM fragments").fetchone()
+        return {"entries": count, "bytes": total, "hits": self.hits, "misses": self.misses}
+
+    def close(self) -> None:
+        self.flush()
+        self._conn.close()
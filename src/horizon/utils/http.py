@@ -0,0 +1,256 @@
+"""
+Shared HTTP client for the custom tools and the scraper.
+
+One pooled keep-alive session per process (per-host connection pools, so
+repeat visits to a host skip the TCP/TLS handshake), with gzip/deflate (and
+brotli when the `brotli` package is installed), connect/read timeouts,
+permanent redirects remembered so later requests go straight to the target,
+and an on-disk response store used for conditional GETs: a fresh entry
+(Cache-Control max-age) is served without a request, and a stale one is
+revalidated with If-None-Match / If-Modified-Since, so an unchanged page
+costs a 304.
+"""
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+from horizon.config import Config
+from horizon.utils.metrics import metrics
+
+PERMANENT_REDIRECTS = (301, 308)
+MAX_REDIRECT_HOPS = 10
+_MAX_AGE = re.compile(r"max-age=(\d+)")
+
+
+class HttpResponse:
+    """A fetched (or revalidated) page"""
+
+    def __init__(self, url: str, status: int, headers: Dict[str, str], content: bytes,
+                 encoding: Optional[str], from_cache: bool = False, revalidated: bool = False):
+        self.url = url
+        self.status = status
+        self.headers = headers
+        self.content = content
+        self.encoding = encoding or "utf-8"
+        self.from_cache = from_cache
+        self.revalidated = revalidated
+
+    @property
+    def ok(self) -> bool:
+        return self.status < 400
+
+    @property
+    def text(self) -> str:
+        return self.content.decode(self.encoding, errors="replace")
+
+
+def _max_age(headers: Dict[str, str]) -> Optional[float]:
+    cache_control = headers.get("Cache-Control", "").lower()
+    if "no-cache" in cache_control or "no-store" in cache_control:
+        return None
+    match = _MAX_AGE.search(cache_control)
+    return float(match.group(1)) if match else None
+
+
+class ResponseStore:
+    """Validators and bodies of earlier responses, plus known permanent redirects, in SQLite"""
+
+    def __init__(self, path: str, max_entries: int = 5000):
+        self.max_entries = max_entries
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses (url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, "
+            "expires_at REAL, encoding TEXT, content_type TEXT, body BLOB, stored_at REAL NOT NULL, final_url TEXT)"
+        )
+        if "final_url" not in {row[1] for row in self._conn.execute("PRAGMA table_info(responses)")}:
+            self._conn.execute("ALTER TABLE responses ADD COLUMN final_url TEXT")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS redirects (url TEXT PRIMARY KEY, target TEXT NOT NULL)")
+        self._lock = threading.Lock()
+        self._redirects: Dict[str, str] = dict(self._conn.execute("SELECT url, target FROM redirects"))
+        self._writes = 0
+
+    def resolve(self, url: str) -> str:
+        """Follow known permanent redirects"""
+        for _ in range(MAX_REDIRECT_HOPS):
+            target = self._redirects.get(url)
+            if target is None or target == url:
+                break
+            url = target
+        return url
+
+    def add_redirect(self, url: str, target: str) -> None:
+        with self._lock:
+            if self._redirects.get(url) == target:
+                return
+            self._redirects[url] = target
+            self._conn.execute("INSERT OR REPLACE INTO redirects (url, target) VALUES (?, ?)", (url, target))
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT etag, last_modified, expires_at, encoding, content_type, body, final_url "
+                "FROM responses WHERE url = ?",
+                (url,),
+            ).fetchone()
+        if row is None:
+            return None
+        etag, last_modified, expires_at, encoding, content_type, body, final_url = row
+        return {"etag": etag, "last_modified": last_modified, "expires_at": expires_at, "encoding": encoding,
+                "content_type": content_type, "content": zlib.decompress(body), "final_url": final_url or url}
+
+    def put(self, url: str, headers: Dict[str, str], encoding: Optional[str], content: bytes,
+            final_url: Optional[str] = None) -> None:
+        """Store a response under the URL that was requested; `final_url` is where redirects ended up"""
+        max_age = _max_age(headers)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (url, etag, last_modified, expires_at, encoding, content_type, "
+                "body, stored_at, final_url) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, headers.get("ETag"), headers.get("Last-Modified"),
+                 time.time() + max_age if max_age else None, encoding, headers.get("Content-Type"),
+                 zlib.compress(content), time.time(), final_url if final_url != url else None),
+            )
+            self._writes += 1
+            if self._writes % 100 == 0:
+                self._evict()
+
+    def refresh(self, url: str, headers: Dict[str, str]) -> None:
+        """A 304 keeps the stored body; its freshness moves and any new validators replace the stored ones"""
+        max_age = _max_age(headers)
+        with self._lock:
+            self._conn.execute(
+                "UPDATE responses SET expires_at = ?, stored_at = ?, etag = COALESCE(?, etag), "
+                "last_modified = COALESCE(?, last_modified) WHERE url = ?",
+                (time.time() + max_age if max_age else None, time.time(), headers.get("ETag"),
+                 headers.get("Last-Modified"), url),
+            )
+
+    def _evict(self) -> None:
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()
+        if count > self.max_entries:
+            self._conn.execute("DELETE FROM responses WHERE url IN "
+                               "(SELECT url FROM responses ORDER BY stored_at LIMIT ?)", (count - self.max_entries,))
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+class HttpClient:
+    """Pooled keep-alive session with timeouts, cached redirects and conditional GETs"""
+
+    def __init__(self, store: Optional[ResponseStore] = None, pool_hosts: Optional[int] = None,
+                 pool_size: Optional[int] = None, timeout: Optional[tuple] = None):
+        import requests  # only needed once something is actually fetched
+        from urllib3.util import make_headers
+
+        self.store = store
+        self.timeout = timeout or (Config.HTTP_CONNECT_TIMEOUT, Config.HTTP_READ_TIMEOUT)
+        self._session = requests.Session()
+        # Advertises br too when urllib3 can decode it (brotli installed)
+        self._session.headers.update(make_headers(accept_encoding=True))
+        self._session.headers["User-Agent"] = Config.HTTP_USER_AGENT
+        adapter = requests.adapters.HTTPAdapter(pool_connections=pool_hosts or Config.HTTP_POOL_HOSTS,
+                                                pool_maxsize=pool_size or Config.HTTP_POOL_SIZE)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+
+    def get(self, url: str, conditional: bool = True, headers: Optional[Dict[str, str]] = None) -> HttpResponse:
+        """GET `url`, served from or revalidated against the response store when possible"""
+        target = self.store.resolve(url) if self.store else url
+        cached = self.store.get(target) if self.store and conditional else None
+        with metrics.timed("http", urlsplit(target).netloc or target) as call:
+            if cached and cached["expires_at"] and cached["expires_at"] > time.time():
+                call["cache_hit"] = True
+                return self._from_cache(cached, revalidated=False)
+
+            request_headers = dict(headers or {})
+            if cached:
+                if cached["etag"]:
+                    request_headers["If-None-Match"] = cached["etag"]
+                if cached["last_modified"]:
+                    request_headers["If-Modified-Since"] = cached["last_modified"]
+            response = self._session.get(target, headers=request_headers, timeout=self.timeout)
+
+            if self.store:
+                self._remember_redirects(target, response)
+            if response.status_code == 304 and cached:
+                call["cache_hit"] = True
+                # Validators are stored under the requested URL, which is also how they are looked up
+                self.store.refresh(target, response.headers)
+                cached = dict(cached, etag=response.headers.get("ETag") or cached["etag"],
+                              last_modified=response.headers.get("Last-Modified") or cached["last_modified"])
+                return self._from_cache(cached, revalidated=True)
+
+            content = response.content
+            encoding = response.encoding or response.apparent_encoding
+            if self.store and response.status_code == 200 and self._cacheable(response.headers):
+                self.store.put(target, response.headers, encoding, content, final_url=response.url)
+            return HttpResponse(response.url, response.status_code, dict(response.headers), content, encoding)
+
+    def _remember_redirects(self, url: str, response: Any) -> None:
+        hops = [hop.url for hop in response.history] + [response.url]
+        for hop, status, target in zip(hops, [h.status_code for h in response.history], hops[1:]):
+            if status in PERMANENT_REDIRECTS:
+                self.store.add_redirect(hop, target)
+
+    def _cacheable(self, headers: Dict[str, str]) -> bool:
+        if "no-store" in headers.get("Cache-Control", "").lower():
+            return False
+        return bool(headers.get("ETag") or headers.get("Last-Modified") or _max_age(headers))
+
+    def _from_cache(self, cached: Dict[str, Any], revalidated: bool) -> HttpResponse:
+        headers = {"Content-Type": cached["content_type"] or ""}
+        if cached["etag"]:
+            headers["ETag"] = cached["etag"]
+        if cached["last_modified"]:
+            headers["Last-Modified"] = cached["last_modified"]
+        return HttpResponse(cached["final_url"], 200, headers, cached["content"], cached["encoding"],
+                            from_cache=True, revalidated=revalidated)
+
+    def close(self) -> None:
+        self._session.close()
+        if self.store:
+            self.store.close()
+
+
+_client: Optional[HttpClient] = None
+_client_lock = threading.Lock()
+
+
+def get_http_client() -> HttpClient:
+    """Return the process-wide client, building it on first call"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            store = ResponseStore(Config.HTTP_CACHE_PATH, Config.HTTP_CACHE_SIZE) if Config.HTTP_CACHE_SIZE > 0 else None
+            _client = HttpClient(store)
+        return _client
+
+
+def html_to_text(html: str) -> str:
+    """Visible text of a page, whitespace collapsed like ScrapeWebsiteTool's output"""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, "html.parser")
+    for element in soup(["script", "style", "noscript", "template"]):
+        element.decompose()
+    text = soup.get_text(" ")
+    text = re.sub(r"[ \t]+", " ", text)
+    return re.sub(r"\s+\n\s+", "\n", text).strip()
+
+
+def scrape_text(url: str) -> str:
+    """Fetch a page through the shared client and return its visible text"""
+    response = get_http_client().get(url)
+    if not response.ok:
+        raise RuntimeError(f"HTTP {response.status} fetching {url}")
+    return html_to_text(response.text)
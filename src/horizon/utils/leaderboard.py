@@ -0,0 +1,184 @@
+"""
+Materialized top-K leaderboards: overall, per country and per sector.
+
+Each board is a size-K min-heap, so an insert or score change costs O(log K)
+and the current minimum decides admission in O(1). Score changes of a member
+invalidate its old heap entry lazily. When a member drops (or leaves the
+board) while better-ranked outsiders may exist, the board is marked for a
+rebuild from the full score vector, which StartupDB does after each write.
+"""
+import heapq
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+OVERALL = "overall"
+
+
+def _group(value: Any) -> str:
+    return str(value or "").lower().strip() or "unknown"
+
+
+def board_names(record: Dict[str, Any]) -> List[str]:
+    """Boards a startup competes on"""
+    return [OVERALL, f"country:{_group(record.get('country'))}", f"sector:{_group(record.get('market'))}"]
+
+
+class TopK:
+    """Top-K startups by score for one board"""
+
+    def __init__(self, k: int):
+        self.k = k
+        self._heap: List[List[Any]] = []  # [score, key, name, live]
+        self._members: Dict[str, List[Any]] = {}
+        # True once a candidate has been turned away or evicted: a member
+        # dropping may then leave a better outsider off the board
+        self.truncated = False
+        self.dirty = False
+
+    def __len__(self) -> int:
+        return len(self._members)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._members
+
+    def _min(self) -> Optional[List[Any]]:
+        while self._heap and not self._heap[0][3]:
+            heapq.heappop(self._heap)
+        return self._heap[0] if self._heap else None
+
+    def _push(self, key: str, name: str, score: float) -> None:
+        entry = [score, key, name, True]
+        self._members[key] = entry
+        heapq.heappush(self._heap, entry)
+        if len(self._heap) > 2 * self.k + 16:
+            # Drop invalidated entries so the heap stays O(K)
+            self._heap = [e for e in self._heap if e[3]]
+            heapq.heapify(self._heap)
+
+    def offer(self, key: str, name: str, score: float) -> bool:
+        """Insert or update a startup; returns whether it is on the board"""
+        current = self._members.get(key)
+        if current is not None:
+            if current[0] == score and current[2] == name:
+                return True
+            current[3] = False
+            del self._members[key]
+            if score < current[0] and self.truncated:
+                self.dirty = True
+            self._push(key, name, score)
+            return True
+
+        if len(self._members) < self.k:
+            self._push(key, name, score)
+            return True
+
+        self.truncated = True
+        lowest = self._min()
+        if (score, key) <= (lowest[0], lowest[1]):
+            return False
+        lowest[3] = False
+        del self._members[lowest[1]]
+        heapq.heappop(self._heap)
+        self._push(key, name, score)
+        return True
+
+    def remove(self, key: str) -> None:
+        entry = self._members.pop(key, None)
+        if entry is not None:
+            entry[3] = False
+            if self.truncated:
+                self.dirty = True
+
+    def load(self, entries: Iterable[Tuple[float, str, str]], truncated: bool) -> None:
+        self._members = {key: [score, key, name, True] for score, key, name in entries}
+        self._heap = list(self._members.values())
+        heapq.heapify(self._heap)
+        self.truncated = truncated
+        self.dirty = False
+
+    def entries(self) -> List[Tuple[float, str, str]]:
+        """(score, key, name), best first"""
+        return sorted(((e[0], e[1], e[2]) for e in self._members.values()), key=lambda e: (-e[0], e[1]))
+
+
+class Leaderboards:
+    """All boards of a database, persisted as a small JSON file beside it"""
+
+    def __init__(self, path: Optional[Path] = None, k: int = 25):
+        self.path = Path(path) if path else None
+        self.k = k
+        self.boards: Dict[str, TopK] = {}
+        self.loaded = False
+        if self.path and self.path.exists():
+            self._load()
+
+    def _board(self, name: str) -> TopK:
+        board = self.boards.get(name)
+        if board is None:
+            board = self.boards[name] = TopK(self.k)
+        return board
+
+    def _load(self) -> None:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return
+        if data.get("k") != self.k:
+            return
+        for name, board in data.get("boards", {}).items():
+            self._board(name).load((tuple(entry) for entry in board["entries"]), board.get("truncated", False))
+        self.loaded = True
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        data = {
+            "k": self.k,
+            "boards": {
+                name: {"truncated": board.truncated, "entries": [list(entry) for entry in board.entries()]}
+                for name, board in self.boards.items() if len(board)
+            },
+        }
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def update(self, key: str, record: Dict[str, Any], score: float) -> None:
+        """Offer a new or re-scored startup to its boards, and take it off boards it left"""
+        targets = board_names(record)
+        for name, board in self.boards.items():
+            if key in board and name not in targets:
+                board.remove(key)
+        for name in targets:
+            self._board(name).offer(key, record.get("name", key), score)
+
+    def remove(self, key: str) -> None:
+        for board in self.boards.values():
+            board.remove(key)
+
+    def dirty(self) -> List[str]:
+        return [name for name, board in self.boards.items() if board.dirty]
+
+    def rebuild(self, scored: Iterable[Tuple[str, Dict[str, Any], float]], only: Optional[Iterable[str]] = None) -> None:
+        """Recompute boards (all, or just `only`) from every (key, record, score)"""
+        only = set(only) if only is not None else None
+        candidates: Dict[str, List[Tuple[float, str, str]]] = {}
+        for key, record, score in scored:
+            for name in board_names(record):
+                if only is None or name in only:
+                    candidates.setdefault(name, []).append((score, key, record.get("name", key)))
+
+        for name in (only if only is not None else set(self.boards) | set(candidates)):
+            entries = candidates.get(name, [])
+            top = heapq.nlargest(self.k, entries, key=lambda e: (e[0], e[1]))
+            self._board(name).load(top, truncated=len(entries) > self.k)
+        self.loaded = True
+
+    def top(self, board: str = OVERALL, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Entries of one board, best first"""
+        entries = self.boards[board].entries() if board in self.boards else []
+        return [{"name": name, "score": score} for score, _, name in entries[:limit]]
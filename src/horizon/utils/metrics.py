@@ -0,0 +1,268 @@
+"""Run metrics for the discovery pipeline.
+
+Records wall time, call counts, token usage, cache hits and retries for each
+agent, task and tool call of a run, and writes them to a JSON file and a
+Prometheus textfile.
+"""
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+
+from horizon.utils.events import events
+
+METRIC_KINDS = ("agent", "task", "tool", "http", "embedding", "sleep")
+
+TOKEN_FIELDS = ("prompt_tokens", "completion_tokens", "total_tokens", "cached_prompt_tokens")
+
+
+def _empty_entry() -> Dict[str, Any]:
+    entry = {
+        "calls": 0,
+        "errors": 0,
+        "wall_time_s": 0.0,
+        "max_time_s": 0.0,
+        "cache_hits": 0,
+        "retries": 0,
+    }
+    for field in TOKEN_FIELDS:
+        entry[field] = 0
+    return entry
+
+
+def usage_to_dict(usage: Any) -> Dict[str, int]:
+    """Normalize a crewAI UsageMetrics object (or dict) into plain token counts"""
+    if usage is None:
+        return {}
+    if hasattr(usage, "model_dump"):
+        usage = usage.model_dump()
+    elif not isinstance(usage, dict):
+        usage = {field: getattr(usage, field, 0) for field in TOKEN_FIELDS + ("successful_requests",)}
+    return {key: int(usage.get(key) or 0) for key in TOKEN_FIELDS + ("successful_requests",)}
+
+
+class RunMetrics:
+    """Thread-safe collector of per-agent, per-task and per-tool metrics for one run"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self, run_id: Optional[str] = None, labels: Optional[Dict[str, str]] = None) -> None:
+        """Start a fresh run, discarding everything recorded so far"""
+        with self._lock:
+            self.run_id = run_id or datetime.now().strftime("%Y%m%d_%H%M%S")
+            self.labels = dict(labels or {})
+            self.started_at = datetime.now().isoformat()
+            self._started_monotonic = time.monotonic()
+            self.entries: Dict[str, Dict[str, Dict[str, Any]]] = {kind: {} for kind in METRIC_KINDS}
+            self.totals: Dict[str, int] = {}
+
+    def _entry(self, kind: str, name: str) -> Dict[str, Any]:
+        bucket = self.entries.setdefault(kind, {})
+        if name not in bucket:
+            bucket[name] = _empty_entry()
+        return bucket[name]
+
+    def record(self, kind: str, name: str, duration: float = 0.0, calls: int = 1,
+               error: bool = False, cache_hit: bool = False, retries: int = 0,
+               tokens: Optional[Dict[str, int]] = None) -> None:
+        """Record one (or `calls`) observation for an agent, task, tool or sleep"""
+        with self._lock:
+            entry = self._entry(kind, name)
+            entry["calls"] += calls
+            entry["wall_time_s"] += duration
+            entry["max_time_s"] = max(entry["max_time_s"], duration)
+            entry["retries"] += retries
+            if error:
+                entry["errors"] += 1
+            if cache_hit:
+                entry["cache_hits"] += 1
+            for field, value in (tokens or {}).items():
+                if field in TOKEN_FIELDS:
+                    entry[field] += int(value or 0)
+
+    @contextmanager
+    def timed(self, kind: str, name: str, **extra: Any) -> Iterator[Dict[str, Any]]:
+        """Time a block; callers may set `cache_hit`/`retries` on the yielded dict"""
+        details: Dict[str, Any] = dict(extra)
+        start = time.perf_counter()
+        failure = None
+        try:
+            yield details
+        except Exception as e:
+            details["error"] = True
+            failure = f"{e.__class__.__name__}: {e}"
+            raise
+        finally:
+            duration = time.perf_counter() - start
+            self.record(
+                kind, name,
+                duration=duration,
+                error=details.get("error", False),
+                cache_hit=details.get("cache_hit", False),
+                retries=details.get("retries", 0),
+                tokens=details.get("tokens"),
+            )
+            events.emit(
+                f"{kind}.call", level="error" if details.get("error") else "info", name=name,
+                duration_s=round(duration, 4), cache_hit=details.get("cache_hit", False),
+                retries=details.get("retries", 0), error=failure,
+            )
+
+    def set_totals(self, usage: Any) -> None:
+        """Store crew-level token usage for the run"""
+        with self._lock:
+            self.totals = usage_to_dict(usage)
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self._started_monotonic
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return a JSON-serializable copy of everything recorded"""
+        with self._lock:
+            return {
+                "run_id": self.run_id,
+                "labels": dict(self.labels),
+                "started_at": self.started_at,
+                "wall_time_s": round(self.elapsed(), 3),
+                "totals": dict(self.totals),
+                "metrics": {kind: {name: dict(entry) for name, entry in bucket.items()}
+                            for kind, bucket in self.entries.items()},
+            }
+
+    def summary_rows(self) -> List[Dict[str, Any]]:
+        """Flatten metrics into rows sorted by kind and descending wall time"""
+        rows = []
+        snapshot = self.snapshot()["metrics"]
+        for kind in METRIC_KINDS:
+            bucket = snapshot.get(kind, {})
+            for name, entry in sorted(bucket.items(), key=lambda item: item[1]["wall_time_s"], reverse=True):
+                rows.append({"kind": kind, "name": name, **entry})
+        return rows
+
+    def write_json(self, path: str) -> None:
+        """Write the per-run metrics JSON file"""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f, indent=2, ensure_ascii=False)
+
+    def write_prometheus(self, path: str) -> None:
+        """Write metrics in the Prometheus textfile collector format (atomically)"""
+        snapshot = self.snapshot()
+        base_labels = {"run_id": snapshot["run_id"], **snapshot["labels"]}
+        series = [
+            ("horizon_calls_total", "counter", "Number of calls", "calls"),
+            ("horizon_errors_total", "counter", "Number of failed calls", "errors"),
+            ("horizon_wall_time_seconds_total", "counter", "Accumulated wall time in seconds", "wall_time_s"),
+            ("horizon_max_wall_time_seconds", "gauge", "Slowest single call in seconds", "max_time_s"),
+            ("horizon_cache_hits_total", "counter", "Calls served from a cache", "cache_hits"),
+            ("horizon_retries_total", "counter", "Retried attempts", "retries"),
+        ] + [
+            (f"horizon_{field}_total", "counter", f"LLM {field.replace('_', ' ')}", field)
+            for field in TOKEN_FIELDS
+        ]
+
+        lines = []
+        for metric_name, metric_type, help_text, field in series:
+            lines.append(f"# HELP {metric_name} {help_text}")
+            lines.append(f"# TYPE {metric_name} {metric_type}")
+            for kind, bucket in snapshot["metrics"].items():
+                for name, entry in bucket.items():
+                    labels = {**base_labels, "kind": kind, "name": name}
+                    lines.append(f"{metric_name}{{{_format_labels(labels)}}} {entry[field]}")
+
+        lines.append("# HELP horizon_run_wall_time_seconds Total wall time of the run")
+        lines.append("# TYPE horizon_run_wall_time_seconds gauge")
+        lines.append(f"horizon_run_wall_time_seconds{{{_format_labels(base_labels)}}} {snapshot['wall_time_s']}")
+
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(tmp_path, path)
+
+    def markdown_table(self) -> str:
+        """Render the metrics summary as a markdown table"""
+        header = ("| Kind | Name | Calls | Errors | Wall time (s) | Max (s) "
+                  "| Tokens | Cache hits | Retries |\n"
+                  "|------|------|-------|--------|---------------|---------"
+                  "|--------|------------|---------|\n")
+        rows = [
+            f"| {row['kind']} | {row['name']} | {row['calls']} | {row['errors']} "
+            f"| {row['wall_time_s']:.2f} | {row['max_time_s']:.2f} | {row['total_tokens']} "
+            f"| {row['cache_hits']} | {row['retries']} |"
+            for row in self.summary_rows()
+        ]
+        if not rows:
+            return "_No metrics were recorded for this run._\n"
+        return header + "\n".join(rows) + "\n"
+
+
+def _format_labels(labels: Dict[str, Any]) -> str:
+    escaped = []
+    for key, value in labels.items():
+        value = str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        escaped.append(f'{key}="{value}"')
+    return ",".join(escaped)
+
+
+def agent_token_usage(agent: Any) -> Dict[str, int]:
+    """Read the accumulated token usage of a crewAI agent, whichever API it exposes"""
+    llm = getattr(agent, "llm", None)
+    if llm is not None and hasattr(llm, "get_token_usage_summary"):
+        return usage_to_dict(llm.get_token_usage_summary())
+    token_process = getattr(agent, "_token_process", None)
+    if token_process is not None and hasattr(token_process, "get_summary"):
+        return usage_to_dict(token_process.get_summary())
+    return {}
+
+
+_listeners_installed = False
+
+
+def install_crewai_listeners(run_metrics: "RunMetrics") -> None:
+    """Record agent-initiated tool calls (duration, cache hits, retries) from crewAI events"""
+    global _listeners_installed
+    if _listeners_installed:
+        return
+
+    try:
+        from crewai.events import crewai_event_bus, ToolUsageErrorEvent, ToolUsageFinishedEvent
+    except ImportError:
+        try:
+            from crewai.utilities.events import crewai_event_bus, ToolUsageErrorEvent, ToolUsageFinishedEvent
+        except ImportError:
+            return
+
+    @crewai_event_bus.on(ToolUsageFinishedEvent)
+    def _on_tool_finished(source, event):
+        duration = 0.0
+        if getattr(event, "started_at", None) and getattr(event, "finished_at", None):
+            duration = (event.finished_at - event.started_at).total_seconds()
+        cache_hit = bool(getattr(event, "from_cache", False))
+        retries = max(int(getattr(event, "run_attempts", 1) or 1) - 1, 0)
+        run_metrics.record(
+            "tool", event.tool_name,
+            duration=duration,
+            cache_hit=cache_hit,
+            retries=retries,
+        )
+        events.emit("agent_tool.call", name=event.tool_name, duration_s=round(duration, 4),
+                    cache_hit=cache_hit, retries=retries)
+        if cache_hit:
+            events.emit("cache.hit", tool=event.tool_name)
+        if retries:
+            events.emit("retry", tool=event.tool_name, retries=retries, level="warning")
+
+    @crewai_event_bus.on(ToolUsageErrorEvent)
+    def _on_tool_error(source, event):
+        run_metrics.record("tool", event.tool_name, error=True)
+        events.emit("agent_tool.error", level="error", name=event.tool_name, error=str(getattr(event, "error", "")))
+
+    _listeners_installed = True
+
+
+# Process-wide collector shared by the crew and the tools
+metrics = RunMetrics()
@@ -0,0 +1,208 @@
+"""Opt-in profiling for full pipeline runs.
+
+Enabled with HORIZON_PROFILE (or `run --profile=...`), a comma-separated list of:
+
+- ``cprofile``: one cProfile per phase (each task, then the export), saved as
+  pstats files (snakeviz, gprof2dot, flameprof) plus a text top list
+- ``memory``: tracemalloc top allocations grown during each phase, and the peak
+- ``sample``: a wall-clock sampler over every thread, so time spent blocked on
+  network calls or sleeping in rate limits shows up too, written as collapsed
+  stacks (flamegraph.pl, speedscope, inferno)
+
+``all`` enables everything. Output goes into the run's output folder.
+"""
+import cProfile
+import io
+import os
+import pstats
+import re
+import sys
+import threading
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from horizon.utils.events import events
+
+PROFILE_MODES = ("cprofile", "memory", "sample")
+SAMPLE_INTERVAL_S = 0.01
+TOP_ENTRIES = 30
+
+
+def parse_modes(value: Optional[str]) -> List[str]:
+    """Profiling modes named in `value` ("all" selects every mode)"""
+    names = [name.strip().lower() for name in (value or "").split(",") if name.strip()]
+    if "all" in names:
+        return list(PROFILE_MODES)
+    unknown = [name for name in names if name not in PROFILE_MODES]
+    if unknown:
+        raise ValueError(f"Unknown profiling mode(s) {', '.join(unknown)}, expected {', '.join(PROFILE_MODES)} or all")
+    return names
+
+
+def _snapshot() -> tracemalloc.Snapshot:
+    """Allocation snapshot without the profilers' own bookkeeping"""
+    return tracemalloc.take_snapshot().filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, cProfile.__file__),
+        tracemalloc.Filter(False, __file__),
+    ])
+
+
+def _safe_name(phase: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", phase)
+
+
+class WallClockSampler:
+    """Samples the stacks of every thread at a fixed interval into collapsed-stack counts"""
+
+    def __init__(self, interval: float = SAMPLE_INTERVAL_S):
+        self.interval = interval
+        self.counts: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._loop, name="horizon-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    def _loop(self) -> None:
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                stack.append(names.get(thread_id, f"thread-{thread_id}"))
+                self.counts[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def write_collapsed(self, path: Path) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.counts.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class RunProfiler:
+    """Per-run profiling session; every hook is a no-op unless a mode is enabled"""
+
+    def __init__(self):
+        self.modes: List[str] = []
+        self.output_dir: Optional[Path] = None
+        self._lock = threading.Lock()
+        self._active_phase: Optional[str] = None
+        self._stats: Dict[str, pstats.Stats] = {}
+        self._memory: List[str] = []
+        self._sampler: Optional[WallClockSampler] = None
+        self._started_tracemalloc = False
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.modes)
+
+    def start(self, output_dir: str, modes: Optional[List[str]] = None) -> None:
+        """Begin profiling a run; modes default to HORIZON_PROFILE"""
+        self.modes = parse_modes(os.getenv("HORIZON_PROFILE")) if modes is None else modes
+        self.output_dir = Path(output_dir)
+        self._stats = {}
+        self._memory = []
+        if not self.modes:
+            return
+        events.log(f"🔬 Profiling run ({', '.join(self.modes)}) into {self.output_dir}", modes=self.modes)
+        if "memory" in self.modes and not tracemalloc.is_tracing():
+            tracemalloc.start(25)
+            self._started_tracemalloc = True
+        if "sample" in self.modes:
+            self._sampler = WallClockSampler()
+            self._sampler.start()
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Profile one phase; phases nested in a profiled phase are folded into it"""
+        with self._lock:
+            nested = not self.enabled or self._active_phase is not None
+            if not nested:
+                self._active_phase = name
+        if nested:
+            yield
+            return
+
+        profile = cProfile.Profile() if "cprofile" in self.modes else None
+        before = _snapshot() if "memory" in self.modes else None
+        if profile:
+            profile.enable()
+        try:
+            yield
+        finally:
+            if profile:
+                profile.disable()
+                self._add_stats(name, profile)
+            if before is not None:
+                self._add_memory(name, before)
+            with self._lock:
+                self._active_phase = None
+
+    def _add_stats(self, name: str, profile: cProfile.Profile) -> None:
+        if name in self._stats:
+            self._stats[name].add(profile)
+        else:
+            self._stats[name] = pstats.Stats(profile)
+
+    def _add_memory(self, name: str, before: tracemalloc.Snapshot) -> None:
+        after = _snapshot()
+        lines = [f"## {name}", ""]
+        for stat in after.compare_to(before, "lineno")[:TOP_ENTRIES]:
+            if stat.size_diff > 0:
+                lines.append(f"{stat.size_diff / 1024:10.1f} KiB  {stat.count_diff:+8d} blocks  {stat.traceback}")
+        current, peak = tracemalloc.get_traced_memory()
+        lines += ["", f"Traced after phase: {current / 2**20:.1f} MiB (peak so far {peak / 2**20:.1f} MiB)", ""]
+        self._memory.extend(lines)
+
+    def stop(self) -> List[str]:
+        """Stop profiling and write the reports; returns the files written"""
+        if not self.enabled:
+            return []
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        written = []
+
+        for name, stats in self._stats.items():
+            path = self.output_dir / f"profile_{_safe_name(name)}.prof"
+            stats.dump_stats(str(path))
+            text = io.StringIO()
+            pstats.Stats(str(path), stream=text).sort_stats("cumulative").print_stats(TOP_ENTRIES)
+            (self.output_dir / f"profile_{_safe_name(name)}.txt").write_text(text.getvalue(), encoding="utf-8")
+            written.append(str(path))
+
+        if self._memory:
+            path = self.output_dir / "profile_memory.txt"
+            path.write_text("\n".join(self._memory), encoding="utf-8")
+            written.append(str(path))
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+        if self._sampler:
+            self._sampler.stop()
+            path = self.output_dir / "profile_wall.collapsed"
+            self._sampler.write_collapsed(path)
+            written.append(f"{path} ({self._sampler.samples} samples)")
+            self._sampler = None
+
+        self.modes = []
+        return written
+
+
+profiler = RunProfiler()
@@ -0,0 +1,197 @@
+#!/usr/bin/env python
+"""
+Local stand-in for the Resend email API, for offline delivery load tests.
+
+Accepts POST /emails and POST /emails/batch like the real API (bearer auth,
+Idempotency-Key replays, at most 100 emails per batch), keeps what it
+receives in memory and can inject latency, 5xx failures and 429 rate
+limiting:
+
+    resend_standin --port 8025 --failure-rate 0.05 --rate-limit 10
+    HORIZON_RESEND_API_URL=http://127.0.0.1:8025 run_crew
+
+    resend_standin --load-test 10000    # deliver to 10k fake recipients and report
+"""
+import argparse
+import itertools
+import json
+import random
+import sys
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+from horizon.utils.delivery import MAX_BATCH_SIZE
+
+
+class ResendStandIn:
+    """In-process fake Resend API served on a background thread"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, failure_rate: float = 0.0,
+                 rate_limit: float = 0.0, latency: float = 0.0, seed: Optional[int] = None):
+        self.failure_rate = failure_rate
+        self.rate_limit = rate_limit
+        self.latency = latency
+        self.emails: List[Dict[str, Any]] = []
+        self.stats = {"requests": 0, "accepted": 0, "failed": 0, "rate_limited": 0, "replayed": 0}
+        self._random = random.Random(seed)
+        self._ids = itertools.count(1)
+        self._idempotent: Dict[str, Tuple[int, Dict[str, Any]]] = {}
+        self._recent = deque()
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "ResendStandIn":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="resend-standin", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "ResendStandIn":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def handle(self, path: str, headers: Dict[str, str], body: bytes) -> Tuple[int, Dict[str, Any], Dict[str, str]]:
+        """Answer one request: (status, JSON body, extra headers)"""
+        with self._lock:
+            self.stats["requests"] += 1
+        if not headers.get("Authorization", "").startswith("Bearer "):
+            return 401, {"name": "missing_api_key", "message": "Missing API key"}, {}
+        if path not in ("/emails", "/emails/batch"):
+            return 404, {"name": "not_found", "message": path}, {}
+
+        key = headers.get("Idempotency-Key")
+        with self._lock:
+            if key and key in self._idempotent:
+                self.stats["replayed"] += 1
+                status, response = self._idempotent[key]
+                return status, response, {}
+            if self.rate_limit > 0:
+                now = time.monotonic()
+                while self._recent and now - self._recent[0] > 1.0:
+                    self._recent.popleft()
+                if len(self._recent) >= self.rate_limit:
+                    self.stats["rate_limited"] += 1
+                    return 429, {"name": "rate_limit_exceeded", "message": "Too many requests"}, {"Retry-After": "1"}
+                self._recent.append(now)
+            failed = self._random.random() < self.failure_rate
+
+        if self.latency:
+            time.sleep(self.latency)
+        if failed:
+            with self._lock:
+                self.stats["failed"] += 1
+            return 500, {"name": "internal_server_error", "message": "Injected failure"}, {}
+
+        try:
+            payload = json.loads(body or b"null")
+        except ValueError:
+            return 400, {"name": "validation_error", "message": "Invalid JSON"}, {}
+        emails = payload if path == "/emails/batch" else [payload]
+        if not isinstance(emails, list) or not emails or len(emails) > MAX_BATCH_SIZE:
+            return 422, {"name": "validation_error", "message": f"Send 1 to {MAX_BATCH_SIZE} emails"}, {}
+        if not all(isinstance(email, dict) and email.get("to") and email.get("from") for email in emails):
+            return 422, {"name": "validation_error", "message": "Every email needs from and to"}, {}
+        if path == "/emails/batch" and any(email.get("attachments") for email in emails):
+            return 422, {"name": "validation_error", "message": "Attachments are not supported in batch emails"}, {}
+
+        with self._lock:
+            ids = [f"standin-{next(self._ids)}" for _ in emails]
+            self.emails.extend(dict(email, id=email_id) for email, email_id in zip(emails, ids))
+            self.stats["accepted"] += len(emails)
+            response = {"data": [{"id": email_id} for email_id in ids]} if path == "/emails/batch" else {"id": ids[0]}
+            if key:
+                self._idempotent[key] = (200, response)
+        return 200, response, {}
+
+    def _handler_class(self):
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                status, response, extra = standin.handle(self.path, dict(self.headers), body)
+                data = json.dumps(response).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in extra.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def load_test(recipients: int, standin: ResendStandIn, concurrency: Optional[int] = None,
+              rate_per_second: float = 0.0) -> Dict[str, Any]:
+    """Deliver a sample newsletter to `recipients` fake addresses through the stand-in"""
+    from horizon.utils.delivery import NewsletterDelivery, ResendClient
+
+    client = ResendClient("re_standin", base_url=standin.url)
+    delivery = NewsletterDelivery(client, concurrency=concurrency, rate_per_second=rate_per_second,
+                                  backoff_seconds=0.05, max_backoff_seconds=1.0)
+    message = {"from": "noreply@example.com", "subject": "Horizon load test",
+               "html": "<p>Hello</p>" * 200, "text": "Hello\n" * 200}
+    try:
+        report = delivery.deliver(message, [f"user{i}@example.com" for i in range(recipients)])
+    finally:
+        client.close()
+    report.pop("status")
+    report["emails_per_second"] = round(report["sent"] / report["duration_s"], 1) if report["duration_s"] else None
+    report["server"] = dict(standin.stats)
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Local stand-in for the Resend email API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8025)
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="fraction of requests answered with a 500")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="requests per second before answering 429")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every request")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--load-test", type=int, metavar="RECIPIENTS",
+                        help="deliver a sample newsletter to this many fake recipients, print a report and exit")
+    parser.add_argument("--concurrency", type=int, default=None, help="sending threads for --load-test")
+    parser.add_argument("--send-rate", type=float, default=0.0,
+                        help="client-side batch requests per second for --load-test (0 = unlimited)")
+    args = parser.parse_args(sys.argv[1:] if argv is None else argv)
+
+    standin = ResendStandIn(args.host, 0 if args.load_test else args.port, failure_rate=args.failure_rate,
+                            rate_limit=args.rate_limit, latency=args.latency, seed=args.seed)
+    if args.load_test:
+        with standin:
+            print(json.dumps(load_test(args.load_test, standin, args.concurrency, args.send_rate), indent=2))
+        return
+
+    print(f"📮 Resend stand-in listening on {standin.url} (set HORIZON_RESEND_API_URL to use it)")
+    try:
+        standin._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        standin._server.server_close()
+
+
+if __name__ == "__main__":
+    main()
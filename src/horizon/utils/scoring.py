@@ -0,0 +1,275 @@
+"""
+Local, vectorized startup scoring driven by Config.SCORING_WEIGHTS.
+
+Each startup is turned into one row of a feature matrix with one column per
+scoring criterion (1-10 scale, like the validation task). Scores for the whole
+database are a single matrix-vector product, so re-ranking after a weight
+change needs no LLM call. Rows are keyed by record hash and persisted next to
+the database, so only new or changed startups are re-featurized.
+"""
+import heapq
+import re
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from horizon.config import Config
+from horizon.utils.changeset import startup_key
+from horizon.utils.database import record_hash
+from horizon.utils.export import FIELD_ALIASES
+
+CRITERIA = list(Config.SCORING_WEIGHTS)
+MIN_SCORE, MAX_SCORE = 1.0, 10.0
+
+INNOVATION_TERMS = ("generative", "llm", "large language", "foundation model", "transformer", "deep learning",
+                    "computer vision", "natural language", "reinforcement", "robotics", "autonomous", "proprietary")
+ALIGNMENT_TERMS = ("gpu", "cuda", "nvidia", "computer vision", "generative", "deep learning", "llm", "training",
+                   "inference", "robotics", "autonomous", "simulation", "edge", "video")
+LARGE_MARKETS = ("fintech", "healthtech", "health", "retail", "logistics", "agtech", "agro", "security",
+                 "enterprise", "insurance", "energy", "education", "edtech")
+TEAM_TERMS = ("ceo", "cto", "founder", "co-founder", "phd", "ex-", "former", "team")
+ROUND_SCORES = {"pre-seed": 3.0, "seed": 4.0, "series a": 6.0, "series b": 7.5, "series c": 8.5,
+                "series d": 9.0, "ipo": 10.0}
+AMOUNT_PATTERN = re.compile(r"\$\s?(\d+(?:\.\d+)?)\s*(m|million|b|billion|k|thousand)?", re.IGNORECASE)
+
+
+def _text(record: Dict[str, Any], *fields: str) -> str:
+    return " ".join(str(record.get(field) or "") for field in fields).lower()
+
+
+def _hits(text: str, terms: Iterable[str]) -> int:
+    return sum(1 for term in terms if term in text)
+
+
+def _clip(value: float) -> float:
+    return float(min(MAX_SCORE, max(MIN_SCORE, value)))
+
+
+def _raised_millions(text: str) -> float:
+    """Largest amount mentioned in `text`, in millions of dollars"""
+    largest = 0.0
+    for amount, unit in AMOUNT_PATTERN.findall(text):
+        value = float(amount)
+        unit = unit.lower()
+        if unit in ("b", "billion"):
+            value *= 1000
+        elif unit in ("k", "thousand"):
+            value /= 1000
+        largest = max(largest, value)
+    return largest
+
+
+def heuristic_features(record: Dict[str, Any]) -> Dict[str, float]:
+    """Estimate each criterion from the stored attributes of a startup"""
+    tech = _text(record, "technology", "description")
+    market = _text(record, "market", "description")
+    milestones = _text(record, "milestones", "funding", "total_raised", "last_round")
+    everything = _text(record, *record.keys())
+
+    rounds = [score for round_name, score in ROUND_SCORES.items() if round_name in milestones]
+    raised = _raised_millions(milestones)
+    funding = max(rounds + [2.0]) + min(2.0, raised / 25)
+
+    founded = str(record.get("founded") or "")
+    age = datetime.now().year - int(founded[:4]) if founded[:4].isdigit() else 0
+    traction = 2.0 + min(3.0, age / 2) + min(3.0, milestones.count(",") + (1 if milestones else 0)) \
+        + (1.0 if record.get("website") else 0.0) + min(1.0, raised / 10)
+
+    return {
+        "technology_innovation": _clip(3.0 + 1.5 * _hits(tech, INNOVATION_TERMS)),
+        "market_potential": _clip(3.0 + 2.0 * _hits(market, LARGE_MARKETS) + (1.0 if record.get("market") else 0.0)),
+        "team_strength": _clip(3.0 + 1.0 * _hits(everything, TEAM_TERMS)),
+        "funding_attractiveness": _clip(funding),
+        "nvidia_alignment": _clip(2.0 + 1.5 * _hits(tech, ALIGNMENT_TERMS)),
+        "traction": _clip(traction),
+    }
+
+
+def feature_vector(record: Dict[str, Any]) -> List[float]:
+    """Criterion scores in CRITERIA order; LLM scores stored on the record win over heuristics"""
+    estimated = None
+    vector = []
+    for criterion in CRITERIA:
+        value = record.get(criterion)
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            vector.append(_clip(value))
+            continue
+        if estimated is None:
+            estimated = heuristic_features(record)
+        vector.append(estimated[criterion])
+    return vector
+
+
+def weight_vector(weights: Optional[Dict[str, float]] = None) -> np.ndarray:
+    """Weights in CRITERIA order, normalized to sum to 1 (missing criteria weigh 0)"""
+    weights = weights or Config.SCORING_WEIGHTS
+    unknown = set(weights) - set(CRITERIA)
+    if unknown:
+        raise ValueError(f"Unknown scoring criteria: {', '.join(sorted(unknown))}")
+    vector = np.array([float(weights.get(criterion, 0.0)) for criterion in CRITERIA], dtype=np.float64)
+    total = vector.sum()
+    if total <= 0:
+        raise ValueError("Scoring weights must sum to a positive value")
+    return vector / total
+
+
+def rank_startups(startups: List[Dict[str, Any]], limit: int,
+                  scores: Optional[Dict[str, float]] = None) -> List[int]:
+    """Indices of the `limit` best startups, best first: by stored score, else by local score.
+
+    `scores` memoizes scores by startup name, for startups repeated across sections.
+    """
+    if limit <= 0:
+        return []
+    if len(startups) <= 1:
+        return list(range(len(startups)))
+    weights = weight_vector().tolist()
+    scores = {} if scores is None else scores
+
+    def score(index: int) -> Tuple[float, int]:
+        key = startup_key(startups[index])
+        value = scores.get(key) if key else None
+        if value is None:
+            value = startups[index].get("score")
+            if not isinstance(value, (int, float)) or isinstance(value, bool):
+                record = {FIELD_ALIASES.get(field, field): item for field, item in startups[index].items()}
+                value = sum(w * f for w, f in zip(weights, feature_vector(record)))
+            if key:
+                scores[key] = value
+        return value, -index
+
+    return heapq.nlargest(limit, range(len(startups)), key=score)
+
+
+def _record_key(record: Dict[str, Any]) -> str:
+    return str(record.get("name", "")).lower().strip()
+
+
+class ScoringEngine:
+    """Feature matrix and weighted scores for a set of startups, updated incrementally"""
+
+    def __init__(self, cache_path: Optional[Path] = None, weights: Optional[Dict[str, float]] = None):
+        self.cache_path = Path(cache_path) if cache_path else None
+        self.weights = weight_vector(weights)
+        self.keys: List[str] = []
+        self.hashes: List[str] = []
+        self.features = np.empty((0, len(CRITERIA)), dtype=np.float32)
+        self.scores = np.empty(0, dtype=np.float64)
+        self._index: Dict[str, int] = {}
+        # Keys re-scored and dropped by the last update()
+        self.changed_keys: List[str] = []
+        self.removed_keys: List[str] = []
+        if self.cache_path and self.cache_path.exists():
+            self._load()
+
+    def _load(self) -> None:
+        try:
+            with np.load(self.cache_path, allow_pickle=False) as cached:
+                if list(cached["criteria"]) != CRITERIA:
+                    return
+                self.keys = list(cached["keys"])
+                self.hashes = list(cached["hashes"])
+                self.features = cached["features"].astype(np.float32)
+        except (OSError, KeyError, ValueError):
+            return
+        self._index = {key: row for row, key in enumerate(self.keys)}
+        self.scores = self.features @ self.weights
+
+    def save(self) -> None:
+        """Persist keys, record hashes and features next to the database"""
+        if not self.cache_path:
+            return
+        tmp_path = self.cache_path.with_name(self.cache_path.name + ".tmp.npz")
+        np.savez(tmp_path, criteria=np.array(CRITERIA), keys=np.array(self.keys, dtype=str),
+                 hashes=np.array(self.hashes, dtype=str), features=self.features)
+        tmp_path.replace(self.cache_path)
+
+    def update(self, records: List[Dict[str, Any]]) -> int:
+        """Sync the matrix with `records`; only new or changed rows are featurized and re-scored.
+
+        Returns the number of re-scored rows. Rows whose startup is no longer in
+        `records` are dropped.
+        """
+        present = set()
+        changed_rows: List[int] = []
+        new_keys: List[str] = []
+        new_hashes: List[str] = []
+        new_features: List[List[float]] = []
+
+        for record in records:
+            key = _record_key(record)
+            if not key or key in present:
+                continue
+            present.add(key)
+            digest = record_hash(record)
+            row = self._index.get(key)
+            if row is None:
+                new_keys.append(key)
+                new_hashes.append(digest)
+                new_features.append(feature_vector(record))
+            elif self.hashes[row] != digest:
+                self.hashes[row] = digest
+                self.features[row] = feature_vector(record)
+                changed_rows.append(row)
+
+        self.changed_keys = [self.keys[row] for row in changed_rows] + new_keys
+        self.removed_keys = []
+        if len(present) - len(new_keys) < len(self.keys):
+            self.removed_keys = [key for key in self.keys if key not in present]
+            self._drop([row for row, key in enumerate(self.keys) if key not in present])
+            changed_rows = []  # row numbers shifted; rescore everything below
+
+        if new_keys:
+            start = len(self.keys)
+            self.keys.extend(new_keys)
+            self.hashes.extend(new_hashes)
+            self.features = np.vstack([self.features, np.asarray(new_features, dtype=np.float32)])
+            self._index.update({key: start + i for i, key in enumerate(new_keys)})
+            self.scores = np.concatenate([self.scores, self.features[start:] @ self.weights])
+
+        if changed_rows:
+            rows = np.asarray(changed_rows)
+            self.scores[rows] = self.features[rows] @ self.weights
+        elif len(self.scores) != len(self.keys):
+            self.scores = self.features @ self.weights
+
+        return len(new_keys) + len(changed_rows)
+
+    def _drop(self, rows: List[int]) -> None:
+        keep = np.ones(len(self.keys), dtype=bool)
+        keep[rows] = False
+        self.keys = [key for key, kept in zip(self.keys, keep) if kept]
+        self.hashes = [digest for digest, kept in zip(self.hashes, keep) if kept]
+        self.features = self.features[keep]
+        self.scores = np.empty(0, dtype=np.float64)
+        self._index = {key: row for row, key in enumerate(self.keys)}
+
+    def set_weights(self, weights: Dict[str, float]) -> None:
+        """Change the weights and re-score every row in one pass"""
+        self.weights = weight_vector(weights)
+        self.scores = self.features @ self.weights
+
+    def what_if(self, weights: Dict[str, float]) -> np.ndarray:
+        """Scores under alternative weights, without changing the engine"""
+        return self.features @ weight_vector(weights)
+
+    def score_of(self, name: str) -> Optional[float]:
+        row = self._index.get(name.lower().strip())
+        return None if row is None else round(float(self.scores[row]), 2)
+
+    def ranking(self, limit: Optional[int] = None, scores: Optional[np.ndarray] = None) -> List[Tuple[str, float]]:
+        """(key, score) pairs, best first; `scores` ranks a what-if vector instead"""
+        scores = self.scores if scores is None else scores
+        if limit is not None and limit < len(scores):
+            top = np.argpartition(-scores, limit)[:limit]
+            order = top[np.argsort(-scores[top], kind="stable")]
+        else:
+            order = np.argsort(-scores, kind="stable")
+        return [(self.keys[row], round(float(scores[row]), 2)) for row in order]
+
+    def breakdown(self, name: str) -> Dict[str, float]:
+        """Criterion scores of one startup"""
+        row = self._index[name.lower().strip()]
+        return {criterion: round(float(value), 2) for criterion, value in zip(CRITERIA, self.features[row])}
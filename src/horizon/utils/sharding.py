@@ -0,0 +1,86 @@
+"""Helpers for map-style (sharded) execution of per-startup tasks."""
+import json
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+_CODE_FENCE = re.compile(r"```(?:json)?\s*(.*?)```", re.DOTALL)
+
+
+def make_shards(items: List[Any], shard_size: int) -> List[List[Any]]:
+    """Split items into consecutive shards of at most `shard_size` entries"""
+    shard_size = max(1, int(shard_size))
+    return [items[i:i + shard_size] for i in range(0, len(items), shard_size)]
+
+
+def run_shards(shards: List[List[Any]], worker: Callable[[List[Any]], Any],
+               max_workers: int) -> Tuple[List[Tuple[int, Any]], List[Dict[str, Any]]]:
+    """Run `worker` over every shard on a thread pool.
+
+    Returns the successful results as (shard index, result) pairs in shard order,
+    and one failure record per shard that raised, so a bad shard never fails the batch.
+    """
+    results: List[Tuple[int, Any]] = []
+    failures: List[Dict[str, Any]] = []
+
+    with ThreadPoolExecutor(max_workers=max(1, int(max_workers))) as executor:
+        futures = {executor.submit(worker, shard): index for index, shard in enumerate(shards)}
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                results.append((index, future.result()))
+            except Exception as e:
+                failures.append({
+                    "shard": index,
+                    "startups": [record_name(record) for record in shards[index]],
+                    "error": str(e),
+                })
+
+    results.sort(key=lambda item: item[0])
+    failures.sort(key=lambda item: item["shard"])
+    return results, failures
+
+
+def parse_json_output(raw: Optional[str]) -> Any:
+    """Parse a task's raw output as JSON, tolerating markdown code fences and prose around it"""
+    if not raw:
+        return None
+    candidates = [raw.strip()] + [match.strip() for match in _CODE_FENCE.findall(raw)]
+    for opening, closing in (("[", "]"), ("{", "}")):
+        start, end = raw.find(opening), raw.rfind(closing)
+        if start != -1 and end > start:
+            candidates.append(raw[start:end + 1])
+
+    for candidate in candidates:
+        try:
+            return json.loads(candidate)
+        except (json.JSONDecodeError, ValueError):
+            continue
+    return None
+
+
+def records_from_output(raw: Optional[str]) -> List[Dict[str, Any]]:
+    """Extract the list of startup records from a task's raw output"""
+    parsed = parse_json_output(raw)
+    if isinstance(parsed, dict):
+        parsed = parsed.get("startups", parsed.get("results"))
+    if isinstance(parsed, list):
+        return [record for record in parsed if isinstance(record, dict)]
+    return []
+
+
+def record_name(record: Dict[str, Any]) -> str:
+    """Return the startup name of a record, whichever naming convention it uses"""
+    if not isinstance(record, dict):
+        return str(record)
+    return str(record.get("name") or record.get("Company Name") or "unknown")
+
+
+def records_for_shard(raw: Optional[str], shard: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Turn one shard's output into records, keeping free-text answers attached to their startups"""
+    records = records_from_output(raw)
+    if records:
+        return records
+    if len(shard) == 1:
+        return [{"name": record_name(shard[0]), "analysis": raw or ""}]
+    return [{"startups": [record_name(record) for record in shard], "analysis": raw or ""}]
@@ -0,0 +1,348 @@
+"""
+On-disk similarity index over startup descriptions.
+
+Each startup's description, technology and market are turned into a hashed
+TF-IDF vector (words and word pairs hashed into a fixed number of signed
+dimensions, so there is no vocabulary to maintain) and stored L2-normalized in
+a memory-mapped float32 matrix next to the database. Next to it sits a SimHash
+sketch per row (the signs of random projections, packed into bits). A "similar
+to X" query ranks every row by Hamming distance between sketches, which is a
+few bytes per row, then re-ranks the closest thousand by exact cosine
+similarity. Rows are keyed by name and synced from StartupDB writes, so only
+new or changed startups are re-vectorized. IDF weights are a snapshot: when the
+database has doubled since the last one, every row is re-weighted in place.
+"""
+import hashlib
+import json
+import os
+import re
+import zlib
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+TEXT_FIELDS = ("description", "technology", "market")
+TOKEN_PATTERN = re.compile(r"[a-z0-9à-ÿ]{2,}")
+STOPWORDS = frozenset(
+    "the and for with that this from are its their our into using based platform company startup "
+    "de da do das dos em para com que uma um por os as no na nos nas ao se of to in on by an is it "
+    "el la los las del en con para una por y".split()
+)
+SEED = 20240601
+# Rows re-ranked by exact cosine per query, at least this many (and 20 per result wanted)
+MIN_CANDIDATES = 1000
+_CHUNK = 8192
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def _record_key(record: Dict[str, Any]) -> str:
+    return str(record.get("name", "")).lower().strip()
+
+
+def record_text(record: Dict[str, Any]) -> str:
+    return " ".join(str(record.get(field) or "") for field in TEXT_FIELDS).lower()
+
+
+def text_hash(text: str) -> str:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=12).hexdigest()
+
+
+def tokens(text: str) -> List[str]:
+    """Words and adjacent word pairs of `text`, stopwords dropped"""
+    words = [word for word in TOKEN_PATTERN.findall(text) if word not in STOPWORDS]
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+def term_matrix(texts: List[str], dimensions: int) -> np.ndarray:
+    """Sublinear term frequencies of each text hashed into `dimensions` signed buckets, one row per text"""
+    rows: List[int] = []
+    hashes: List[int] = []
+    counts: List[int] = []
+    for row, text in enumerate(texts):
+        for token, count in Counter(tokens(text)).items():
+            rows.append(row)
+            hashes.append(zlib.crc32(token.encode("utf-8")))
+            counts.append(count)
+    # One bincount for the whole batch; per-text NumPy calls would cost more than the hashing
+    buckets = np.array(hashes, dtype=np.int64)
+    weights = 1.0 + np.log(np.array(counts, dtype=np.float64))
+    weights[(buckets & 0x80000000) == 0] *= -1.0
+    cells = np.array(rows, dtype=np.int64) * dimensions + buckets % dimensions
+    return np.bincount(cells, weights=weights, minlength=len(texts) * dimensions) \
+        .reshape(len(texts), dimensions).astype(np.float32)
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    """Rows (or a single vector) scaled to unit length; all-zero ones stay zero"""
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms > 0, norms, 1.0)
+
+
+def hamming(sketches: np.ndarray, sketch: np.ndarray) -> np.ndarray:
+    """Bit differences between each packed row of `sketches` and `sketch`"""
+    if sketches.shape[1] % 8 == 0:
+        sketches, sketch = sketches.view(np.uint64), sketch.view(np.uint64)
+    differences = np.bitwise_xor(sketches, sketch)
+    if hasattr(np, "bitwise_count"):  # NumPy 2
+        counts = np.bitwise_count(differences)
+    else:
+        counts = _POPCOUNT[differences.view(np.uint8)]
+    # Column by column: a row-wise sum() over so few columns is several times slower
+    total = counts[:, 0].astype(np.uint16)
+    for column in range(1, counts.shape[1]):
+        total += counts[:, column]
+    return total
+
+
+class SimilarityIndex:
+    """Hashed TF-IDF vectors and SimHash sketches of startups in memory-mapped files"""
+
+    def __init__(self, path: Path, dimensions: int = 512, bits: int = 256):
+        self.path = Path(path)
+        self.dimensions = dimensions
+        self.bits = bits
+        self.keys: List[str] = []
+        self.hashes: List[str] = []
+        self.capacity = 0
+        # Document frequency of every bucket, and the IDF snapshot the stored rows are weighted with
+        self.doc_freq = np.zeros(dimensions, dtype=np.int64)
+        self.idf = np.ones(dimensions, dtype=np.float32)
+        self.idf_docs = 0
+        self._index: Dict[str, int] = {}
+        self._planes = np.random.default_rng(SEED).standard_normal((dimensions, bits)).astype(np.float32)
+        self.vectors: Optional[np.memmap] = None
+        self.sketches: Optional[np.memmap] = None
+        self._load()
+
+    @property
+    def _meta_path(self) -> Path:
+        return self.path / "meta.json"
+
+    def _load(self) -> None:
+        try:
+            with open(self._meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            if (meta["dimensions"], meta["bits"]) != (self.dimensions, self.bits):
+                return
+            with np.load(self.path / "weights.npz", allow_pickle=False) as weights:
+                doc_freq, idf = weights["doc_freq"], weights["idf"]
+            self.capacity = meta["capacity"]
+            self._open(self.capacity)
+        except (OSError, KeyError, ValueError):
+            self.capacity = 0
+            return
+        self.keys = meta["keys"]
+        self.hashes = meta["hashes"]
+        self.idf_docs = meta["idf_docs"]
+        self.doc_freq = doc_freq.astype(np.int64)
+        self.idf = idf.astype(np.float32)
+        self._index = {key: row for row, key in enumerate(self.keys)}
+
+    def _open(self, capacity: int) -> None:
+        """Map the vector and sketch files, growing them to `capacity` rows"""
+        self.path.mkdir(parents=True, exist_ok=True)
+        for name, row_bytes in (("vectors.f32", self.dimensions * 4), ("sketches.u8", self.bits // 8)):
+            file_path = self.path / name
+            with open(file_path, "ab") as f:
+                if f.tell() < capacity * row_bytes:
+                    f.truncate(capacity * row_bytes)
+        self.vectors = np.memmap(self.path / "vectors.f32", dtype=np.float32, mode="r+",
+                                 shape=(capacity, self.dimensions))
+        self.sketches = np.memmap(self.path / "sketches.u8", dtype=np.uint8, mode="r+",
+                                  shape=(capacity, self.bits // 8))
+
+    def _reserve(self, rows: int) -> None:
+        if rows <= self.capacity:
+            return
+        capacity = max(1024, self.capacity)
+        while capacity < rows:
+            capacity *= 2
+        self._close_maps()
+        self._open(capacity)
+        self.capacity = capacity
+
+    def _close_maps(self) -> None:
+        if self.vectors is not None:
+            self.vectors.flush()
+            self.sketches.flush()
+        self.vectors = self.sketches = None
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._index
+
+    def save(self) -> None:
+        """Flush the maps, then commit keys and weights (rows past len(self) are ignored on load)"""
+        if self.vectors is None:
+            return
+        self.vectors.flush()
+        self.sketches.flush()
+        tmp_weights = self.path / "weights.tmp.npz"
+        np.savez(tmp_weights, doc_freq=self.doc_freq, idf=self.idf)
+        os.replace(tmp_weights, self.path / "weights.npz")
+        meta = {"dimensions": self.dimensions, "bits": self.bits, "capacity": self.capacity,
+                "idf_docs": self.idf_docs, "keys": self.keys, "hashes": self.hashes}
+        tmp_meta = self._meta_path.with_suffix(".json.tmp")
+        with open(tmp_meta, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp_meta, self._meta_path)
+
+    def update(self, records: Iterable[Dict[str, Any]], removed_keys: Iterable[str] = ()) -> int:
+        """Add or re-vectorize `records` whose text changed and drop `removed_keys`; returns rows written"""
+        written = 0
+        for key in removed_keys:
+            if key in self._index:
+                self._remove(key)
+                written += 1
+        pending: List[Tuple[str, str, str]] = []
+        seen = set()
+        for record in records:
+            key = _record_key(record)
+            if not key or key in seen:
+                continue
+            seen.add(key)
+            text = record_text(record)
+            digest = text_hash(text)
+            row = self._index.get(key)
+            if row is not None and self.hashes[row] == digest:
+                continue
+            pending.append((key, digest, text))
+            if len(pending) == _CHUNK:
+                written += self._write(pending)
+                pending = []
+        if pending:
+            written += self._write(pending)
+        if written and len(self.keys) >= 2 * self.idf_docs:
+            self._reweight()
+        return written
+
+    def sync(self, records: List[Dict[str, Any]]) -> int:
+        """Make the index hold exactly `records`"""
+        present = {_record_key(record) for record in records}
+        return self.update(records, [key for key in self.keys if key not in present])
+
+    def _write(self, pending: List[Tuple[str, str, str]]) -> int:
+        """Vectorize and store one chunk of (key, hash, text), updating document frequencies in bulk"""
+        new_rows = sum(1 for key, _, _ in pending if key not in self._index)
+        self._reserve(len(self.keys) + new_rows)
+        existing = [self._index[key] for key, _, _ in pending if key in self._index]
+        if existing:
+            self.doc_freq -= np.count_nonzero(self.vectors[existing], axis=0)
+        rows = []
+        for key, digest, _ in pending:
+            row = self._index.get(key)
+            if row is None:
+                row = len(self.keys)
+                self.keys.append(key)
+                self.hashes.append(digest)
+                self._index[key] = row
+            else:
+                self.hashes[row] = digest
+            rows.append(row)
+        terms = term_matrix([text for _, _, text in pending], self.dimensions)
+        self.doc_freq += np.count_nonzero(terms, axis=0)
+        block = _normalize(terms * self.idf)
+        self.vectors[rows] = block
+        self.sketches[rows] = self._sketch(block)
+        return len(rows)
+
+    def _sketch(self, vectors: np.ndarray) -> np.ndarray:
+        return np.packbits(vectors @ self._planes > 0, axis=1)
+
+    def _remove(self, key: str) -> None:
+        """Move the last row into the removed one, keeping rows contiguous"""
+        row = self._index.pop(key)
+        self.doc_freq -= self.vectors[row] != 0
+        last = len(self.keys) - 1
+        if row != last:
+            self.vectors[row] = self.vectors[last]
+            self.sketches[row] = self.sketches[last]
+            self.keys[row] = self.keys[last]
+            self.hashes[row] = self.hashes[last]
+            self._index[self.keys[row]] = row
+        self.keys.pop()
+        self.hashes.pop()
+
+    def _reweight(self) -> None:
+        """Take a new IDF snapshot and re-weight every stored row with it"""
+        count = len(self.keys)
+        idf = (np.log((1.0 + count) / (1.0 + self.doc_freq)) + 1.0).astype(np.float32)
+        ratio = idf / self.idf
+        for start in range(0, count, _CHUNK):
+            block = _normalize(np.asarray(self.vectors[start:min(count, start + _CHUNK)]) * ratio)
+            self.vectors[start:start + len(block)] = block
+            self.sketches[start:start + len(block)] = self._sketch(block)
+        self.idf = idf
+        self.idf_docs = count
+
+    def query_vector(self, record: Dict[str, Any]) -> np.ndarray:
+        """Normalized vector of a record that may not be in the index"""
+        return _normalize(term_matrix([record_text(record)], self.dimensions)[0] * self.idf)
+
+    def nearest(self, query: np.ndarray, k: int = 10, exclude: Optional[str] = None) -> List[Tuple[str, float]]:
+        """(key, cosine similarity) of the `k` rows closest to a normalized `query`, best first"""
+        count = len(self.keys)
+        if not count or k <= 0 or not query.any():
+            return []
+        sketch = self._sketch(query[np.newaxis, :].astype(np.float32))[0]
+        distances = hamming(self.sketches[:count], sketch)
+        wanted = k + (1 if exclude else 0)
+        shortlist = max(MIN_CANDIDATES, 20 * wanted)
+        if shortlist < count:
+            candidates = np.sort(np.argpartition(distances, shortlist)[:shortlist])
+        else:
+            candidates = np.arange(count)
+        similarities = self.vectors[candidates] @ query
+        order = np.argsort(-similarities, kind="stable")
+        results = []
+        for position in order:
+            if similarities[position] <= 0:
+                break  # nothing in common
+            key = self.keys[candidates[position]]
+            if key == exclude:
+                continue
+            results.append((key, round(float(similarities[position]), 4)))
+            if len(results) == k:
+                break
+        return results
+
+    def similar_to(self, name: str, k: int = 10) -> List[Tuple[str, float]]:
+        """Startups closest to an indexed one"""
+        key = name.lower().strip()
+        row = self._index.get(key)
+        if row is None:
+            raise KeyError(name)
+        return self.nearest(np.asarray(self.vectors[row]), k, exclude=key)
+
+    def clusters(self, k: int, iterations: int = 10) -> Dict[int, List[str]]:
+        """Spherical k-means over every row; cluster id -> keys, largest cluster first"""
+        count = len(self.keys)
+        if not count:
+            return {}
+        k = min(k, count)
+        rng = np.random.default_rng(SEED)
+        centroids = np.asarray(self.vectors[np.sort(rng.choice(count, size=k, replace=False))])
+        labels = np.zeros(count, dtype=np.int64)
+        for _ in range(iterations):
+            sums = np.zeros((k, self.dimensions), dtype=np.float32)
+            for start in range(0, count, _CHUNK):
+                block = np.asarray(self.vectors[start:min(count, start + _CHUNK)])
+                assigned = np.argmax(block @ centroids.T, axis=1)
+                labels[start:start + len(block)] = assigned
+                sums += np.eye(k, dtype=np.float32)[assigned].T @ block
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            # Empty clusters keep their previous centroid
+            centroids = np.where(norms > 0, sums / np.where(norms > 0, norms, 1.0), centroids)
+        groups: Dict[int, List[str]] = {}
+        for row, label in enumerate(labels.tolist()):
+            groups.setdefault(label, []).append(self.keys[row])
+        ordered = sorted(groups.values(), key=len, reverse=True)
+        return {cluster: members for cluster, members in enumerate(ordered)}
+
+    def close(self) -> None:
+        self.save()
+        self._close_maps()
@@ -0,0 +1,80 @@
+"""Small precompiled template engine for the HTML and text reports.
+
+Templates are parsed once, at import, into a %-pattern and the names of its
+fields, and render by appending to a shared list that is joined a single time
+at the end, so building a report stays linear in its size (repeated ``+=`` is
+only linear while CPython can resize the string in place, which tracing and
+profiling defeat). Values are inserted verbatim: callers escape them with
+`escape_html` (or render markdown) first.
+"""
+import hashlib
+import re
+import string
+from operator import itemgetter
+from typing import Any, Dict, List, Tuple
+
+_FORMATTER = string.Formatter()
+
+# (pattern, replacement) pairs applied in order to escaped text
+MARKDOWN_RULES: Tuple[Tuple[re.Pattern, str], ...] = (
+    (re.compile(r"\*\*(.*?)\*\*"), r"<strong>\1</strong>"),
+    # *italic*, but not what was already processed as bold
+    (re.compile(r"(?<!\*)\*([^*]+)\*(?!\*)"), r"<em>\1</em>"),
+    (re.compile(r"\[([^\]]+)\]\(([^)]+)\)"), r'<a href="\2" style="color: #76b900;">\1</a>'),
+)
+
+
+def escape_html(value: Any) -> str:
+    """Escape &, <, >, " and ' for HTML text and attribute values"""
+    text = value if isinstance(value, str) else str(value)
+    # Each replace is one memchr-speed scan that hands the string back untouched when
+    # the character is absent; measured faster than str.translate or a regex callback
+    return (text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+            .replace('"', "&quot;").replace("'", "&#x27;"))
+
+
+def render_markdown(text: str) -> str:
+    """Apply the bold, italic and link rules to already-escaped text"""
+    if "*" not in text and "[" not in text:
+        return text
+    for pattern, replacement in MARKDOWN_RULES:
+        text = pattern.sub(replacement, text)
+    return text
+
+
+class Template:
+    """A `str.format`-style template (``{field}``, ``{{`` for a brace) compiled once"""
+
+    def __init__(self, source: str):
+        self.source = source
+        chunks: List[str] = []
+        fields: List[str] = []
+        for literal, field, _spec, _conversion in _FORMATTER.parse(source):
+            chunks.append(literal.replace("%", "%%"))
+            if field is not None:
+                chunks.append("%s")
+                fields.append(field)
+        # Rendering is a single C-level %-substitution of the values picked in field order
+        self._pattern = "".join(chunks)
+        self.fields = tuple(fields)
+        if not fields:
+            self._values = lambda values: ()
+        elif len(fields) == 1:
+            self._values = lambda values, field=fields[0]: (values[field],)
+        else:
+            self._values = itemgetter(*fields)
+
+    def render(self, values: Dict[str, str]) -> str:
+        return self._pattern % self._values(values)
+
+    def render_into(self, out: List[str], values: Dict[str, str]) -> None:
+        """Append the rendered template to `out`, to be joined once at the end"""
+        out.append(self._pattern % self._values(values))
+
+
+def fingerprint(*templates: "Template", extra: str = "") -> str:
+    """Short hash of template sources, for versioning caches of their output"""
+    digest = hashlib.blake2b(extra.encode("utf-8"), digest_size=8)
+    for template in templates:
+        digest.update(template.source.encode("utf-8"))
+    return digest.hexdigest()
@@ -0,0 +1,222 @@
+"""
+Local website validation: canonical URLs, liveness and TLS.
+
+Startup records hold websites as the LLM found them (`www.tarken.com.br`,
+`HTTPS://Tarken.com.br/?utm_source=x`, ...). `canonicalize_url` normalizes
+them, and `WebsiteChecker` checks a whole list concurrently on one asyncio
+event loop: a HEAD request (GET when HEAD isn't allowed) following redirects,
+recording the status, the final URL and whether the TLS certificate
+verifies. Results are cached on disk for WEBSITE_CHECK_TTL_HOURS, so a
+country's list validates in seconds without LLM turns or scrapes.
+"""
+import asyncio
+import json
+import os
+import re
+import ssl
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
+
+from horizon.config import Config
+
+MAX_REDIRECTS = 5
+TRACKING_PARAMS = re.compile(r"^(utm_\w+|gclid|fbclid|mc_cid|mc_eid|ref)$", re.IGNORECASE)
+HOST_PATTERN = re.compile(r"^[a-z0-9-]+(\.[a-z0-9-]+)+$")
+DEFAULT_PORTS = {"http": 80, "https": 443}
+# Some servers reject HEAD outright; these answers are retried with GET
+HEAD_REJECTED = (403, 405, 501)
+
+
+def canonicalize_url(raw: Any) -> Optional[str]:
+    """Normalized http(s) URL for a stored website value, or None when it isn't one"""
+    if not isinstance(raw, str):
+        return None
+    value = raw.strip().strip("<>\"'")
+    if not value or " " in value:
+        return None
+    if "://" not in value:
+        value = "https://" + value.lstrip("/")
+    parts = urlsplit(value)
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").rstrip(".")
+    # Userinfo is never part of a website: `mailto:a@b.com` would otherwise become https://b.com
+    if scheme not in DEFAULT_PORTS or "@" in parts.netloc or not HOST_PATTERN.match(host):
+        return None
+    try:
+        port = parts.port
+    except ValueError:  # out of range or not a number, e.g. a.com:99999
+        return None
+    netloc = host if port in (None, DEFAULT_PORTS[scheme]) else f"{host}:{port}"
+    path = re.sub(r"/{2,}", "/", parts.path)
+    query = urlencode([(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                       if not TRACKING_PARAMS.match(k)]) if parts.query else ""
+    # Bare hosts drop the root slash; one is needed before a query string
+    path = (path if path != "/" else "") if not query else (path or "/")
+    return urlunsplit((scheme, netloc, path, query, ""))
+
+
+def website_status(result: Dict[str, Any]) -> str:
+    """One-word summary of a check: live, redirected, dead or tls-invalid"""
+    if not result.get("alive"):
+        return "dead"
+    if result.get("tls_valid") is False:
+        return "tls-invalid"
+    if result.get("final_url") and result["final_url"].rstrip("/") != result["url"].rstrip("/"):
+        return "redirected"
+    return "live"
+
+
+class WebsiteChecker:
+    """Concurrent HEAD/GET checks of many websites, cached with a TTL"""
+
+    def __init__(self, cache_path: Optional[str] = None, concurrency: Optional[int] = None,
+                 timeout: Optional[float] = None, ttl_hours: Optional[float] = None):
+        self.cache_path = Path(cache_path or Config.WEBSITE_CHECK_CACHE)
+        self.concurrency = max(1, concurrency or Config.WEBSITE_CHECK_CONCURRENCY)
+        self.timeout = timeout or Config.HTTP_READ_TIMEOUT
+        self.ttl = 3600 * (Config.WEBSITE_CHECK_TTL_HOURS if ttl_hours is None else ttl_hours)
+        self.cache: Dict[str, Dict[str, Any]] = self._load()
+        self._verified = ssl.create_default_context()
+        self._unverified = ssl.create_default_context()
+        self._unverified.check_hostname = False
+        self._unverified.verify_mode = ssl.CERT_NONE
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save(self) -> None:
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        now = time.time()
+        fresh = {url: result for url, result in self.cache.items() if now - result["checked_at"] < self.ttl}
+        tmp_path = self.cache_path.with_suffix(self.cache_path.suffix + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(fresh, f, indent=2)
+        os.replace(tmp_path, self.cache_path)
+
+    def check(self, urls: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Check canonical `urls`, reusing results younger than the TTL; keyed by URL"""
+        urls = list(dict.fromkeys(urls))
+        now = time.time()
+        stale = [url for url in urls if url not in self.cache or now - self.cache[url]["checked_at"] >= self.ttl]
+        if stale:
+            for result in asyncio.run(self._check_all(stale)):
+                self.cache[result["url"]] = result
+            self.save()
+        return {url: self.cache[url] for url in urls}
+
+    def check_records(self, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Copies of startup records with canonical websites, a status and, when the site moved, its `website_final`"""
+        canonical = [canonicalize_url(record.get("website")) for record in records]
+        results = self.check(url for url in canonical if url)
+        checked = []
+        for record, url in zip(records, canonical):
+            record = dict(record)
+            if url:
+                result = results[url]
+                record["website"] = url
+                record["website_status"] = website_status(result)
+                # The redirect target goes in its own field, so a moved site doesn't show up as an edited record
+                if record["website_status"] == "redirected":
+                    record["website_final"] = result["final_url"]
+                else:
+                    record.pop("website_final", None)
+            elif record.get("website"):
+                record["website_status"] = "invalid"
+            checked.append(record)
+        return checked
+
+    async def _check_all(self, urls: List[str]) -> List[Dict[str, Any]]:
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def bounded(url: str) -> Dict[str, Any]:
+            async with semaphore:
+                return await self._check_one(url)
+
+        return await asyncio.gather(*(bounded(url) for url in urls))
+
+    async def _check_one(self, url: str) -> Dict[str, Any]:
+        result: Dict[str, Any] = {"url": url, "alive": False, "status": None, "final_url": None, "redirects": 0,
+                                  "tls_valid": None, "tls_expires": None, "error": None, "checked_at": time.time()}
+        target = url
+        try:
+            for _ in range(MAX_REDIRECTS + 1):
+                status, location = await self._request(target, result)
+                result["status"] = status
+                if location and 300 <= status < 400:
+                    target = urljoin(target, location)
+                    result["redirects"] += 1
+                    continue
+                break
+            result["final_url"] = canonicalize_url(target) or target
+            result["alive"] = result["status"] is not None and result["status"] < 400
+        except Exception as e:
+            # A bare https:// guess (no scheme in the record) may only be served over http
+            if url.startswith("https://") and result["status"] is None and result["tls_valid"] is None:
+                fallback = await self._check_http_fallback(url)
+                if fallback is not None:
+                    return fallback
+            result["error"] = f"{e.__class__.__name__}: {e}"[:200]
+        return result
+
+    async def _check_http_fallback(self, url: str) -> Optional[Dict[str, Any]]:
+        result = await self._check_one("http://" + url[len("https://"):])
+        if not result["alive"]:
+            return None
+        result["url"] = url
+        return result
+
+    async def _request(self, url: str, result: Dict[str, Any]) -> Tuple[int, Optional[str]]:
+        """(status, Location) of a HEAD request, falling back to GET when HEAD is rejected"""
+        status, location = await self._exchange(url, "HEAD", result)
+        if status in HEAD_REJECTED:
+            status, location = await self._exchange(url, "GET", result)
+        return status, location
+
+    async def _exchange(self, url: str, method: str, result: Dict[str, Any]) -> Tuple[int, Optional[str]]:
+        parts = urlsplit(url)
+        https = parts.scheme == "https"
+        port = parts.port or DEFAULT_PORTS[parts.scheme]
+        context = None
+        if https:
+            context = self._verified
+            try:
+                reader, writer = await asyncio.wait_for(
+                    asyncio.open_connection(parts.hostname, port, ssl=context), self.timeout)
+                if result["tls_valid"] is None:
+                    result["tls_valid"] = True
+            except ssl.SSLCertVerificationError as e:
+                result["tls_valid"] = False
+                result["error"] = f"TLS: {e.verify_message or e}"[:200]
+                context = self._unverified
+        if context is not self._verified:
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(parts.hostname, port, ssl=context), self.timeout)
+        try:
+            cert = writer.get_extra_info("peercert") if https else None
+            if cert and cert.get("notAfter") and result["tls_expires"] is None:
+                expires = ssl.cert_time_to_seconds(cert["notAfter"])
+                result["tls_expires"] = datetime.fromtimestamp(expires, timezone.utc).isoformat()
+            path = urlunsplit(("", "", parts.path or "/", parts.query, ""))
+            writer.write(f"{method} {path} HTTP/1.1\r\nHost: {parts.netloc}\r\n"
+                         f"User-Agent: {Config.HTTP_USER_AGENT}\r\nAccept: */*\r\nConnection: close\r\n\r\n"
+                         .encode("latin-1"))
+            await writer.drain()
+            head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), self.timeout)
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except OSError:
+                pass  # the answer is already read; a reset or TLS error on close doesn't change it
+        lines = head.decode("latin-1").split("\r\n")
+        status = int(lines[0].split()[1])
+        location = next((line.split(":", 1)[1].strip() for line in lines[1:]
+                         if line.lower().startswith("location:")), None)
+        return status, location